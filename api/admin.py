@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Course, Enrollment
+from .models import ArchivedEnrollment, Course, Enrollment
 from typing import List, Tuple, Any, Optional
 
 
@@ -16,4 +16,12 @@ class EnrollmentAdmin(admin.ModelAdmin):
     list_display = ('user', 'course', 'status', 'completion_percentage', 'enrolled_at')
     list_filter = ('status', 'enrolled_at')
     search_fields = ('user__username', 'course__title')
-    date_hierarchy = 'enrolled_at'
\ No newline at end of file
+    date_hierarchy = 'enrolled_at'
+
+
+@admin.register(ArchivedEnrollment)
+class ArchivedEnrollmentAdmin(admin.ModelAdmin):
+    list_display = ('user', 'course', 'status', 'completion_percentage', 'enrolled_at', 'archived_at')
+    list_filter = ('status', 'enrolled_at')
+    search_fields = ('user__username', 'course__title')
+    date_hierarchy = 'enrolled_at'
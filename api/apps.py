@@ -4,4 +4,8 @@ from typing import Any
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'api'
\ No newline at end of file
+    name = 'api'
+
+    def ready(self) -> None:
+        # Register signal handlers
+        from . import signals  # noqa: F401
@@ -0,0 +1,88 @@
+"""
+Archival of old finished enrollments.
+
+Completed and dropped enrollments last written more than
+``ENROLLMENT_ARCHIVE_AFTER_DAYS`` ago are moved from ``api_enrollment`` to ``api_archivedenrollment`` by the
+``archive_enrollments`` job. Each batch is copied and deleted in one short
+transaction. Enrollment queries, indexes and counts then only cover the
+enrollments people are still working on. The archive is read only when a
+client asks for it (``?include_archived=1``). An archived enrollment still
+counts as an enrollment in the course, so the user cannot be enrolled in it
+again; ``restore_enrollment`` moves it back to ``api_enrollment`` instead.
+"""
+from datetime import timedelta
+from typing import Any, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedEnrollment, Enrollment
+
+FINISHED_STATUSES = (Enrollment.StatusChoices.COMPLETED, Enrollment.StatusChoices.DROPPED)
+
+ARCHIVED_FIELDS = (
+    'id', 'user_id', 'course_id', 'enrolled_at', 'status',
+    'completion_percentage', 'completed_activities', 'completed_count',
+)
+
+
+def archive_batch(batch_size: int) -> int:
+    """Move one batch of long-finished enrollments to the archive; returns how many moved."""
+    cutoff = timezone.now() - timedelta(days=settings.ENROLLMENT_ARCHIVE_AFTER_DAYS)
+    with transaction.atomic():
+        # Lock the rows so a status change cannot slip in between the copy and the delete
+        rows = list(
+            Enrollment.objects.filter(status__in=FINISHED_STATUSES, updated_at__lt=cutoff)
+            .select_for_update(of=('self',))
+            .order_by('id')
+            .values(*ARCHIVED_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return 0
+        ArchivedEnrollment.objects.bulk_create([ArchivedEnrollment(**row) for row in rows])
+        Enrollment.all_objects.filter(id__in=[row['id'] for row in rows]).delete()
+    cache.delete_many(list({f"user_enrollments_{row['user_id']}" for row in rows}))
+    return len(rows)
+
+
+def archive_enrollments(batch_size: int = 0) -> int:
+    """Archive every old finished enrollment in batches; returns the number archived."""
+    batch_size = batch_size or settings.ENROLLMENT_ARCHIVE_BATCH_SIZE
+    archived = 0
+    while True:
+        moved = archive_batch(batch_size)
+        archived += moved
+        if moved < batch_size:
+            return archived
+
+
+def restore_enrollment(enrollment_id: int) -> Optional[Enrollment]:
+    """Move an archived enrollment back, keeping its id and progress; None if it is not archived."""
+    with transaction.atomic():
+        row = (
+            ArchivedEnrollment.objects.filter(id=enrollment_id)
+            .select_for_update()
+            .values(*ARCHIVED_FIELDS)
+            .first()
+        )
+        if row is None:
+            return None
+        # A fresh updated_at keeps the job from archiving it again right away
+        enrollment: Enrollment = Enrollment.all_objects.create(**row)
+        ArchivedEnrollment.objects.filter(id=enrollment_id).delete()
+    cache.delete(f"user_enrollments_{row['user_id']}")
+    return enrollment
+
+
+def with_archived(enrollments: Any, user_id: int, archived: Any = None) -> List[Any]:
+    """
+    A user's live and archived enrollments in one list, newest first.
+    
+    ``archived`` narrows the archive, e.g. to a search; it defaults to all of it.
+    """
+    if archived is None:
+        archived = ArchivedEnrollment.objects.all()
+    archived = archived.filter(user_id=user_id, course__deleted_at__isnull=True).for_list()
+    return sorted([*enrollments, *archived], key=lambda enrollment: enrollment.enrolled_at, reverse=True)
@@ -0,0 +1,73 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from rest_framework import status
+from rest_framework.request import Request
+
+from .views import LOGIN_BUSY_MESSAGE, LoginView, login_slots, perform_login
+
+
+# Logins run off the event loop on a pool as large as the hashing limit; the
+# admission and hashing slots are shared with LoginView.
+login_executor = ThreadPoolExecutor(
+    max_workers=settings.LOGIN_HASHING_WORKERS,
+    thread_name_prefix='login-hash',
+)
+
+
+def _login_in_worker(request: HttpRequest, data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """Run a login on a pool thread, which manages its own DB connection."""
+    close_old_connections()
+    try:
+        # Apply the same throttles LoginView gets from DRF
+        view = LoginView()
+        drf_request = Request(request)
+        for throttle in view.get_throttles():
+            if not throttle.allow_request(drf_request, view):
+                return {'detail': 'Request was throttled.'}, status.HTTP_429_TOO_MANY_REQUESTS
+        return perform_login(data)
+    finally:
+        close_old_connections()
+
+
+async def async_login(request: HttpRequest) -> HttpResponse:
+    """
+    Async API endpoint for user login under ASGI.
+
+    Same contract as ``LoginView``. Credentials are verified in
+    ``login_executor``; when every worker is busy and the queue is full the
+    request is rejected immediately with 503 and ``Retry-After``.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'detail': f'Method "{request.method}" not allowed.'},
+                            status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'error': 'Request body must be valid JSON'}, status=status.HTTP_400_BAD_REQUEST)
+    if not isinstance(data, dict):
+        return JsonResponse({'error': 'Request body must be a JSON object'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not login_slots.acquire(blocking=False):
+        response = JsonResponse({'error': LOGIN_BUSY_MESSAGE},
+                                status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        response['Retry-After'] = '1'
+        return response
+
+    try:
+        loop = asyncio.get_running_loop()
+        body, status_code = await loop.run_in_executor(login_executor, _login_in_worker, request, data)
+    finally:
+        login_slots.release()
+    return JsonResponse(body, status=status_code)
+
+
+# Token clients do not send CSRF tokens; set the flag directly since Django 4.2's
+# csrf_exempt decorator does not preserve coroutine functions.
+async_login.csrf_exempt = True  # type: ignore[attr-defined]
@@ -0,0 +1,175 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple, cast
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import router
+from django.utils.functional import SimpleLazyObject, empty
+from django.utils.translation import gettext as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from .tokens import ROLE_CLAIM, STAFF_CLAIM, get_token_version, has_current_claims
+
+
+# Columns kept in the cached user snapshot; the password hash stays in the database
+SNAPSHOT_FIELDS = tuple(field.attname for field in User._meta.fields if field.attname != 'password')
+
+
+def user_cache_key(user_id: Any) -> str:
+    """Cache key of the authenticated-user snapshot for a user id."""
+    return f"auth_user_{user_id}"
+
+
+def invalidate_user_cache(user_id: Any) -> None:
+    """Drop the cached user snapshot so the next request reloads it."""
+    cache.delete(user_cache_key(user_id))
+
+
+class VerifiedTokenCache:
+    """
+    Bounded, thread-safe LRU of verified tokens keyed by a digest of the raw token.
+
+    Entries are only served until the token's ``exp`` claim, so a cached token
+    never outlives the one it was verified from.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: 'OrderedDict[str, Tuple[Token, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(raw_token: bytes) -> str:
+        return hashlib.sha256(raw_token).hexdigest()
+
+    def get(self, raw_token: bytes) -> Optional[Token]:
+        key = self.digest(raw_token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            token, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return token
+
+    def set(self, raw_token: bytes, token: Token) -> None:
+        expires_at = token.payload.get('exp')
+        if expires_at is None:
+            return
+        key = self.digest(raw_token)
+        with self._lock:
+            self._entries[key] = (token, float(expires_at))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class TokenClaimsUser(SimpleLazyObject):
+    """
+    User backed by the claims of a validated access token.
+
+    ``id``, ``pk``, ``is_staff`` and ``role`` are answered from the token, so
+    permission checks never touch ``auth_user``. Any other attribute, including
+    ``is_active``, loads the real user on first access.
+    """
+
+    def __init__(self, token: Token, loader: Callable[[], User]) -> None:
+        super().__init__(loader)
+        self.__dict__['_token'] = token
+
+    @property
+    def id(self) -> int:
+        return int(self.__dict__['_token'][api_settings.USER_ID_CLAIM])
+
+    pk = id
+
+    @property
+    def is_staff(self) -> bool:
+        return bool(self.__dict__['_token'][STAFF_CLAIM])
+
+    @property
+    def role(self) -> str:
+        return str(self.__dict__['_token'][ROLE_CLAIM])
+
+    @property
+    def is_authenticated(self) -> bool:
+        return True
+
+    @property
+    def is_anonymous(self) -> bool:
+        return False
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __eq__(self, other: Any) -> bool:
+        if self.__dict__['_wrapped'] is empty and isinstance(other, User):
+            return bool(other.pk == self.pk)
+        return bool(super().__eq__(other))
+
+    def __hash__(self) -> int:
+        return hash(self.pk)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that avoids repeating work on every request.
+
+    - Verified tokens are kept in a per-process LRU until they expire, so the
+      HS256 signature is checked once per token rather than once per request.
+    - The authenticated user is cached for a short TTL, keyed by user id, and
+      invalidated whenever the user is saved or deleted (see ``api.signals``).
+      The cache holds the user's columns without the password hash.
+    - Tokens with current role/staff claims (see ``api.tokens``) authenticate as
+      a ``TokenClaimsUser`` and only load the user when a view needs it.
+    """
+
+    token_cache = VerifiedTokenCache(getattr(settings, 'JWT_TOKEN_CACHE_SIZE', 10000))
+
+    def get_validated_token(self, raw_token: bytes) -> Token:
+        token = self.token_cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            self.token_cache.set(raw_token, token)
+        return token
+
+    def get_user(self, validated_token: Token) -> Any:
+        if api_settings.USER_ID_CLAIM in validated_token and has_current_claims(validated_token):
+            return TokenClaimsUser(validated_token, lambda: self.load_user(validated_token))
+        user = self.load_user(validated_token)
+        # Reload a version missing from the cache so later requests can trust current claims
+        get_token_version(user.pk)
+        return user
+
+    def load_user(self, validated_token: Token) -> User:
+        """Load the user for a token, reusing the cached snapshot when possible."""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        cache_key = user_cache_key(user_id)
+        snapshot = cache.get(cache_key)
+        if snapshot is None:
+            user = cast(User, super().get_user(validated_token))
+            cache.set(cache_key, {name: getattr(user, name) for name in SNAPSHOT_FIELDS},
+                      timeout=settings.JWT_USER_CACHE_TTL)
+            return user
+        if not snapshot['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        # The password is a deferred field: loaded only if a view reads it, never saved back blank
+        return User.from_db(router.db_for_read(User), list(snapshot), list(snapshot.values()))
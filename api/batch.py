@@ -0,0 +1,191 @@
+"""
+Multi-request batch endpoint.
+
+``POST /api/batch/`` runs several API requests in one round trip. The batch
+request goes through the middleware stack, authentication and throttling
+once; each sub-request is then dispatched in-process to the DRF view its
+path resolves to, with the batch's user forced onto it so tokens are not
+verified again. Throttles are charged per sub-request, so a batch costs as
+much rate limit as the requests it carries.
+"""
+import asyncio
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve, reverse
+from rest_framework import serializers, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .idempotency import MAX_KEY_LENGTH
+
+# Request attribute linking a sub-request to its batch request
+BATCH_PARENT_ATTR = 'batch_parent'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Only DRF views under this prefix can be called from a batch
+API_PREFIX = '/api/'
+
+# Parent headers not passed on to sub-requests; the batch's Idempotency-Key
+# covers the batch, not each request in it
+SUB_REQUEST_EXCLUDED_META = ('CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_IDEMPOTENCY_KEY')
+
+batch_executor = ThreadPoolExecutor(
+    max_workers=settings.BATCH_WORKERS,
+    thread_name_prefix='api-batch',
+)
+
+
+class SubRequestSerializer(serializers.Serializer):
+    """One request inside a batch."""
+
+    id = serializers.CharField(required=False, max_length=64)
+    method = serializers.ChoiceField(choices=['GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE'], default='GET')
+    path = serializers.CharField(max_length=2048)
+    body = serializers.JSONField(required=False)
+    idempotency_key = serializers.CharField(required=False, max_length=MAX_KEY_LENGTH)
+
+
+class BatchSerializer(serializers.Serializer):
+    """A list of sub-requests, optionally with independent GETs run concurrently."""
+
+    requests = SubRequestSerializer(many=True, allow_empty=False)
+    parallel = serializers.BooleanField(default=False)
+
+    def validate_requests(self, value: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                f"A batch can contain at most {settings.BATCH_MAX_REQUESTS} requests."
+            )
+        return value
+
+
+def build_sub_request(parent: Request, sub: Dict[str, Any]) -> WSGIRequest:
+    """
+    Build a Django request for a sub-request, inheriting the parent's headers and user.
+
+    The parent's ``Idempotency-Key`` is dropped; a sub-request carries its own
+    through ``idempotency_key``.
+    """
+    url = urlsplit(sub['path'])
+    body = json.dumps(sub['body']).encode() if 'body' in sub else b''
+    environ = {
+        key: value for key, value in parent.META.items()
+        if not key.startswith('wsgi.') and key not in SUB_REQUEST_EXCLUDED_META
+    }
+    if 'idempotency_key' in sub:
+        environ['HTTP_IDEMPOTENCY_KEY'] = sub['idempotency_key']
+    environ.update({
+        'REQUEST_METHOD': sub['method'],
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.url_scheme': parent.scheme,
+    })
+    request = WSGIRequest(environ)
+    # DRF uses a forced user instead of running the authenticators again
+    request._force_auth_user = parent.user  # type: ignore[attr-defined]
+    request._force_auth_token = parent.auth  # type: ignore[attr-defined]
+    request.user = parent.user
+    setattr(request, BATCH_PARENT_ATTR, parent)
+    return request
+
+
+def is_api_view(func: Any) -> bool:
+    """Whether a resolved view function is a DRF view, whose errors become responses."""
+    view_class = getattr(func, 'cls', None)
+    return isinstance(view_class, type) and issubclass(view_class, APIView)
+
+
+def render_body(response: HttpResponse) -> Any:
+    """Decode a sub-response body as JSON when possible."""
+    if not response.content:
+        return None
+    if 'json' in response.get('Content-Type', ''):
+        return json.loads(response.content)
+    return response.content.decode(response.charset or 'utf-8', errors='replace')
+
+
+def dispatch(parent: Request, sub: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one sub-request through the URLconf and return its result."""
+    result: Dict[str, Any] = {'id': sub['id']} if 'id' in sub else {}
+    path = urlsplit(sub['path']).path
+    not_found = {**result, 'status': status.HTTP_404_NOT_FOUND, 'body': {'detail': 'Not found.'}}
+    if not path.startswith(API_PREFIX):
+        return not_found
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return not_found
+    if not is_api_view(match.func):
+        return not_found
+    if path == reverse('batch') or asyncio.iscoroutinefunction(match.func):
+        return {
+            **result,
+            'status': status.HTTP_400_BAD_REQUEST,
+            'body': {'detail': 'This endpoint cannot be called from a batch.'},
+        }
+
+    response = match.func(build_sub_request(parent, sub), *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return {**result, 'status': response.status_code, 'body': render_body(response)}
+
+
+def _dispatch_in_worker(parent: Request, sub: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a sub-request on a pool thread, which manages its own DB connection."""
+    close_old_connections()
+    try:
+        return dispatch(parent, sub)
+    finally:
+        close_old_connections()
+
+
+def _collect(pending: Dict[int, Any], responses: List[Optional[Dict[str, Any]]]) -> None:
+    """Wait for the running sub-requests and store their results by index."""
+    for index, future in pending.items():
+        responses[index] = future.result()
+    pending.clear()
+
+
+class BatchView(APIView):
+    """
+    API endpoint to run several API requests in one round trip.
+
+    Accepts ``{"requests": [{"id", "method", "path", "body", "idempotency_key"}],
+    "parallel": false}``
+    and returns ``{"responses": [{"id", "status", "body"}]}`` in request order.
+    Sub-requests run in order; with ``parallel`` set, consecutive safe
+    requests between two writes run concurrently on a thread pool, so every
+    read still sees exactly the writes listed before it.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request: Request) -> Response:
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        subs = serializer.validated_data['requests']
+
+        responses: List[Optional[Dict[str, Any]]] = [None] * len(subs)
+        pending: Dict[int, Any] = {}
+        for index, sub in enumerate(subs):
+            if serializer.validated_data['parallel'] and sub['method'] in SAFE_METHODS:
+                pending[index] = batch_executor.submit(_dispatch_in_worker, request, sub)
+                continue
+            # A write waits for the reads before it and runs before any read after it
+            _collect(pending, responses)
+            responses[index] = dispatch(request, sub)
+        _collect(pending, responses)
+        return Response({'responses': responses})
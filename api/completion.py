@@ -0,0 +1,177 @@
+"""
+Activity-level completion tracking.
+
+Each enrollment stores the activities it has completed as a bitset, where bit
+``n`` belongs to the activity whose ``position`` is ``n`` in the course. A
+course with a thousand activities needs 125 bytes per enrollment. Marking
+completions sets bits and adds the number of bits that flipped to
+``completed_count``; ``completion_percentage`` is that count over the course's
+``live_activity_count``, so nothing is recounted. When activities are deleted,
+their bits are cleared from the course's enrollments once, by
+``retire_positions``.
+"""
+from typing import Collection, Iterable, List, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
+
+from .models import Activity, Course, Enrollment
+from .progress import discard_progress
+from .utils import batched
+
+
+def set_bits(bitset: bytes, positions: Iterable[int]) -> Tuple[bytes, List[int]]:
+    """Set the given bit positions and return the new bitset and the positions that changed."""
+    bits = bytearray(bitset)
+    newly_set = []
+    for position in positions:
+        index, offset = divmod(position, 8)
+        if index >= len(bits):
+            bits.extend(bytes(index - len(bits) + 1))
+        if not bits[index] & (1 << offset):
+            bits[index] |= 1 << offset
+            newly_set.append(position)
+    return bytes(bits), newly_set
+
+
+def iter_bits(bitset: bytes) -> List[int]:
+    """Return the positions of all bits set in a bitset."""
+    return [
+        index * 8 + bit
+        for index, byte in enumerate(bitset) if byte
+        for bit in range(8) if byte & (1 << bit)
+    ]
+
+
+def clear_bits(bitset: bytes, positions: Iterable[int]) -> Tuple[bytes, List[int]]:
+    """Clear the given bit positions and return the new bitset and the positions that changed."""
+    bits = bytearray(bitset)
+    cleared = []
+    for position in positions:
+        index, offset = divmod(position, 8)
+        if index < len(bits) and bits[index] & (1 << offset):
+            bits[index] &= ~(1 << offset)
+            cleared.append(position)
+    return bytes(bits), cleared
+
+
+DERIVED_PERCENTAGE_MESSAGE = "completion_percentage is derived from the completed activities of this course."
+
+
+def tracks_completions(course: Course) -> bool:
+    """
+    Whether a course's completion percentages are derived from activity completions.
+
+    Clients may only set ``completion_percentage`` directly in courses without
+    activities; elsewhere the completion bitset is the only source.
+    """
+    return bool(course.live_activity_count)
+
+
+def percentage(completed_count: int, live_activity_count: int) -> int:
+    """Completion percentage of an enrollment."""
+    return min(completed_count * 100 // max(live_activity_count, 1), 100)
+
+
+def course_activities(course_id: int) -> 'QuerySet[Activity]':
+    """Activities of a course, the universe completion bitsets index into."""
+    return Activity.objects.filter(module__course_id=course_id)
+
+
+def completed_activity_ids(enrollment: Enrollment) -> List[int]:
+    """Return the ids of the activities completed in an enrollment."""
+    positions = iter_bits(bytes(enrollment.completed_activities))
+    if not positions:
+        return []
+    return list(
+        course_activities(enrollment.course_id)
+        .filter(position__in=positions)
+        .order_by('position')
+        .values_list('id', flat=True)
+    )
+
+
+def record_completions(enrollment_id: int, activity_ids: List[int]) -> Tuple[Enrollment, List[int], List[int]]:
+    """
+    Mark activities as completed for an enrollment.
+
+    Returns the updated enrollment, the ids that were newly completed and the
+    ids that do not belong to the enrollment's course (nothing is written if
+    there are any). The enrollment row is locked while its bitset is updated.
+    """
+    with transaction.atomic():
+        enrollment = Enrollment.objects.select_for_update(of=('self',)).select_related('course').only(
+            'id', 'user_id', 'course_id', 'status', 'completion_percentage',
+            'completed_activities', 'completed_count', 'course__live_activity_count',
+        ).get(pk=enrollment_id)
+        positions = dict(
+            course_activities(enrollment.course_id).filter(id__in=activity_ids).values_list('id', 'position')
+        )
+        unknown = [activity_id for activity_id in activity_ids if activity_id not in positions]
+        if unknown:
+            return enrollment, [], unknown
+
+        bitset, newly_set = set_bits(
+            bytes(enrollment.completed_activities),
+            [positions[activity_id] for activity_id in activity_ids]
+        )
+        if not newly_set:
+            return enrollment, [], []
+        ids_by_position = {position: activity_id for activity_id, position in positions.items()}
+        newly_completed = [ids_by_position[position] for position in newly_set]
+
+        enrollment.completed_activities = bitset
+        enrollment.completed_count += len(newly_set)
+        enrollment.completion_percentage = percentage(
+            enrollment.completed_count, enrollment.course.live_activity_count
+        )
+        if enrollment.completion_percentage == 100:
+            enrollment.status = Enrollment.StatusChoices.COMPLETED
+        enrollment.save(update_fields=[
+            'completed_activities', 'completed_count', 'completion_percentage', 'status', 'updated_at',
+        ])
+
+    # The derived value supersedes any buffered progress report
+    discard_progress([enrollment.id])
+    cache.delete(f"user_enrollments_{enrollment.user_id}")
+    return enrollment, newly_completed, []
+
+
+def retire_positions(course_id: int, positions: Collection[int]) -> int:
+    """
+    Clear the bits of activities that left a course from its enrollments.
+
+    Called once the activities are deleted and the course's live activity
+    count is adjusted. Enrollments are locked and rewritten a chunk at a time;
+    returns how many changed.
+    """
+    if not positions:
+        return 0
+    live_activity_count = Course.all_objects.filter(pk=course_id).values_list('live_activity_count', flat=True).get()
+    enrollment_ids = Enrollment.all_objects.filter(
+        course_id=course_id, completed_count__gt=0
+    ).values_list('id', flat=True)
+    changed = 0
+    user_ids: Set[int] = set()
+    for chunk in batched(list(enrollment_ids), settings.COMPLETION_RETIRE_BATCH_SIZE):
+        with transaction.atomic():
+            enrollments = []
+            for enrollment in Enrollment.all_objects.select_for_update().filter(id__in=chunk).only(
+                'id', 'user_id', 'completed_activities', 'completed_count', 'completion_percentage',
+            ):
+                bitset, cleared = clear_bits(bytes(enrollment.completed_activities), positions)
+                if not cleared:
+                    continue
+                enrollment.completed_activities = bitset
+                enrollment.completed_count -= len(cleared)
+                enrollment.completion_percentage = percentage(enrollment.completed_count, live_activity_count)
+                enrollments.append(enrollment)
+            Enrollment.all_objects.bulk_update(
+                enrollments, ['completed_activities', 'completed_count', 'completion_percentage']
+            )
+        changed += len(enrollments)
+        user_ids.update(enrollment.user_id for enrollment in enrollments)
+    cache.delete_many([f"user_enrollments_{user_id}" for user_id in user_ids])
+    return changed
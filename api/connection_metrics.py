@@ -0,0 +1,42 @@
+"""
+Per-worker database connection gauges.
+
+Every process counts the connections Django opens per database alias; the
+``connection_created`` handler in ``api.signals`` feeds the counters. With
+``CONN_MAX_AGE = 0`` the count grows with every request. With persistent or
+pooled connections it stays near the number of threads. ``/health/``
+reports the gauges of the worker that served it.
+"""
+import os
+import threading
+from collections import Counter
+from typing import Any, Dict
+
+from django.db import connections
+
+_opened: Counter = Counter()
+_opened_lock = threading.Lock()
+
+
+def count_connection(alias: str) -> None:
+    """Record that Django opened a connection for ``alias`` in this process."""
+    with _opened_lock:
+        _opened[alias] += 1
+
+
+def connection_gauges() -> Dict[str, Any]:
+    """Connection settings and counters of this worker process, per alias."""
+    databases = {}
+    for alias in connections:
+        wrapper = connections[alias]
+        gauges: Dict[str, Any] = {
+            'conn_max_age': wrapper.settings_dict['CONN_MAX_AGE'],
+            'health_checks': wrapper.settings_dict['CONN_HEALTH_CHECKS'],
+            'opened': _opened[alias],
+            'open_in_thread': wrapper.connection is not None,
+        }
+        pool_stats = getattr(wrapper, 'pool_stats', None)
+        if pool_stats is not None:
+            gauges['pool'] = pool_stats()
+        databases[alias] = gauges
+    return {'pid': os.getpid(), 'databases': databases}
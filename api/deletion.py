@@ -0,0 +1,104 @@
+"""
+Soft deletion of courses and user accounts.
+
+Deleting a course or an account only marks it: the course gets a
+``deleted_at`` timestamp, the account is deactivated and gets an
+``AccountDeletion`` row. Default managers hide marked courses and everything
+that hangs off them, and listings of other users leave out marked accounts,
+so the API behaves as if they were gone. The ``purge_deleted``
+job then removes the rows in bounded chunks, each in its own short
+transaction, instead of one cascade that locks every dependent row.
+"""
+from typing import Any, Iterable, List
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .authentication import invalidate_user_cache
+from .models import AccountDeletion, Activity, ArchivedEnrollment, Course, Enrollment, Module
+from .tokens import bump_token_version
+
+
+def invalidate_course_caches(course_ids: List[int], user_ids: Iterable[int]) -> None:
+    """Drop cached modules of deleted courses and enrollment lists of their students."""
+    cache.delete_many(
+        [f"course_modules_{course_id}" for course_id in course_ids]
+        + [f"user_enrollments_{user_id}" for user_id in set(user_ids)]
+    )
+
+
+def soft_delete_course(course: Course) -> None:
+    """Mark a course as deleted; its rows are purged in the background."""
+    # Read before the update, after which the default manager hides the rows
+    user_ids = list(Enrollment.all_objects.filter(course_id=course.pk).values_list('user_id', flat=True))
+    Course.objects.filter(pk=course.pk).update(deleted_at=timezone.now())
+    invalidate_course_caches([course.pk], user_ids)
+
+
+def request_account_deletion(user: Any) -> None:
+    """
+    Deactivate an account and queue it for purging.
+
+    Courses the user teaches are soft-deleted with it. Existing tokens stop
+    working at once because the token version is bumped.
+    """
+    with transaction.atomic():
+        AccountDeletion.objects.get_or_create(user_id=user.pk)
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        course_ids = list(Course.objects.filter(instructor_id=user.pk).values_list('pk', flat=True))
+        student_ids = list(
+            Enrollment.all_objects.filter(course_id__in=course_ids).values_list('user_id', flat=True)
+        )
+        Course.objects.filter(pk__in=course_ids).update(deleted_at=timezone.now())
+    # update() sends no post_save, so drop the cached snapshot and claims here
+    invalidate_user_cache(user.pk)
+    bump_token_version(user.pk)
+    invalidate_course_caches(course_ids, [user.pk, *student_ids])
+
+
+def delete_in_chunks(queryset: QuerySet, chunk_size: int) -> int:
+    """Delete the rows of a queryset a chunk at a time and return how many were deleted."""
+    deleted = 0
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            deleted += queryset.model._base_manager.filter(pk__in=ids).delete()[0]
+
+
+def purge_course(course_id: int, chunk_size: int) -> int:
+    """Delete a soft-deleted course and its dependents, leaves first."""
+    deleted = delete_in_chunks(Enrollment.all_objects.filter(course_id=course_id), chunk_size)
+    deleted += delete_in_chunks(ArchivedEnrollment.objects.filter(course_id=course_id), chunk_size)
+    deleted += delete_in_chunks(Activity.all_objects.filter(module__course_id=course_id), chunk_size)
+    deleted += delete_in_chunks(Module.all_objects.filter(course_id=course_id), chunk_size)
+    deleted += Course.all_objects.filter(pk=course_id).delete()[0]
+    return deleted
+
+
+def purge_account(user_id: int, chunk_size: int) -> int:
+    """Delete an account marked for deletion and its remaining rows."""
+    deleted = 0
+    for course_id in list(Course.all_objects.filter(instructor_id=user_id).values_list('pk', flat=True)):
+        deleted += purge_course(course_id, chunk_size)
+    deleted += delete_in_chunks(Enrollment.all_objects.filter(user_id=user_id), chunk_size)
+    deleted += delete_in_chunks(ArchivedEnrollment.objects.filter(user_id=user_id), chunk_size)
+    with transaction.atomic():
+        deleted += User.objects.filter(pk=user_id).delete()[0]
+    return deleted
+
+
+def purge_deleted(chunk_size: int = 0) -> int:
+    """Purge every soft-deleted course and account; returns the number of rows deleted."""
+    chunk_size = chunk_size or settings.PURGE_CHUNK_SIZE
+    deleted = 0
+    for course_id in list(Course.all_objects.filter(deleted_at__isnull=False).values_list('pk', flat=True)):
+        deleted += purge_course(course_id, chunk_size)
+    for user_id in list(AccountDeletion.objects.values_list('user_id', flat=True)):
+        deleted += purge_account(user_id, chunk_size)
+    return deleted
@@ -0,0 +1,191 @@
+"""
+Background personal-data exports.
+
+Requesting an export only records a ``DataExportJob``; the ``run_data_exports``
+worker job builds the archive. Rows are read with ``QuerySet.iterator()``, which
+uses server-side cursors on PostgreSQL. They are written straight into the
+members of a deflated zip archive on local disk, so neither the rows nor the
+archive are ever held in memory.
+"""
+import json
+import os
+import secrets
+import zipfile
+from datetime import timedelta
+from itertools import chain
+from typing import IO, Any, Dict, Iterable, List
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .completion import iter_bits
+from .models import Activity, ArchivedEnrollment, Course, DataExportJob, Enrollment
+from .privacy_serializers import UserDataExportSerializer
+from .roles import get_group_names
+
+
+class ExportLimitError(Exception):
+    """Raised when a user already has the maximum number of exports in progress."""
+
+
+def export_path(job: DataExportJob) -> str:
+    """Absolute path of a job's archive."""
+    return os.path.join(str(settings.DATA_EXPORT_DIR), job.file_name)
+
+
+def request_export(user: Any) -> DataExportJob:
+    """Queue an export for a user, enforcing the per-user concurrency limit."""
+    with transaction.atomic():
+        # Lock the user row: with no active jobs there is no job row to lock,
+        # and concurrent requests would both pass the check
+        list(User.objects.select_for_update().filter(pk=user.pk).values_list('pk', flat=True))
+        active = DataExportJob.objects.filter(user_id=user.pk, status__in=DataExportJob.ACTIVE_STATUSES).count()
+        if active >= settings.DATA_EXPORT_MAX_ACTIVE:
+            raise ExportLimitError("An export is already in progress.")
+        return DataExportJob.objects.create(user_id=user.pk)
+
+
+def _write_lines(member: IO[bytes], rows: Iterable[Dict[str, Any]]) -> None:
+    for row in rows:
+        member.write(json.dumps(row, cls=DjangoJSONEncoder).encode())
+        member.write(b'\n')
+
+
+def _enrollment_rows(user_id: int) -> Iterable[Dict[str, Any]]:
+    chunk_size = settings.DATA_EXPORT_CHUNK_SIZE
+    activity_ids: Dict[int, Dict[int, int]] = {}
+    # Archived enrollments are exported too, after the live ones
+    sources = (Enrollment.objects.all(), ArchivedEnrollment.objects.filter(course__deleted_at__isnull=True))
+    enrollments = chain.from_iterable(
+        source.filter(user_id=user_id).select_related('course').only(
+            'id', 'enrolled_at', 'status', 'completion_percentage', 'completed_activities', 'completed_count',
+            'course__id', 'course__title',
+        ).order_by('id').iterator(chunk_size=chunk_size)
+        for source in sources
+    )
+    for enrollment in enrollments:
+        course_id = enrollment.course_id
+        if course_id not in activity_ids:
+            # Bit position -> activity id, loaded once per course
+            activity_ids[course_id] = dict(
+                Activity.objects.filter(module__course_id=course_id).values_list('position', 'id')
+            )
+        positions = iter_bits(bytes(enrollment.completed_activities))
+        yield {
+            'id': enrollment.id,
+            'course_id': course_id,
+            'course_title': enrollment.course.title,
+            'enrolled_at': enrollment.enrolled_at,
+            'status': enrollment.status,
+            'completion_percentage': enrollment.completion_percentage,
+            'archived': isinstance(enrollment, ArchivedEnrollment),
+            'completed_activity_ids': [
+                activity_ids[course_id][position] for position in positions if position in activity_ids[course_id]
+            ],
+        }
+
+
+def _course_rows(user_id: int) -> Iterable[Dict[str, Any]]:
+    courses = Course.objects.filter(instructor_id=user_id).values(
+        'id', 'title', 'description', 'duration', 'level', 'is_featured', 'created_at', 'updated_at',
+    ).order_by('id')
+    return courses.iterator(chunk_size=settings.DATA_EXPORT_CHUNK_SIZE)
+
+
+def _content_rows(user_id: int) -> Iterable[Dict[str, Any]]:
+    activities = Activity.objects.filter(module__course__instructor_id=user_id).values(
+        'id', 'title', 'description', 'type', 'content', 'order',
+        'module_id', 'module__title', 'module__order', 'module__course_id',
+    ).order_by('module__course_id', 'module__order', 'order')
+    return activities.iterator(chunk_size=settings.DATA_EXPORT_CHUNK_SIZE)
+
+
+def build_export(job: DataExportJob) -> None:
+    """Write a job's archive to DATA_EXPORT_DIR and record its file name and size."""
+    os.makedirs(settings.DATA_EXPORT_DIR, exist_ok=True)
+    # An unguessable name keeps archives private even if the directory is served
+    job.file_name = f"export-{job.pk}-{secrets.token_hex(8)}.zip"
+    user = job.user
+    profile = {**UserDataExportSerializer(user).data, 'groups': sorted(get_group_names(user))}
+
+    with zipfile.ZipFile(export_path(job), 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('profile.json', json.dumps(profile, cls=DjangoJSONEncoder, indent=2))
+        with archive.open('enrollments.ndjson', 'w', force_zip64=True) as member:
+            _write_lines(member, _enrollment_rows(user.pk))
+        with archive.open('courses_taught.ndjson', 'w', force_zip64=True) as member:
+            _write_lines(member, _course_rows(user.pk))
+        with archive.open('course_content.ndjson', 'w', force_zip64=True) as member:
+            _write_lines(member, _content_rows(user.pk))
+    job.size = os.path.getsize(export_path(job))
+
+
+def fail_abandoned() -> int:
+    """
+    Fail running jobs older than DATA_EXPORT_RUNNING_TIMEOUT.
+
+    Their worker died before finishing them; left running, they would count
+    against the user's concurrency limit forever.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.DATA_EXPORT_RUNNING_TIMEOUT)
+    abandoned = DataExportJob.objects.filter(status=DataExportJob.StatusChoices.RUNNING).filter(
+        Q(started_at__lt=cutoff) | Q(started_at__isnull=True)
+    )
+    return abandoned.update(
+        status=DataExportJob.StatusChoices.FAILED,
+        error="The export was interrupted; please request a new one.",
+        finished_at=timezone.now(),
+    )
+
+
+def claim_pending(limit: int) -> List[DataExportJob]:
+    """Mark up to ``limit`` pending jobs as running and return them, oldest first."""
+    fail_abandoned()
+    claimed = []
+    pending = DataExportJob.objects.filter(status=DataExportJob.StatusChoices.PENDING).order_by('created_at')
+    for job_id in pending.values_list('pk', flat=True)[:limit]:
+        # Only one worker wins the conditional update for a given job
+        if DataExportJob.objects.filter(pk=job_id, status=DataExportJob.StatusChoices.PENDING).update(
+            status=DataExportJob.StatusChoices.RUNNING, started_at=timezone.now()
+        ):
+            claimed.append(DataExportJob.objects.select_related('user').get(pk=job_id))
+    return claimed
+
+
+def expire_exports() -> int:
+    """Delete archives older than DATA_EXPORT_RETENTION_DAYS."""
+    cutoff = timezone.now() - timedelta(days=settings.DATA_EXPORT_RETENTION_DAYS)
+    expired = DataExportJob.objects.filter(status=DataExportJob.StatusChoices.COMPLETED, finished_at__lt=cutoff)
+    count = 0
+    for job in expired.only('id', 'file_name'):
+        try:
+            os.remove(export_path(job))
+        except FileNotFoundError:
+            pass
+        DataExportJob.objects.filter(pk=job.pk).update(status=DataExportJob.StatusChoices.EXPIRED, file_name='')
+        count += 1
+    return count
+
+
+def run_data_exports(limit: int = 0) -> int:
+    """Build pending exports one at a time; returns the number completed."""
+    completed = 0
+    for job in claim_pending(limit or settings.DATA_EXPORT_JOBS_PER_RUN):
+        try:
+            build_export(job)
+        except Exception as e:
+            job.status = DataExportJob.StatusChoices.FAILED
+            job.error = str(e)
+            if job.file_name and os.path.exists(export_path(job)):
+                os.remove(export_path(job))
+            job.file_name = ''
+        else:
+            job.status = DataExportJob.StatusChoices.COMPLETED
+            completed += 1
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'file_name', 'size', 'error', 'finished_at'])
+    expire_exports()
+    return completed
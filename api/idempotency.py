@@ -0,0 +1,102 @@
+"""
+``Idempotency-Key`` support for create endpoints.
+
+The first response for a key is stored in the cache for
+``IDEMPOTENCY_TTL`` seconds and replayed for retries with the same key, without
+running validation, password hashing or any query again. While the first
+request is still running, duplicates get 409 instead of racing it. Keys are
+scoped to the user (or, for anonymous callers, the client address) and the
+endpoint, and a key reused with a different body is rejected.
+"""
+import hashlib
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.throttling import BaseThrottle
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+def idempotency_cache_key(request: Request, key: str) -> str:
+    """Cache key for a client key, scoped to the caller and the endpoint."""
+    if request.user and request.user.is_authenticated:
+        scope = f"user:{request.user.pk}"
+    else:
+        # Anonymous callers (sign-up) are told apart the way the throttles do it
+        scope = f"anon:{BaseThrottle().get_ident(request)}"
+    digest = hashlib.sha256(f"{scope}:{request.method}:{request.path}:{key}".encode()).hexdigest()
+    return f"idempotency_{digest}"
+
+
+def request_fingerprint(request: Request) -> str:
+    """Digest of the request body, to detect a key reused for a different request."""
+    return hashlib.sha256(request.body).hexdigest()
+
+
+def replay(stored: Dict[str, Any]) -> Response:
+    """Rebuild a stored response."""
+    response = Response(stored['data'], status=stored['status'], headers=stored['headers'])
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def mismatch() -> Response:
+    return Response(
+        {"error": f"This {IDEMPOTENCY_HEADER} was already used for a different request."},
+        status=status.HTTP_422_UNPROCESSABLE_ENTITY
+    )
+
+
+def run_idempotent(request: Request, key: str, handler: Callable[[], Response]) -> Response:
+    """Run ``handler`` once per idempotency key and replay its response for retries."""
+    if len(key) > MAX_KEY_LENGTH:
+        return Response(
+            {"error": f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    result_key = idempotency_cache_key(request, key)
+    lock_key = f"{result_key}_lock"
+    fingerprint = request_fingerprint(request)
+
+    stored: Optional[Dict[str, Any]] = cache.get(result_key)
+    if stored is not None:
+        return replay(stored) if stored['fingerprint'] == fingerprint else mismatch()
+    if not cache.add(lock_key, fingerprint, timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT):
+        # The first request is still running; the client retries once it has finished
+        return Response(
+            {"error": f"A request with this {IDEMPOTENCY_HEADER} is still in progress."},
+            status=status.HTTP_409_CONFLICT,
+            headers={'Retry-After': '1'}
+        )
+
+    try:
+        response = handler()
+        # Server errors are not stored, so the client can retry them
+        if response.status_code < 500:
+            cache.set(result_key, {
+                'fingerprint': fingerprint,
+                'status': response.status_code,
+                'data': response.data,
+                'headers': {name: value for name, value in response.items() if name == 'Location'},
+            }, timeout=settings.IDEMPOTENCY_TTL)
+        return response
+    finally:
+        cache.delete(lock_key)
+
+
+class IdempotentCreateMixin:
+    """Viewset mixin honouring the ``Idempotency-Key`` header on ``create``."""
+
+    def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return super().create(request, *args, **kwargs)  # type: ignore[misc, no-any-return]
+        return run_idempotent(request, key, lambda: super(IdempotentCreateMixin, self).create(  # type: ignore[misc]
+            request, *args, **kwargs
+        ))
@@ -0,0 +1,395 @@
+"""
+Bulk imports for onboarding data and course content.
+
+Rows are read incrementally from CSV or NDJSON and processed in batches, so
+large files are never held in memory at once.
+"""
+import csv
+import io
+import json
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import groupby
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from .models import Activity, Course, Module
+from .ordering import ORDER_GAP
+from .roles import INSTRUCTORS_GROUP, STUDENTS_GROUP
+from .utils import batched
+
+
+ADMINS_GROUP = 'admins'
+ROLE_GROUPS = {'admin': ADMINS_GROUP, 'instructor': INSTRUCTORS_GROUP, 'student': STUDENTS_GROUP}
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+
+class ImportFormatError(ValueError):
+    """Raised when an import file cannot be parsed at all."""
+
+
+def detect_format(filename: str = '', content_type: str = '') -> Optional[str]:
+    """Guess the import format from a file name or content type."""
+    extension = os.path.splitext(filename)[1].lower().lstrip('.')
+    if extension in ('ndjson', 'jsonl') or 'ndjson' in content_type or 'jsonl' in content_type:
+        return 'ndjson'
+    if extension == 'csv' or 'csv' in content_type:
+        return 'csv'
+    return None
+
+
+def iter_rows(stream: Any, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """Yield ``(row_number, row)`` pairs from a text or binary CSV or NDJSON stream."""
+    if fmt not in IMPORT_FORMATS:
+        raise ImportFormatError(f"Unsupported format '{fmt}'; use one of {', '.join(IMPORT_FORMATS)}.")
+    text = stream if isinstance(stream, io.TextIOBase) else io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    if fmt == 'csv':
+        # Row 1 is the header
+        for number, row in enumerate(csv.DictReader(text), start=2):
+            yield number, row
+        return
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, None
+
+
+class UserImportRowSerializer(serializers.Serializer):
+    """Field validation for one imported user; uniqueness is checked per batch."""
+    
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    email = serializers.EmailField(required=False, allow_blank=True, default='')
+    password = serializers.CharField(write_only=True)
+    first_name = serializers.CharField(required=False, allow_blank=True, default='', max_length=150)
+    last_name = serializers.CharField(required=False, allow_blank=True, default='', max_length=150)
+    role = serializers.ChoiceField(choices=list(ROLE_GROUPS), required=False, default='student')
+    is_staff = serializers.BooleanField(required=False, default=False)
+    
+    def validate(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate the password against the configured validators."""
+        candidate = User(username=data['username'], email=data['email'],
+                         first_name=data['first_name'], last_name=data['last_name'])
+        try:
+            validate_password(data['password'], user=candidate)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({'password': list(e.messages)})
+        return data
+
+
+# Hashing threads shared by every bulk-import request of a process. PBKDF2 releases
+# the GIL, so a few threads hash in parallel without forking the web worker.
+request_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.USER_IMPORT_REQUEST_HASH_WORKERS,
+    thread_name_prefix='import-hash',
+)
+
+
+def _init_hash_worker() -> None:
+    """Make Django usable in pool processes started with the spawn method."""
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+class UserImporter:
+    """
+    Create users in bulk from validated rows.
+
+    Per batch: uniqueness is checked with two set queries, passwords are hashed
+    in parallel, and users and group memberships are inserted with
+    ``bulk_create`` in one transaction. Row-level problems are collected in
+    ``errors`` instead of aborting the import.
+    
+    With ``processes`` set (the management command), passwords are hashed on a
+    pool of ``hash_workers`` processes started for this import. Otherwise (the
+    API) they go to ``request_hash_executor``, which all requests share.
+    """
+    
+    def __init__(self, hash_workers: Optional[int] = None, batch_size: Optional[int] = None,
+                 processes: bool = False) -> None:
+        self.processes = processes
+        self.hash_workers = hash_workers or (
+            settings.USER_IMPORT_HASH_WORKERS if processes else settings.USER_IMPORT_REQUEST_HASH_WORKERS
+        )
+        self.batch_size = batch_size or settings.USER_IMPORT_BATCH_SIZE
+        self.created = 0
+        self.errors: List[Dict[str, Any]] = []
+        self._seen_usernames: set = set()
+        self._seen_emails: set = set()
+        self._groups: Dict[str, Group] = {}
+    
+    def run(self, rows: Iterable[Tuple[int, Any]]) -> Dict[str, Any]:
+        """Import ``(row_number, row)`` pairs and return a report."""
+        executor: Optional[Executor] = None
+        if self.hash_workers > 1:
+            executor = (ProcessPoolExecutor(self.hash_workers, initializer=_init_hash_worker)
+                        if self.processes else request_hash_executor)
+        try:
+            for batch in batched(rows, self.batch_size):
+                self._import_batch(batch, executor)
+        finally:
+            if self.processes and executor is not None:
+                executor.shutdown()
+        self.errors.sort(key=lambda error: error['row'])
+        return {'created': self.created, 'failed': len(self.errors), 'errors': self.errors}
+    
+    def _error(self, row_number: int, errors: Any) -> None:
+        self.errors.append({'row': row_number, 'errors': errors})
+    
+    def _import_batch(self, batch: List[Tuple[int, Any]], executor: Optional[Executor]) -> None:
+        valid: List[Tuple[int, Dict[str, Any]]] = []
+        for row_number, row in batch:
+            if not isinstance(row, dict):
+                self._error(row_number, {'detail': ['Row is not a valid object.']})
+                continue
+            # Empty CSV cells mean "not provided"
+            row = {key: value for key, value in row.items() if value not in ('', None)}
+            serializer = UserImportRowSerializer(data=row)
+            if not serializer.is_valid():
+                self._error(row_number, serializer.errors)
+                continue
+            valid.append((row_number, dict(serializer.validated_data)))
+        
+        usernames = {data['username'] for _, data in valid}
+        emails = {data['email'] for _, data in valid if data['email']}
+        taken_usernames = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        taken_emails = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+        
+        accepted: List[Tuple[int, Dict[str, Any]]] = []
+        for row_number, data in valid:
+            if data['username'] in taken_usernames or data['username'] in self._seen_usernames:
+                self._error(row_number, {'username': ['A user with that username already exists.']})
+                continue
+            if data['email'] and (data['email'] in taken_emails or data['email'] in self._seen_emails):
+                self._error(row_number, {'email': ['A user with that email already exists.']})
+                continue
+            self._seen_usernames.add(data['username'])
+            if data['email']:
+                self._seen_emails.add(data['email'])
+            accepted.append((row_number, data))
+        if not accepted:
+            return
+        
+        passwords = [data['password'] for _, data in accepted]
+        if executor is not None:
+            # Only process pools use the chunk size
+            chunksize = max(1, len(passwords) // (self.hash_workers * 4))
+            hashes = list(executor.map(make_password, passwords, chunksize=chunksize))
+        else:
+            hashes = [make_password(password) for password in passwords]
+        
+        rows = [
+            (row_number, User(
+                username=data['username'],
+                email=data['email'],
+                first_name=data['first_name'],
+                last_name=data['last_name'],
+                is_staff=data['is_staff'] or data['role'] in ('admin', 'instructor'),
+                password=hashed,
+            ), data['role'])
+            for (row_number, data), hashed in zip(accepted, hashes)
+        ]
+        try:
+            self._insert(rows)
+        except IntegrityError:
+            # A username was taken concurrently since the checks above; find it row by row.
+            # Ids and groups handed out inside the rolled-back transaction are gone.
+            self._groups.clear()
+            for _, user, _ in rows:
+                user.pk = None
+            for row in rows:
+                try:
+                    self._insert([row])
+                except IntegrityError:
+                    self._error(row[0], {'username': ['A user with that username already exists.']})
+    
+    def _insert(self, rows: List[Tuple[int, User, str]]) -> None:
+        """Insert users and their group memberships in one transaction."""
+        users = [user for _, user, _ in rows]
+        with transaction.atomic():
+            created = User.objects.bulk_create(users, batch_size=self.batch_size)
+            if any(user.pk is None for user in created):
+                # Backends that cannot return ids from bulk inserts
+                ids = dict(User.objects.filter(username__in=[u.username for u in users]).values_list('username', 'id'))
+                for user in created:
+                    user.pk = ids[user.username]
+            memberships = [
+                User.groups.through(user_id=user.pk, group_id=self._group(ROLE_GROUPS[role]).pk)
+                for user, (_, _, role) in zip(created, rows)
+            ]
+            User.groups.through.objects.bulk_create(memberships, batch_size=self.batch_size)
+        self.created += len(created)
+    
+    def _group(self, name: str) -> Group:
+        if name not in self._groups:
+            self._groups[name], _ = Group.objects.get_or_create(name=name)
+        return self._groups[name]
+
+
+
+class ActivityImportSerializer(serializers.ModelSerializer):
+    """Field validation for one imported activity."""
+    
+    order = serializers.IntegerField(min_value=0, required=False)
+    
+    class Meta:
+        model = Activity
+        fields = ['title', 'description', 'type', 'content', 'order']
+
+
+class ModuleImportSerializer(serializers.ModelSerializer):
+    """Field validation for one imported module and its activities."""
+    
+    order = serializers.IntegerField(min_value=0, required=False)
+    activities = ActivityImportSerializer(many=True, required=False, default=list)
+    
+    class Meta:
+        model = Module
+        fields = ['title', 'description', 'order', 'activities']
+
+
+class CourseImportSerializer(serializers.ModelSerializer):
+    """Field validation for one imported course tree; instructors are checked per batch."""
+    
+    instructor_id = serializers.IntegerField(min_value=1)
+    modules = ModuleImportSerializer(many=True, required=False, default=list)
+    
+    class Meta:
+        model = Course
+        fields = ['title', 'description', 'instructor_id', 'duration', 'level', 'is_featured', 'modules']
+
+
+def _prefixed(row: Dict[str, Any], prefix: str) -> Dict[str, Any]:
+    """Pick the ``prefix_*`` columns of a CSV row, dropping empty cells."""
+    return {
+        key[len(prefix):]: value for key, value in row.items()
+        if key.startswith(prefix) and value not in ('', None)
+    }
+
+
+def iter_course_trees(rows: Iterable[Tuple[int, Any]], fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Yield ``(row_number, course_tree)`` pairs.
+    
+    NDJSON lines are already course trees. CSV files have one row per
+    activity with ``course_*``, ``module_*`` and ``activity_*`` columns;
+    consecutive rows with the same course title form one tree, and a row
+    without an activity title declares a module with no activities.
+    """
+    if fmt != 'csv':
+        yield from rows
+        return
+    for _, group in groupby(rows, key=lambda item: item[1].get('course_title')):
+        course_rows = list(group)
+        row_number, first = course_rows[0]
+        course: Dict[str, Any] = _prefixed(first, 'course_')
+        modules: List[Dict[str, Any]] = []
+        for _, row in course_rows:
+            module = _prefixed(row, 'module_')
+            if not modules or modules[-1].get('title') != module.get('title'):
+                modules.append({**module, 'activities': []})
+            activity = _prefixed(row, 'activity_')
+            if activity.get('title'):
+                modules[-1]['activities'].append(activity)
+        course['modules'] = modules
+        yield row_number, course
+
+
+class CourseImporter:
+    """
+    Create course trees in bulk.
+    
+    Each tree is validated in memory and instructors are checked with one set
+    query per batch. A course is then written with three inserts in one
+    transaction: the course, a ``bulk_create`` of its modules and one of its
+    activities. Trees that fail validation are reported and skipped.
+    """
+    
+    def __init__(self, batch_size: Optional[int] = None) -> None:
+        self.batch_size = batch_size or settings.COURSE_IMPORT_BATCH_SIZE
+        self.created = 0
+        self.modules = 0
+        self.activities = 0
+        self.errors: List[Dict[str, Any]] = []
+    
+    def run(self, trees: Iterable[Tuple[int, Any]]) -> Dict[str, Any]:
+        """Import ``(row_number, course_tree)`` pairs and return a report."""
+        for batch in batched(trees, self.batch_size):
+            self._import_batch(batch)
+        self.errors.sort(key=lambda error: error['row'])
+        return {
+            'created': self.created,
+            'modules': self.modules,
+            'activities': self.activities,
+            'failed': len(self.errors),
+            'errors': self.errors,
+        }
+    
+    def _error(self, row_number: int, errors: Any) -> None:
+        self.errors.append({'row': row_number, 'errors': errors})
+    
+    def _import_batch(self, batch: List[Tuple[int, Any]]) -> None:
+        valid: List[Tuple[int, Dict[str, Any]]] = []
+        for row_number, tree in batch:
+            if not isinstance(tree, dict):
+                self._error(row_number, {'detail': ['Row is not a valid object.']})
+                continue
+            serializer = CourseImportSerializer(data=tree)
+            if not serializer.is_valid():
+                self._error(row_number, serializer.errors)
+                continue
+            valid.append((row_number, serializer.validated_data))
+        
+        instructor_ids = {data['instructor_id'] for _, data in valid}
+        instructors = set(User.objects.filter(id__in=instructor_ids, is_staff=True).values_list('id', flat=True))
+        for row_number, data in valid:
+            if data['instructor_id'] not in instructors:
+                self._error(row_number, {'instructor_id': ['Instructor does not exist or is not staff.']})
+                continue
+            self._create(data)
+    
+    def _create(self, data: Dict[str, Any]) -> None:
+        modules_data = data.pop('modules')
+        activity_total = sum(len(module['activities']) for module in modules_data)
+        with transaction.atomic():
+            # Activities take positions 0..n-1, so the slots are reserved up front
+            course = Course.objects.create(activity_slots=activity_total, live_activity_count=activity_total, **data)
+            modules = Module.objects.bulk_create([
+                Module(
+                    course=course,
+                    title=module['title'],
+                    description=module['description'],
+                    order=module.get('order', (index + 1) * ORDER_GAP),
+                )
+                for index, module in enumerate(modules_data)
+            ])
+            if any(module.pk is None for module in modules):
+                # Backends that cannot return ids from bulk inserts
+                ids = Module.objects.filter(course=course).order_by('id').values_list('id', flat=True)
+                for module, pk in zip(modules, ids):
+                    module.pk = pk
+            activities: List[Activity] = []
+            for module, module_data in zip(modules, modules_data):
+                for index, activity in enumerate(module_data['activities']):
+                    activities.append(Activity(
+                        module=module,
+                        position=len(activities),
+                        order=activity.pop('order', (index + 1) * ORDER_GAP),
+                        **activity
+                    ))
+            Activity.objects.bulk_create(activities, batch_size=settings.COURSE_IMPORT_BATCH_SIZE)
+        self.created += 1
+        self.modules += len(modules)
+        self.activities += len(activities)
@@ -0,0 +1,90 @@
+"""
+Periodic background jobs run by ``manage.py run_worker``.
+
+Each job is a plain function registered with an interval in seconds. Jobs
+with ``on_shutdown=True`` also run once more when the worker stops, so
+buffered state is written out before the process exits.
+"""
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """A function the worker runs every ``interval`` seconds."""
+
+    def __init__(self, name: str, func: Callable[[], object], interval: float, on_shutdown: bool = False) -> None:
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.on_shutdown = on_shutdown
+        self.next_run = 0.0
+
+    def run(self) -> None:
+        start = time.monotonic()
+        try:
+            result = self.func()
+        except Exception:
+            logger.exception("Job %s failed", self.name)
+        else:
+            logger.info("Job %s finished in %.2fs: %s", self.name, time.monotonic() - start, result)
+        self.next_run = time.monotonic() + self.interval
+
+
+registry: Dict[str, PeriodicJob] = {}
+
+
+def periodic_job(interval: float, name: Optional[str] = None,
+                 on_shutdown: bool = False) -> Callable[[Callable[[], object]], Callable[[], object]]:
+    """Register a function as a periodic job."""
+    def decorator(func: Callable[[], object]) -> Callable[[], object]:
+        job_name = name or func.__name__
+        registry[job_name] = PeriodicJob(job_name, func, interval, on_shutdown)
+        return func
+    return decorator
+
+
+@periodic_job(interval=settings.TOKEN_PRUNE_INTERVAL)
+def prune_tokens() -> int:
+    """Delete expired outstanding/blacklisted tokens and keep the blacklist cache warm."""
+    from .tokens import prune_expired_tokens, warm_blacklist_cache
+
+    deleted = prune_expired_tokens(batch_size=settings.TOKEN_PRUNE_BATCH_SIZE)
+    warm_blacklist_cache(batch_size=settings.TOKEN_PRUNE_BATCH_SIZE)
+    return deleted
+
+
+@periodic_job(interval=settings.PROGRESS_FLUSH_INTERVAL, on_shutdown=True)
+def flush_progress() -> int:
+    """Write buffered enrollment progress reports to the database."""
+    from .progress import flush_progress as flush
+
+    return flush()
+
+
+@periodic_job(interval=settings.PURGE_INTERVAL)
+def purge_deleted() -> int:
+    """Remove soft-deleted courses and accounts in bounded chunks."""
+    from .deletion import purge_deleted as purge
+
+    return purge()
+
+
+@periodic_job(interval=settings.DATA_EXPORT_INTERVAL)
+def run_data_exports() -> int:
+    """Build queued personal-data export archives."""
+    from .exports import run_data_exports as run
+
+    return run()
+
+
+@periodic_job(interval=settings.ENROLLMENT_ARCHIVE_INTERVAL)
+def archive_enrollments() -> int:
+    """Move old completed and dropped enrollments to the archive table."""
+    from .archival import archive_enrollments as archive
+
+    return archive()
@@ -0,0 +1,69 @@
+import time
+from typing import Any, Dict, List, Tuple
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connections
+from django.db.utils import load_backend
+from django.utils.connection import ConnectionDoesNotExist
+
+from api.connection_metrics import connection_gauges
+
+STOCK_POSTGRESQL = 'django.db.backends.postgresql'
+POOLED_POSTGRESQL = 'api.pooled_postgresql'
+
+
+class Command(BaseCommand):
+    help = "Measure per-request database connection overhead with and without connection reuse."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--requests', type=int, default=200, help="Simulated requests per mode.")
+        parser.add_argument('--database', default='default', help="Database alias to benchmark.")
+
+    def modes(self, settings_dict: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Connection settings to compare, starting with a new connection per request."""
+        engine = STOCK_POSTGRESQL if settings_dict['ENGINE'] == POOLED_POSTGRESQL else settings_dict['ENGINE']
+        modes = [
+            ('new connection per request', {**settings_dict, 'ENGINE': engine, 'CONN_MAX_AGE': 0}),
+            ('persistent connection', {**settings_dict, 'ENGINE': engine, 'CONN_MAX_AGE': None}),
+        ]
+        if engine == STOCK_POSTGRESQL:
+            modes.append(('pooled connection', {**settings_dict, 'ENGINE': POOLED_POSTGRESQL, 'CONN_MAX_AGE': 0}))
+        return modes
+
+    def run_requests(self, alias: str, settings_dict: Dict[str, Any], count: int) -> Tuple[float, int]:
+        """Run ``count`` one-query requests; return seconds per request and connections opened."""
+        wrapper = load_backend(settings_dict['ENGINE']).DatabaseWrapper(settings_dict, alias)
+        opened_before = connection_gauges()['databases'][alias]['opened']
+        start = time.perf_counter()
+        for _ in range(count):
+            # Django runs this check on request_started and request_finished
+            wrapper.close_if_unusable_or_obsolete()
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            wrapper.close_if_unusable_or_obsolete()
+        elapsed = time.perf_counter() - start
+        pool_stats = wrapper.pool_stats() if hasattr(wrapper, 'pool_stats') else None
+        wrapper.close()
+        if pool_stats is not None:
+            return elapsed / count, pool_stats['opened']
+        return elapsed / count, connection_gauges()['databases'][alias]['opened'] - opened_before
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        alias = options['database']
+        try:
+            settings_dict = connections[alias].settings_dict
+        except ConnectionDoesNotExist:
+            raise CommandError(f"Unknown database alias '{alias}'.")
+        count = options['requests']
+        if count < 1:
+            raise CommandError("--requests must be at least 1.")
+
+        baseline = None
+        for label, mode_settings in self.modes(settings_dict):
+            per_request, opened = self.run_requests(alias, mode_settings, count)
+            baseline = per_request if baseline is None else baseline
+            self.stdout.write(
+                f"{label}: {per_request * 1000:.3f} ms/request, {opened} connections opened "
+                f"for {count} requests ({(baseline - per_request) * 1000:.3f} ms/request saved)"
+            )
@@ -0,0 +1,101 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, ContextManager, Dict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from api.sqlite import apply_pragmas, write_lock
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent SQLite reads and writes with stock settings and with the tuning."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--writers', type=int, default=8, help="Writer threads.")
+        parser.add_argument('--readers', type=int, default=4, help="Reader threads.")
+        parser.add_argument('--writes', type=int, default=50, help="Transactions per writer.")
+
+    def run(self, path: str, tuned: bool, options: Dict[str, Any]) -> Dict[str, float]:
+        """Run the workload against a fresh database file and return its counters."""
+        counters = {'writes': 0, 'locked': 0, 'reads': 0}
+        counters_lock = threading.Lock()
+        writers_done = threading.Event()
+
+        def connect() -> sqlite3.Connection:
+            # Same busy timeout as Django's default; autocommit so BEGIN is explicit
+            connection = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+            if tuned:
+                apply_pragmas(connection.cursor())
+            return connection
+
+        setup = connect()
+        setup.execute('CREATE TABLE enrollment (id INTEGER PRIMARY KEY, user_id INTEGER, status TEXT)')
+        setup.close()
+
+        def writer(user_id: int) -> None:
+            connection = connect()
+            guard: ContextManager[Any] = nullcontext()
+            if tuned:
+                guard = write_lock
+            for _ in range(options['writes']):
+                # Read then write, like Django's uniqueness checks before an INSERT
+                with guard:
+                    try:
+                        connection.execute('BEGIN')
+                        connection.execute('SELECT COUNT(*) FROM enrollment WHERE user_id = ?', [user_id]).fetchone()
+                        connection.execute('INSERT INTO enrollment (user_id, status) VALUES (?, ?)', [user_id, 'ACT'])
+                        connection.execute('COMMIT')
+                    except sqlite3.OperationalError:
+                        if connection.in_transaction:
+                            connection.execute('ROLLBACK')
+                        with counters_lock:
+                            counters['locked'] += 1
+                        continue
+                with counters_lock:
+                    counters['writes'] += 1
+            connection.close()
+
+        def reader() -> None:
+            connection = connect()
+            while not writers_done.is_set():
+                try:
+                    connection.execute('SELECT status, COUNT(*) FROM enrollment GROUP BY status').fetchall()
+                except sqlite3.OperationalError:
+                    continue
+                with counters_lock:
+                    counters['reads'] += 1
+            connection.close()
+
+        readers = [threading.Thread(target=reader) for _ in range(options['readers'])]
+        writers = [threading.Thread(target=writer, args=(index,)) for index in range(options['writers'])]
+        start = time.perf_counter()
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        writers_done.set()
+        for thread in readers:
+            thread.join()
+        return {**counters, 'elapsed': elapsed}
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if min(options['writers'], options['writes']) < 1:
+            raise CommandError("--writers and --writes must be at least 1.")
+
+        attempted = options['writers'] * options['writes']
+        with tempfile.TemporaryDirectory() as directory:
+            for label, tuned in (('stock SQLite', False), ('tuned SQLite', True)):
+                result = self.run(os.path.join(directory, f'{label.split()[0]}.sqlite3'), tuned, options)
+                self.stdout.write(
+                    f"{label}: {result['writes']}/{attempted} writes committed, {result['locked']} "
+                    f"'database is locked' errors, {result['writes'] / result['elapsed']:.0f} writes/s, "
+                    f"{result['reads'] / result['elapsed']:.0f} reads/s"
+                )
+        if not settings.SQLITE_SERIALIZE_WRITES:
+            self.stdout.write("Note: SQLITE_SERIALIZE_WRITES is off, so transactions do not take the write lock.")
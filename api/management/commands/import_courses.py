@@ -0,0 +1,38 @@
+import json
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from api.imports import IMPORT_FORMATS, CourseImporter, ImportFormatError, detect_format, iter_course_trees, iter_rows
+
+
+class Command(BaseCommand):
+    help = "Create courses with their modules and activities from a CSV or NDJSON file."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('path', help="NDJSON file of course trees, or CSV with one row per activity.")
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, help="Course trees per instructor check.")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        fmt = options['format'] or detect_format(options['path'])
+        if fmt is None:
+            raise CommandError("Cannot tell the file format; pass --format csv or --format ndjson.")
+
+        importer = CourseImporter(batch_size=options['batch_size'])
+        start = time.monotonic()
+        try:
+            with open(options['path'], encoding='utf-8', newline='') as stream:
+                report = importer.run(iter_course_trees(iter_rows(stream, fmt), fmt))
+        except (OSError, ImportFormatError) as e:
+            raise CommandError(str(e))
+        elapsed = time.monotonic() - start
+
+        for error in report['errors']:
+            self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {report['created']} courses ({report['modules']} modules, "
+            f"{report['activities']} activities), {report['failed']} failed "
+            f"in {elapsed:.2f}s ({report['created'] / elapsed if elapsed else 0:.1f} courses/s)."
+        ))
@@ -0,0 +1,38 @@
+import json
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from api.imports import IMPORT_FORMATS, ImportFormatError, UserImporter, detect_format, iter_rows
+
+
+class Command(BaseCommand):
+    help = "Create users in bulk from a CSV or NDJSON file, reporting per-row errors."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('path', help="CSV (with header) or NDJSON file of users.")
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help="Defaults to the file extension.")
+        parser.add_argument('--workers', type=int, help="Password hashing processes.")
+        parser.add_argument('--batch-size', type=int, help="Rows per uniqueness check and insert.")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        fmt = options['format'] or detect_format(options['path'])
+        if fmt is None:
+            raise CommandError("Cannot tell the file format; pass --format csv or --format ndjson.")
+
+        importer = UserImporter(hash_workers=options['workers'], batch_size=options['batch_size'], processes=True)
+        start = time.monotonic()
+        try:
+            with open(options['path'], encoding='utf-8', newline='') as stream:
+                report = importer.run(iter_rows(stream, fmt))
+        except (OSError, ImportFormatError) as e:
+            raise CommandError(str(e))
+        elapsed = time.monotonic() - start
+
+        for error in report['errors']:
+            self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {report['created']} users, {report['failed']} rows failed "
+            f"in {elapsed:.2f}s ({report['created'] / elapsed if elapsed else 0:.1f} users/s)."
+        ))
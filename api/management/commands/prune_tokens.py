@@ -0,0 +1,20 @@
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from api.tokens import prune_expired_tokens, warm_blacklist_cache
+
+
+class Command(BaseCommand):
+    help = "Delete expired outstanding and blacklisted tokens in batches and warm the blacklist cache."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--batch-size', type=int, default=settings.TOKEN_PRUNE_BATCH_SIZE)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        deleted = prune_expired_tokens(batch_size=options['batch_size'])
+        cached = warm_blacklist_cache(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted} expired tokens; {cached} blacklisted tokens cached."
+        ))
@@ -0,0 +1,52 @@
+import signal
+import threading
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from api import jobs
+
+
+class Command(BaseCommand):
+    help = "Run the periodic background jobs registered in api.jobs until stopped."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--only', nargs='*', help="Run only the named jobs.")
+        parser.add_argument('--once', action='store_true', help="Run each job once and exit.")
+        parser.add_argument('--tick', type=float, default=1.0, help="Seconds between schedule checks.")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        selected = [job for name, job in jobs.registry.items() if not options['only'] or name in options['only']]
+        if not selected:
+            self.stderr.write("No matching jobs registered.")
+            return
+
+        if options['once']:
+            for job in selected:
+                job.run()
+            return
+
+        stopping = threading.Event()
+
+        def stop(signum: int, frame: Any) -> None:
+            stopping.set()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        self.stdout.write(f"Running jobs: {', '.join(job.name for job in selected)}")
+        while not stopping.is_set():
+            now = time.monotonic()
+            for job in selected:
+                if stopping.is_set():
+                    break
+                if job.next_run <= now:
+                    job.run()
+            time.sleep(options['tick'])
+
+        # Graceful shutdown: let jobs holding buffered state write it out
+        for job in selected:
+            if job.on_shutdown:
+                job.run()
+        self.stdout.write("Worker stopped.")
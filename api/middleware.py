@@ -0,0 +1,168 @@
+import gzip
+import hashlib
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.utils.cache import get_max_age, patch_vary_headers
+
+from .pooled_postgresql.base import PoolTimeout
+from .routers import choose_replica, is_pinned, pin_primary, release_replica, use_replica
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+
+def parse_accept_encoding(accept_encoding: str) -> Dict[str, float]:
+    """Map each content coding listed in an Accept-Encoding header to its quality."""
+    qualities: Dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value.strip())
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def _accepts(qualities: Dict[str, float], coding: str) -> float:
+    """Return the quality the client gives a coding; 0 means it is not acceptable."""
+    if coding in qualities:
+        return qualities[coding]
+    return qualities.get('*', 0.0)
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    """Compress a response body with the given content coding."""
+    if encoding == 'br':
+        return bytes(brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY))
+    # mtime=0 keeps the output deterministic so identical bodies compress identically
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli or gzip, negotiated through Accept-Encoding.
+
+    Responses served by the response cache (those carrying a ``max-age``) have
+    their compressed bytes stored in the cache alongside them, keyed by a digest
+    of the uncompressed body, so each cached payload is compressed only once.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def negotiate(self, request: HttpRequest) -> Optional[str]:
+        """Pick the best content coding the client accepts."""
+        qualities = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        codings = ('br', 'gzip') if brotli is not None else ('gzip',)
+        # Highest quality wins; on a tie the order above (brotli first) decides
+        best = max(codings, key=lambda coding: _accepts(qualities, coding))
+        return best if _accepts(qualities, best) > 0 else None
+
+    def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = self.negotiate(request)
+        if encoding is None:
+            return response
+
+        compressed = self._compressed_content(response, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _compressed_content(self, response: HttpResponse, encoding: str) -> bytes:
+        """Compress the body, reusing stored bytes for cached responses."""
+        max_age = get_max_age(response)
+        if not max_age:
+            return compress_body(response.content, encoding)
+
+        digest = hashlib.sha1(response.content).hexdigest()
+        cache_key = f"compressed_body_{encoding}_{digest}"
+        compressed: Any = cache.get(cache_key)
+        if compressed is None:
+            compressed = compress_body(response.content, encoding)
+            cache.set(cache_key, compressed, timeout=max_age)
+        return bytes(compressed)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Serve safe requests to the ``api`` views from a read replica.
+
+    Unsafe requests pin the client to the primary for a short window, and a
+    pinned client's reads stay on the primary until the window ends (see
+    ``api.routers``).
+    """
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        try:
+            response = self.get_response(request)
+        finally:
+            token = getattr(request, '_replica_token', None)
+            if token is not None:
+                release_replica(token)
+        if request.method not in self.SAFE_METHODS and response.status_code < 400:
+            pin_primary(request, response)
+        return response
+
+    def process_view(self, request: HttpRequest, view_func: Callable[..., Any], view_args: Any, view_kwargs: Any) -> None:
+        if not settings.REPLICA_DATABASES or request.method not in self.SAFE_METHODS:
+            return None
+        # Only DRF views of this app; the admin and other apps keep reading the primary
+        if not hasattr(view_func, 'cls') or not view_func.__module__.startswith('api.'):
+            return None
+        if not is_pinned(request):
+            setattr(request, '_replica_token', use_replica(choose_replica()))
+        return None
+
+
+
+class PoolTimeoutMiddleware:
+    """Answer 503 with ``Retry-After`` when no pooled database connection frees up in time."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        return self.get_response(request)
+
+    def process_exception(self, request: HttpRequest, exception: Exception) -> Optional[HttpResponse]:
+        if not isinstance(exception, PoolTimeout):
+            return None
+        response = JsonResponse({'detail': 'The service is busy, please retry shortly.'}, status=503)
+        response['Retry-After'] = '1'
+        return response
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Index token_blacklist_outstandingtoken.expires_at so batched pruning seeks instead of scanning."""
+
+    dependencies = [
+        ('api', '0003_activity'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS api_outstandingtoken_expires_at_idx '
+                'ON token_blacklist_outstandingtoken (expires_at)',
+            reverse_sql='DROP INDEX IF EXISTS api_outstandingtoken_expires_at_idx',
+        ),
+    ]
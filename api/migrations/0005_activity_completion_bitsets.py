@@ -0,0 +1,52 @@
+from django.db import migrations, models
+
+
+def assign_positions(apps, schema_editor):
+    """Give existing activities consecutive bit positions within their course."""
+    Course = apps.get_model('api', 'Course')
+    Activity = apps.get_model('api', 'Activity')
+    for course in Course.objects.all():
+        activities = list(
+            Activity.objects.filter(module__course=course).order_by('module__order', 'order', 'id')
+        )
+        for position, activity in enumerate(activities):
+            activity.position = position
+        Activity.objects.bulk_update(activities, ['position'])
+        course.activity_slots = len(activities)
+        course.save(update_fields=['activity_slots'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_outstandingtoken_expires_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='activity_slots',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of activity completion bit positions handed out'),
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='position',
+            field=models.PositiveIntegerField(editable=False, null=True, help_text='Stable bit position of the activity in enrollment completion bitsets'),
+        ),
+        migrations.RunPython(assign_positions, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='activity',
+            name='position',
+            field=models.PositiveIntegerField(editable=False, help_text='Stable bit position of the activity in enrollment completion bitsets'),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='completed_activities',
+            field=models.BinaryField(default=b'', help_text='Bitset of completed activities, indexed by activity position'),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='completed_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of bits set in completed_activities'),
+        ),
+    ]
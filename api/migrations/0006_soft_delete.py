@@ -0,0 +1,29 @@
+# Generated by Django 4.2.10 on 2026-10-19 07:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0005_activity_completion_bitsets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, help_text='When the course was deleted; its rows are purged in the background', null=True),
+        ),
+        migrations.CreateModel(
+            name='AccountDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('requested_at', models.DateTimeField(auto_now_add=True, help_text='When the deletion was requested')),
+                ('user', models.OneToOneField(help_text='User whose account is being deleted', on_delete=django.db.models.deletion.CASCADE, related_name='account_deletion', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
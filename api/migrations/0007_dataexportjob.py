@@ -0,0 +1,33 @@
+# Generated by Django 4.2.10 on 2026-10-19 07:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0006_soft_delete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PEN', 'Pending'), ('RUN', 'Running'), ('COM', 'Completed'), ('FAI', 'Failed'), ('EXP', 'Expired')], default='PEN', help_text='Current state of the export', max_length=3)),
+                ('file_name', models.CharField(blank=True, help_text='Archive file name inside DATA_EXPORT_DIR', max_length=255)),
+                ('size', models.PositiveBigIntegerField(default=0, help_text='Archive size in bytes')),
+                ('error', models.TextField(blank=True, help_text='Why the export failed')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='When the export was requested')),
+                ('finished_at', models.DateTimeField(blank=True, help_text='When the export completed or failed', null=True)),
+                ('user', models.ForeignKey(help_text='User whose data is exported', on_delete=django.db.models.deletion.CASCADE, related_name='data_exports', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='api_dataexp_status_cdb613_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.10 on 2026-10-19 08:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Index the filter and ordering columns of the hot list, detail and login queries."""
+
+    dependencies = [
+        ('api', '0007_dataexportjob'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['module', 'order'], name='api_activity_module_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(condition=models.Q(('is_featured', True)), fields=['deleted_at', '-created_at'], name='api_course_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['user', '-enrolled_at'], name='api_enroll_user_enrolled_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['course', 'status'], name='api_enroll_course_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='module',
+            index=models.Index(fields=['course', 'order'], name='api_module_course_order_idx'),
+        ),
+        # LoginView looks users up by email; auth_user belongs to django.contrib.auth
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS api_user_email_idx ON auth_user (email)',
+            reverse_sql='DROP INDEX IF EXISTS api_user_email_idx',
+        ),
+    ]
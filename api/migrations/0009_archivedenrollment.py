@@ -0,0 +1,34 @@
+# Generated by Django 4.2.10 on 2026-10-19 08:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0008_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedEnrollment',
+            fields=[
+                ('id', models.BigIntegerField(help_text='Id the enrollment had before it was archived', primary_key=True, serialize=False)),
+                ('enrolled_at', models.DateTimeField(help_text='When the user enrolled in the course')),
+                ('status', models.CharField(choices=[('ACT', 'Active'), ('COM', 'Completed'), ('PAU', 'Paused'), ('DRO', 'Dropped')], help_text='Status of the enrollment when it was archived', max_length=3)),
+                ('completion_percentage', models.IntegerField(help_text='Percentage of course completion (0-100)')),
+                ('completed_activities', models.BinaryField(default=b'', help_text='Bitset of completed activities, indexed by activity position')),
+                ('completed_count', models.PositiveIntegerField(default=0, help_text='Number of bits set in completed_activities')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, help_text='When the enrollment was archived')),
+                ('course', models.ForeignKey(help_text='Course that the user was enrolled in', on_delete=django.db.models.deletion.CASCADE, related_name='archived_enrollments', to='api.course')),
+                ('user', models.ForeignKey(help_text='User who was enrolled in the course', on_delete=django.db.models.deletion.CASCADE, related_name='archived_enrollments', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-enrolled_at'],
+                'indexes': [models.Index(fields=['user', '-enrolled_at'], name='api_archived_user_enrolled_idx')],
+            },
+        ),
+    ]
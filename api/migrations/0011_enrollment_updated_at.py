@@ -0,0 +1,26 @@
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def backfill_updated_at(apps, schema_editor):
+    """Existing enrollments were last known to change when they were created."""
+    Enrollment = apps.get_model('api', 'Enrollment')
+    Enrollment.objects.update(updated_at=F('enrolled_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_token_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, help_text='When the enrollment was last written, directly or by a flushed progress report'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.10 on 2026-10-19 09:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_enrollment_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataexportjob',
+            name='started_at',
+            field=models.DateTimeField(blank=True, help_text='When a worker claimed the export', null=True),
+        ),
+    ]
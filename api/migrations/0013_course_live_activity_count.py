@@ -0,0 +1,42 @@
+# Generated by Django 4.2.10 on 2026-10-19 09:53
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_live_activities(apps, schema_editor):
+    """Count each course's activities and drop bits of activities deleted before counts were kept."""
+    Course = apps.get_model('api', 'Course')
+    Activity = apps.get_model('api', 'Activity')
+    Enrollment = apps.get_model('api', 'Enrollment')
+    for course in Course.objects.annotate(total=Count('modules__activities')):
+        course.live_activity_count = course.total
+        course.save(update_fields=['live_activity_count'])
+        live = set(Activity.objects.filter(module__course=course).values_list('position', flat=True))
+        enrollments = []
+        for enrollment in Enrollment.objects.filter(course=course, completed_count__gt=0):
+            bits = bytearray(bytes(enrollment.completed_activities))
+            for index, byte in enumerate(bits):
+                for offset in range(8):
+                    if byte & (1 << offset) and index * 8 + offset not in live:
+                        bits[index] &= ~(1 << offset)
+            enrollment.completed_activities = bytes(bits)
+            enrollment.completed_count = sum(bin(byte).count('1') for byte in bits)
+            enrollments.append(enrollment)
+        Enrollment.objects.bulk_update(enrollments, ['completed_activities', 'completed_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_dataexportjob_started_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='live_activity_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of activities in the course, the denominator of completion percentages'),
+        ),
+        migrations.RunPython(count_live_activities, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,16 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Q
 from django.contrib.auth.models import User
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator, MaxValueValidator
-from typing import Any, Optional, List
+from typing import Any, Optional, List, cast
+
+
+class LiveCourseManager(models.Manager['Course']):
+    """Manager that hides soft-deleted courses."""
+
+    def get_queryset(self) -> 'models.QuerySet[Course]':
+        return super().get_queryset().filter(deleted_at__isnull=True)
 
 
 class Course(models.Model):
@@ -48,13 +56,66 @@ class Course(models.Model):
         auto_now=True,
         help_text=_("When the course was last updated")
     )
+    activity_slots: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text=_("Number of activity completion bit positions handed out")
+    )
+    live_activity_count: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text=_("Number of activities in the course, the denominator of completion percentages")
+    )
+    
+    deleted_at: models.DateTimeField = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text=_("When the course was deleted; its rows are purged in the background")
+    )
+    
+    objects = LiveCourseManager()
+    all_objects: 'models.Manager[Course]' = models.Manager()
+    
+    class Meta:
+        indexes = [
+            # Covers only the featured courses, newest first, which the homepage lists
+            models.Index(
+                fields=['deleted_at', '-created_at'],
+                name='api_course_featured_idx',
+                condition=Q(is_featured=True),
+            ),
+        ]
     
     def __str__(self) -> str:
         return str(self.title)
     
+    @classmethod
+    def allocate_activity_positions(cls, course_id: int, count: int = 1) -> int:
+        """
+        Reserve ``count`` consecutive completion bit positions in a course.
+        
+        Returns the first reserved position. Positions are never reused, so
+        an activity keeps its bit for the lifetime of the course.
+        """
+        with transaction.atomic():
+            cls.objects.filter(pk=course_id).update(activity_slots=F('activity_slots') + count)
+            slots: int = cls.objects.filter(pk=course_id).values_list('activity_slots', flat=True).get()
+        return slots - count
+    
+    @classmethod
+    def count_activities(cls, course_id: int, delta: int) -> None:
+        """Adjust the live activity count of a course by ``delta``."""
+        cls.all_objects.filter(pk=course_id).update(live_activity_count=F('live_activity_count') + delta)
+    
     @property
     def enrollment_count(self) -> int:
         """Get the number of enrollments for this course."""
+        # Use the count annotated by the queryset, if any, to avoid a COUNT query
+        annotated = self.__dict__.get('num_enrollments')
+        if annotated is not None:
+            return int(annotated)
         enrollments = getattr(self, 'enrollments', None)
         if enrollments is not None:
             count: int = enrollments.count()
@@ -62,6 +123,38 @@ class Course(models.Model):
         return 0
 
 
+class EnrollmentQuerySet(models.QuerySet):
+    """Custom queryset for Enrollment."""
+
+    # Columns read by EnrollmentListSerializer
+    LIST_FIELDS = (
+        'id', 'enrolled_at', 'status', 'completion_percentage',
+        'user', 'user__id', 'user__username', 'user__email',
+        'course', 'course__id', 'course__title',
+    )
+
+    def for_list(self) -> 'EnrollmentQuerySet':
+        """Join user and course and load only the columns list endpoints render."""
+        return self.select_related('user', 'course').only(*self.LIST_FIELDS)
+
+    def of_live_accounts(self) -> 'EnrollmentQuerySet':
+        """Leave out enrollments of accounts awaiting deletion."""
+        return self.filter(user__account_deletion__isnull=True)
+
+
+class LiveEnrollmentManager(models.Manager.from_queryset(EnrollmentQuerySet)):  # type: ignore[misc]
+    """
+    Manager that hides enrollments of deleted courses.
+
+    Enrollments of deleted accounts are not hidden here, which would join
+    ``api_accountdeletion`` into every enrollment query; listings that can
+    show other users' enrollments use ``of_live_accounts()``.
+    """
+
+    def get_queryset(self) -> EnrollmentQuerySet:
+        return cast(EnrollmentQuerySet, super().get_queryset().filter(course__deleted_at__isnull=True))
+
+
 class Enrollment(models.Model):
     """Enrollment model representing a user enrolled in a course."""
     
@@ -71,18 +164,21 @@ class Enrollment(models.Model):
         PAUSED = 'PAU', _('Paused')
         DROPPED = 'DRO', _('Dropped')
     
+    id: int
     user: models.ForeignKey = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name='enrollments',
         help_text=_("User enrolled in the course")
     )
+    user_id: int
     course: models.ForeignKey = models.ForeignKey(
         Course,
         on_delete=models.CASCADE,
         related_name='enrollments',
         help_text=_("Course that the user is enrolled in")
     )
+    course_id: int
     enrolled_at: models.DateTimeField = models.DateTimeField(
         auto_now_add=True,
         help_text=_("When the user enrolled in the course")
@@ -98,15 +194,99 @@ class Enrollment(models.Model):
         validators=[MinValueValidator(0), MaxValueValidator(100)],
         help_text=_("Percentage of course completion (0-100)")
     )
+    completed_activities: models.BinaryField = models.BinaryField(
+        default=b'',
+        help_text=_("Bitset of completed activities, indexed by activity position")
+    )
+    completed_count: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0,
+        help_text=_("Number of bits set in completed_activities")
+    )
+    updated_at: models.DateTimeField = models.DateTimeField(
+        auto_now=True,
+        help_text=_("When the enrollment was last written, directly or by a flushed progress report")
+    )
+    
+    objects = LiveEnrollmentManager()
+    all_objects = EnrollmentQuerySet.as_manager()
     
     class Meta:
         unique_together = ['user', 'course']
         ordering = ['-enrolled_at']
+        indexes = [
+            models.Index(fields=['user', '-enrolled_at'], name='api_enroll_user_enrolled_idx'),
+            models.Index(fields=['course', 'status'], name='api_enroll_course_status_idx'),
+        ]
     
     def __str__(self) -> str:
         return f"{self.user.username} - {self.course.title}"
 
 
+class ArchivedEnrollment(models.Model):
+    """
+    Finished enrollment moved out of ``api_enrollment`` by the archival job.
+    
+    Keeps the id and columns the enrollment had, so the hot table only holds
+    enrollments that are in progress or recently finished.
+    """
+    
+    id: models.BigIntegerField = models.BigIntegerField(
+        primary_key=True,
+        help_text=_("Id the enrollment had before it was archived")
+    )
+    user: models.ForeignKey = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_enrollments',
+        help_text=_("User who was enrolled in the course")
+    )
+    course: models.ForeignKey = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='archived_enrollments',
+        help_text=_("Course that the user was enrolled in")
+    )
+    enrolled_at: models.DateTimeField = models.DateTimeField(
+        help_text=_("When the user enrolled in the course")
+    )
+    status: models.CharField = models.CharField(
+        max_length=3,
+        choices=Enrollment.StatusChoices.choices,
+        help_text=_("Status of the enrollment when it was archived")
+    )
+    completion_percentage: models.IntegerField = models.IntegerField(
+        help_text=_("Percentage of course completion (0-100)")
+    )
+    completed_activities: models.BinaryField = models.BinaryField(
+        default=b'',
+        help_text=_("Bitset of completed activities, indexed by activity position")
+    )
+    completed_count: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0,
+        help_text=_("Number of bits set in completed_activities")
+    )
+    archived_at: models.DateTimeField = models.DateTimeField(
+        auto_now_add=True,
+        help_text=_("When the enrollment was archived")
+    )
+    
+    objects = EnrollmentQuerySet.as_manager()
+    
+    class Meta:
+        ordering = ['-enrolled_at']
+        indexes = [models.Index(fields=['user', '-enrolled_at'], name='api_archived_user_enrolled_idx')]
+    
+    def __str__(self) -> str:
+        return f"{self.user.username} - {self.course.title} (archived)"
+
+
+class LiveModuleManager(models.Manager['Module']):
+    """Manager that hides modules of soft-deleted courses."""
+
+    def get_queryset(self) -> 'models.QuerySet[Module]':
+        return super().get_queryset().filter(course__deleted_at__isnull=True)
+
+
 class Module(models.Model):
     """Module model representing a section of a course."""
     
@@ -116,6 +296,8 @@ class Module(models.Model):
         related_name='modules',
         help_text=_("Course that this module belongs to")
     )
+    course_id: int
+    _loaded_course_id: Optional[int]
     title: models.CharField = models.CharField(
         max_length=255,
         help_text=_("Title of the module")
@@ -136,15 +318,58 @@ class Module(models.Model):
         help_text=_("When the module was last updated")
     )
     
+    objects = LiveModuleManager()
+    all_objects: 'models.Manager[Module]' = models.Manager()
+    
     class Meta:
         ordering = ['course', 'order']
+        indexes = [models.Index(fields=['course', 'order'], name='api_module_course_order_idx')]
     
     def __str__(self) -> str:
         return f"{self.course.title} - {self.title}"
     
+    @classmethod
+    def from_db(cls, db: Any, field_names: Any, values: Any) -> 'Module':
+        instance = super().from_db(db, field_names, values)
+        # Remembered so save() can tell when the module moves to another course
+        instance._loaded_course_id = instance.__dict__.get('course_id')
+        return instance
+    
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Save the module; moving it to another course moves its activities' completion bits.
+        
+        The activities get new positions in the new course, and their old bits
+        are cleared from the old course's enrollments.
+        """
+        from .completion import retire_positions  # completion imports this module
+        retired = None
+        with transaction.atomic():
+            loaded_course_id = getattr(self, '_loaded_course_id', None)
+            if not self._state.adding and loaded_course_id is not None and loaded_course_id != self.course_id:
+                activities = list(
+                    Activity.all_objects.filter(module_id=self.pk).order_by('position').only('id', 'position')
+                )
+                if activities:
+                    retired = (loaded_course_id, [activity.position for activity in activities])
+                    first = Course.allocate_activity_positions(self.course_id, len(activities))
+                    for offset, activity in enumerate(activities):
+                        activity.position = first + offset
+                    Activity.all_objects.bulk_update(activities, ['position'])
+                    Course.count_activities(self.course_id, len(activities))
+                    Course.count_activities(loaded_course_id, -len(activities))
+            super().save(*args, **kwargs)
+        self._loaded_course_id = self.course_id
+        if retired is not None:
+            retire_positions(*retired)
+    
     @property
     def activity_count(self) -> int:
         """Get the number of activities in this module."""
+        # Use the count annotated by the queryset, if any, to avoid a COUNT query
+        annotated = self.__dict__.get('num_activities')
+        if annotated is not None:
+            return int(annotated)
         activities = getattr(self, 'activities', None)
         if activities is not None:
             count: int = activities.count()
@@ -152,6 +377,13 @@ class Module(models.Model):
         return 0
 
 
+class LiveActivityManager(models.Manager['Activity']):
+    """Manager that hides activities of soft-deleted courses."""
+
+    def get_queryset(self) -> 'models.QuerySet[Activity]':
+        return super().get_queryset().filter(module__course__deleted_at__isnull=True)
+
+
 class Activity(models.Model):
     """Activity model representing a learning activity within a module."""
     
@@ -166,6 +398,8 @@ class Activity(models.Model):
         related_name='activities',
         help_text=_("Module that this activity belongs to")
     )
+    module_id: int
+    _loaded_module_id: Optional[int]
     title: models.CharField = models.CharField(
         max_length=255,
         help_text=_("Title of the activity")
@@ -187,6 +421,10 @@ class Activity(models.Model):
         default=0,
         help_text=_("Order of the activity within the module")
     )
+    position: models.PositiveIntegerField = models.PositiveIntegerField(
+        editable=False,
+        help_text=_("Stable bit position of the activity in enrollment completion bitsets")
+    )
     created_at: models.DateTimeField = models.DateTimeField(
         auto_now_add=True,
         help_text=_("When the activity was created")
@@ -196,9 +434,159 @@ class Activity(models.Model):
         help_text=_("When the activity was last updated")
     )
     
+    objects = LiveActivityManager()
+    all_objects: 'models.Manager[Activity]' = models.Manager()
+    
     class Meta:
         ordering = ['module', 'order']
+        indexes = [models.Index(fields=['module', 'order'], name='api_activity_module_order_idx')]
         verbose_name_plural = 'activities'
     
     def __str__(self) -> str:
-        return f"{self.module.title} - {self.title}"
\ No newline at end of file
+        return f"{self.module.title} - {self.title}"
+    
+    @classmethod
+    def from_db(cls, db: Any, field_names: Any, values: Any) -> 'Activity':
+        instance = super().from_db(db, field_names, values)
+        # Remembered so save() can tell when the activity moves to another module
+        instance._loaded_module_id = instance.__dict__.get('module_id')
+        return instance
+    
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Assign a completion bit position to new activities and count them in their course.
+        
+        An activity moved to a module of another course gets a new position
+        there, and its old bit is cleared from the old course's enrollments.
+        """
+        from .completion import retire_positions  # completion imports this module
+        retired = None
+        with transaction.atomic():
+            course_id = self.module.course_id
+            loaded_module_id = getattr(self, '_loaded_module_id', None)
+            if self._state.adding:
+                if self.position is None:
+                    self.position = Course.allocate_activity_positions(course_id)
+                Course.count_activities(course_id, 1)
+            elif loaded_module_id is not None and loaded_module_id != self.module_id:
+                old_course_id = Module.all_objects.filter(pk=loaded_module_id).values_list('course_id', flat=True).get()
+                if old_course_id != course_id:
+                    retired = (old_course_id, self.position)
+                    self.position = Course.allocate_activity_positions(course_id)
+                    Course.count_activities(course_id, 1)
+                    Course.count_activities(old_course_id, -1)
+                    if kwargs.get('update_fields') is not None:
+                        kwargs['update_fields'] = {*kwargs['update_fields'], 'position'}
+            super().save(*args, **kwargs)
+        self._loaded_module_id = self.module_id
+        if retired is not None:
+            retire_positions(retired[0], [retired[1]])
+
+
+class AccountDeletion(models.Model):
+    """
+    A user account marked for deletion.
+    
+    The account is deactivated when this row is created and hidden from every
+    queryset; the user and their data are purged later by a background job.
+    """
+    
+    user: models.OneToOneField = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='account_deletion',
+        help_text=_("User whose account is being deleted")
+    )
+    user_id: int
+    requested_at: models.DateTimeField = models.DateTimeField(
+        auto_now_add=True,
+        help_text=_("When the deletion was requested")
+    )
+    
+    def __str__(self) -> str:
+        return f"Deletion of user {self.user_id}"
+
+
+class TokenVersion(models.Model):
+    """
+    Version of the role and staff claims embedded in a user's tokens.
+    
+    Bumped whenever those claims may have changed. Tokens carrying another
+    version are not trusted; ``api.tokens`` reads it through the cache.
+    """
+    
+    user: models.OneToOneField = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='token_version',
+        help_text=_("User whose tokens carry this version")
+    )
+    version: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0,
+        help_text=_("Current claims version; 0 until first bumped")
+    )
+    
+    def __str__(self) -> str:
+        return f"Token version {self.version} of user {self.pk}"
+
+
+class DataExportJob(models.Model):
+    """A personal-data export built in the background and downloaded as a zip archive."""
+    
+    class StatusChoices(models.TextChoices):
+        PENDING = 'PEN', _('Pending')
+        RUNNING = 'RUN', _('Running')
+        COMPLETED = 'COM', _('Completed')
+        FAILED = 'FAI', _('Failed')
+        EXPIRED = 'EXP', _('Expired')
+    
+    ACTIVE_STATUSES = (StatusChoices.PENDING, StatusChoices.RUNNING)
+    
+    user: models.ForeignKey = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='data_exports',
+        help_text=_("User whose data is exported")
+    )
+    user_id: int
+    status: models.CharField = models.CharField(
+        max_length=3,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDING,
+        help_text=_("Current state of the export")
+    )
+    file_name: models.CharField = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text=_("Archive file name inside DATA_EXPORT_DIR")
+    )
+    size: models.PositiveBigIntegerField = models.PositiveBigIntegerField(
+        default=0,
+        help_text=_("Archive size in bytes")
+    )
+    error: models.TextField = models.TextField(
+        blank=True,
+        help_text=_("Why the export failed")
+    )
+    created_at: models.DateTimeField = models.DateTimeField(
+        auto_now_add=True,
+        help_text=_("When the export was requested")
+    )
+    started_at: models.DateTimeField = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("When a worker claimed the export")
+    )
+    finished_at: models.DateTimeField = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("When the export completed or failed")
+    )
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['status', 'created_at'])]
+    
+    def __str__(self) -> str:
+        return f"Export {self.pk} for user {self.user_id} ({self.status})"
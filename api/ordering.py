@@ -0,0 +1,79 @@
+"""
+Gap-based ordering for modules and activities.
+
+Siblings are spaced ``ORDER_GAP`` apart, so moving one item only rewrites its
+own ``order`` to the midpoint between its new neighbours. When two neighbours
+have no integer left between them the siblings are rebalanced with a single
+``bulk_update``.
+"""
+from typing import List, Optional
+
+from django.db import transaction
+from django.db.models import QuerySet
+
+ORDER_GAP = 1024
+
+
+class OrderingError(ValueError):
+    """Raised when a reorder request does not match the siblings being ordered."""
+
+
+def apply_ordering(siblings: QuerySet, ids: List[int]) -> int:
+    """
+    Order ``siblings`` as listed in ``ids`` and return the number of rows written.
+
+    ``ids`` must name every sibling exactly once.
+    """
+    items = {item.pk: item for item in siblings.only('id', 'order')}
+    if len(ids) != len(items) or set(ids) != set(items):
+        raise OrderingError("The ordering must list every item exactly once.")
+
+    changed = []
+    for index, item_id in enumerate(ids):
+        item = items[item_id]
+        order = (index + 1) * ORDER_GAP
+        if item.order != order:
+            item.order = order
+            changed.append(item)
+    siblings.model.objects.bulk_update(changed, ['order'])
+    return len(changed)
+
+
+def move_item(siblings: QuerySet, item_id: int, before: Optional[int] = None,
+              after: Optional[int] = None) -> int:
+    """
+    Move one item directly before or after a sibling, or to the top if neither is given.
+
+    Returns the number of rows written: one unless the gap between the new
+    neighbours is exhausted and the siblings had to be rebalanced.
+    """
+    with transaction.atomic():
+        try:
+            item = siblings.select_for_update().only('id', 'order').get(pk=item_id)
+            others = siblings.exclude(pk=item_id).order_by('order', 'id')
+            if after is not None:
+                lower: int = others.values_list('order', flat=True).get(pk=after)
+                upper = others.exclude(pk=after).filter(order__gte=lower).values_list('order', flat=True).first()
+            elif before is not None:
+                upper = others.values_list('order', flat=True).get(pk=before)
+                lower = others.exclude(pk=before).filter(order__lte=upper).order_by('-order', '-id') \
+                    .values_list('order', flat=True).first() or 0
+            else:
+                lower, upper = 0, others.values_list('order', flat=True).first()
+        except siblings.model.DoesNotExist:
+            raise OrderingError("Items must belong to the same parent.")
+
+        if upper is None:
+            item.order = lower + ORDER_GAP
+        elif upper - lower > 1:
+            item.order = (lower + upper) // 2
+        else:
+            # No room between the neighbours: respace every sibling
+            ids = list(others.values_list('id', flat=True))
+            anchor = after if after is not None else before
+            index = 0 if anchor is None else ids.index(anchor) + (1 if after is not None else 0)
+            ids.insert(index, item_id)
+            return apply_ordering(siblings, ids)
+
+        item.save(update_fields=['order'])
+        return 1
@@ -18,8 +18,9 @@ class IsOwnerOrAdmin(permissions.BasePermission):
         if hasattr(obj, 'id') and request.user.id == obj.id:
             return True
             
-        if hasattr(obj, 'user'):
-            return obj.user == request.user
+        # Compare ids so token-backed users are never loaded from the database
+        if hasattr(obj, 'user_id'):
+            return bool(obj.user_id == request.user.id)
             
         return False
         
@@ -60,7 +61,7 @@ class IsEnrolledOrAdmin(permissions.BasePermission):
             return True
             
         # Check if the enrollment belongs to the user
-        if hasattr(obj, 'user'):
-            return obj.user == request.user
+        if hasattr(obj, 'user_id'):
+            return bool(obj.user_id == request.user.id)
             
         return False
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""
+PostgreSQL backend that reuses connections from an in-process pool.
+
+Enabled with ``DB_POOL_MAX_SIZE``. Each process keeps up to that many open
+connections per database and shares them between its threads. Django still
+"closes" its connection at the end of every request (``CONN_MAX_AGE`` is 0
+with the pool), which hands it back to the pool instead of tearing down the
+TLS session. Connections that come back broken or mid-transaction are
+discarded, and an idle connection is pinged on checkout because the server
+may have dropped it while it sat in the pool. When every connection is in use
+a request waits up to ``DB_POOL_TIMEOUT`` seconds for one, then fails with
+``PoolTimeout``, which ``api.middleware.PoolTimeoutMiddleware`` turns into a
+503. Requires psycopg2.
+"""
+import threading
+from typing import Any, Dict, Optional
+
+import psycopg2.extensions
+import psycopg2.extras
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from psycopg2.pool import ThreadedConnectionPool
+
+_pools: Dict[str, 'CountingConnectionPool'] = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(Exception):
+    """No pooled connection became free within ``DB_POOL_TIMEOUT`` seconds."""
+
+
+def is_alive(connection: Any) -> bool:
+    """Ping an idle connection; ``closed`` only changes after a query has failed."""
+    if connection.closed:
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        if connection.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            connection.rollback()
+    except psycopg2.Error:
+        return False
+    return True
+
+
+class CountingConnectionPool(ThreadedConnectionPool):
+    """Thread-safe pool that counts the connections it opens and lets callers wait for one."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.opened = 0
+        super().__init__(*args, **kwargs)
+        # psycopg2 raises PoolError when exhausted; the semaphore makes callers queue instead
+        self._slots = threading.BoundedSemaphore(self.maxconn)
+
+    def checkout(self, timeout: float) -> Any:
+        """Return a live connection, waiting up to ``timeout`` seconds for a free one."""
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolTimeout(f"No database connection became free within {timeout} seconds.")
+        try:
+            # After a database restart every idle connection may be dead
+            for _ in range(self.maxconn):
+                opened = self.opened
+                connection = self.getconn()
+                if self.opened != opened or is_alive(connection):
+                    return connection
+                self.putconn(connection, close=True)
+            return self.getconn()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def checkin(self, connection: Any, close: bool = False) -> None:
+        """Hand a connection from ``checkout`` back, discarding it when ``close`` is set."""
+        try:
+            self.putconn(connection, close=close)
+        finally:
+            self._slots.release()
+
+    def _connect(self, key: Any = None) -> Any:
+        self.opened += 1
+        return super()._connect(key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'opened': self.opened,
+                'idle': len(self._pool),
+                'in_use': len(self._used),
+                'max_size': self.maxconn,
+            }
+
+
+def get_pool(alias: str, conn_params: Dict[str, Any]) -> CountingConnectionPool:
+    """Return the process-wide pool for a database alias, creating it on first use."""
+    with _pools_lock:
+        if alias not in _pools:
+            _pools[alias] = CountingConnectionPool(settings.DB_POOL_MIN_SIZE, settings.DB_POOL_MAX_SIZE, **conn_params)
+        return _pools[alias]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL wrapper that checks connections out of a pool and returns them on close."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        if self.settings_dict['CONN_MAX_AGE'] != 0:
+            raise ImproperlyConfigured("The pooled PostgreSQL backend requires CONN_MAX_AGE = 0.")
+
+    def get_new_connection(self, conn_params: Dict[str, Any]) -> Any:
+        pool = get_pool(self.alias, conn_params)
+        connection = pool.checkout(settings.DB_POOL_TIMEOUT)
+
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        if isolation_level is None:
+            self.isolation_level = IsolationLevel.READ_COMMITTED
+        else:
+            self.isolation_level = IsolationLevel(isolation_level)
+            connection.isolation_level = self.isolation_level
+        # Same as the stock backend: skip psycopg2's JSON decoding for JSONField
+        psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+        return connection
+
+    def _close(self) -> None:
+        if self.connection is None:
+            return
+        connection = self.connection
+        broken = bool(connection.closed)
+        if not broken:
+            try:
+                if connection.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+                broken = connection.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE
+            except psycopg2.Error:
+                broken = True
+        with self.wrap_database_errors:
+            _pools[self.alias].checkin(connection, close=broken)
+
+    def pool_stats(self) -> Optional[Dict[str, int]]:
+        """Counters of this process's pool for the alias, or None before first use."""
+        pool = _pools.get(self.alias)
+        return pool.stats() if pool is not None else None
@@ -0,0 +1,203 @@
+"""
+Write-behind buffer for enrollment progress reports.
+
+Players report ``completion_percentage`` every few seconds. Instead of an
+``UPDATE`` per report, the latest value per enrollment is kept in a Redis hash
+and written to the database in periodic ``bulk_update`` batches by the
+``flush_progress`` job. Reads overlay the buffered value, so clients always
+see their latest report.
+
+Flushing first moves the live hash to a separate "flushing" key and deletes it
+only after the database write succeeds; a failed or interrupted flush is
+retried from that key on the next run, before any newer values.
+
+Each report carries the time it was made. A flush only writes a row whose
+``updated_at`` is older than the report, so a direct write (PATCH, batch
+update, completions) that lands between buffering and flushing is never
+overwritten by the older buffered value.
+
+Without a Redis cache backend (local development, tests) the buffer lives in
+process memory and is flushed from the request path and at interpreter exit.
+"""
+import atexit
+import threading
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple, Union
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Case, Q, Value, When
+
+from .models import Enrollment
+from .utils import batched
+
+BUFFER_KEY = 'progress_buffer'
+FLUSHING_KEY = 'progress_buffer:flushing'
+
+# enrollment id -> (user id, completion percentage, reported at as a Unix timestamp)
+Entry = Tuple[int, int, float]
+Entries = Dict[int, Entry]
+
+
+class RedisProgressStore:
+    """Progress buffer kept in Redis hashes shared by every process."""
+
+    def __init__(self) -> None:
+        from django_redis import get_redis_connection
+
+        self.connection = get_redis_connection('default')
+
+    def put(self, enrollment_id: int, entry: Entry) -> None:
+        self.connection.hset(BUFFER_KEY, str(enrollment_id), ':'.join(str(value) for value in entry))
+
+    def get_many(self, enrollment_ids: List[int]) -> Entries:
+        fields = [str(enrollment_id) for enrollment_id in enrollment_ids]
+        pipe = self.connection.pipeline(transaction=False)
+        pipe.hmget(BUFFER_KEY, fields)
+        pipe.hmget(FLUSHING_KEY, fields)
+        live, flushing = pipe.execute()
+        entries: Entries = {}
+        for enrollment_id, value, pending in zip(enrollment_ids, live, flushing):
+            # Values in the live hash are newer than those being flushed
+            if value is not None or pending is not None:
+                entries[enrollment_id] = self._decode(value if value is not None else pending)
+        return entries
+
+    def discard(self, enrollment_ids: Iterable[int]) -> None:
+        fields = [str(enrollment_id) for enrollment_id in enrollment_ids]
+        if fields:
+            pipe = self.connection.pipeline(transaction=False)
+            pipe.hdel(BUFFER_KEY, *fields)
+            pipe.hdel(FLUSHING_KEY, *fields)
+            pipe.execute()
+
+    def take(self) -> Entries:
+        if not self.connection.exists(FLUSHING_KEY):
+            # RENAMENX is atomic: reports arriving after it start a new live hash
+            if not self.connection.exists(BUFFER_KEY) or not self.connection.renamenx(BUFFER_KEY, FLUSHING_KEY):
+                return {}
+        return {
+            int(enrollment_id): self._decode(value)
+            for enrollment_id, value in self.connection.hgetall(FLUSHING_KEY).items()
+        }
+
+    def done(self) -> None:
+        self.connection.delete(FLUSHING_KEY)
+
+    @staticmethod
+    def _decode(value: bytes) -> Entry:
+        user_id, percentage, reported_at = value.decode().split(':')
+        return int(user_id), int(percentage), float(reported_at)
+
+
+class LocalProgressStore:
+    """Progress buffer kept in process memory, for single-process deployments."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.buffer: Entries = {}
+        self.flushing: Entries = {}
+        self.last_flush = time.monotonic()
+
+    def put(self, enrollment_id: int, entry: Entry) -> None:
+        with self.lock:
+            self.buffer[enrollment_id] = entry
+
+    def get_many(self, enrollment_ids: List[int]) -> Entries:
+        with self.lock:
+            entries: Entries = {}
+            for enrollment_id in enrollment_ids:
+                entry = self.buffer.get(enrollment_id) or self.flushing.get(enrollment_id)
+                if entry is not None:
+                    entries[enrollment_id] = entry
+            return entries
+
+    def discard(self, enrollment_ids: Iterable[int]) -> None:
+        with self.lock:
+            for enrollment_id in enrollment_ids:
+                self.buffer.pop(enrollment_id, None)
+                self.flushing.pop(enrollment_id, None)
+
+    def take(self) -> Entries:
+        with self.lock:
+            self.last_flush = time.monotonic()
+            if not self.flushing:
+                self.flushing, self.buffer = self.buffer, {}
+            return dict(self.flushing)
+
+    def done(self) -> None:
+        with self.lock:
+            self.flushing = {}
+
+    def is_due(self) -> bool:
+        return bool(time.monotonic() - self.last_flush >= settings.PROGRESS_FLUSH_INTERVAL)
+
+
+@lru_cache(maxsize=None)
+def get_progress_store() -> Union[RedisProgressStore, LocalProgressStore]:
+    """Return the buffer store matching the configured cache backend."""
+    if settings.CACHES['default']['BACKEND'].startswith('django_redis.'):
+        return RedisProgressStore()
+    store = LocalProgressStore()
+    atexit.register(flush_progress)
+    return store
+
+
+def record_progress(enrollment: Enrollment, percentage: int) -> None:
+    """Buffer a progress report for an enrollment."""
+    store = get_progress_store()
+    store.put(enrollment.id, (enrollment.user_id, percentage, time.time()))
+    # Without Redis there is no worker sharing the buffer, so flush from the request path
+    if isinstance(store, LocalProgressStore) and store.is_due():
+        flush_progress()
+
+
+def discard_progress(enrollment_ids: Iterable[int]) -> None:
+    """Drop buffered reports superseded by a direct write to the enrollments."""
+    get_progress_store().discard(enrollment_ids)
+
+
+def overlay_progress(enrollments: Iterable[Enrollment]) -> None:
+    """Replace ``completion_percentage`` with buffered values where present."""
+    by_id = {enrollment.id: enrollment for enrollment in enrollments}
+    if not by_id:
+        return
+    for enrollment_id, (_, percentage, _) in get_progress_store().get_many(list(by_id)).items():
+        by_id[enrollment_id].completion_percentage = percentage
+
+
+def flush_progress(batch_size: int = 0) -> int:
+    """
+    Write buffered progress to the database and return the number of reports flushed.
+
+    Only the latest report per enrollment is kept, so a burst of reports turns
+    into one row update. Each batch is a single conditional ``UPDATE`` that
+    skips rows written since their report; rows are not read first, and
+    updates for enrollments deleted in the meantime simply match nothing.
+    """
+    store = get_progress_store()
+    pending = store.take()
+    if not pending:
+        return 0
+
+    for batch in batched(sorted(pending.items()), batch_size or settings.PROGRESS_FLUSH_BATCH_SIZE):
+        newer_than_row = Q()
+        percentages = []
+        timestamps = []
+        for enrollment_id, (_, percentage, reported_at) in batch:
+            reported = datetime.fromtimestamp(reported_at, tz=timezone.utc)
+            newer_than_row |= Q(id=enrollment_id, updated_at__lt=reported)
+            percentages.append(When(id=enrollment_id, then=Value(percentage)))
+            timestamps.append(When(id=enrollment_id, then=Value(reported)))
+        with transaction.atomic():
+            Enrollment.all_objects.filter(newer_than_row).update(
+                completion_percentage=Case(*percentages, output_field=models.IntegerField()),
+                updated_at=Case(*timestamps, output_field=models.DateTimeField()),
+            )
+
+    cache.delete_many([f"user_enrollments_{user_id}" for user_id in {user_id for user_id, _, _ in pending.values()}])
+    store.done()
+    return len(pending)
@@ -0,0 +1,59 @@
+from typing import Any, FrozenSet, Optional
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+
+ROLE_ADMIN = 'admin'
+ROLE_INSTRUCTOR = 'instructor'
+ROLE_STUDENT = 'student'
+
+INSTRUCTORS_GROUP = 'instructors'
+STUDENTS_GROUP = 'students'
+
+
+def group_names_cache_key(user_id: Any) -> str:
+    """Cache key of a user's group names."""
+    return f"user_groups_{user_id}"
+
+
+def invalidate_group_names(user_id: Any) -> None:
+    """Drop the cached group names of a user after its membership changes."""
+    cache.delete(group_names_cache_key(user_id))
+
+
+def get_group_names(user: User) -> FrozenSet[str]:
+    """
+    Get the names of the groups a user belongs to.
+
+    Uses groups loaded with ``prefetch_related('groups')`` when available, so
+    serializing a prefetched list of users costs no query per user. Otherwise
+    the names come from the cache, which ``api.signals`` clears when the
+    membership changes, and are fetched in a single query on a miss. The
+    result is memoized on the instance.
+    """
+    names: Optional[FrozenSet[str]] = getattr(user, '_group_names', None)
+    if names is not None:
+        return names
+
+    prefetched = getattr(user, '_prefetched_objects_cache', {}).get('groups')
+    if prefetched is not None:
+        names = frozenset(group.name for group in prefetched)
+    else:
+        cache_key = group_names_cache_key(user.pk)
+        names = cache.get(cache_key)
+        if names is None:
+            names = frozenset(user.groups.values_list('name', flat=True))
+            cache.set(cache_key, names, timeout=settings.CACHE_TTL)
+    setattr(user, '_group_names', names)
+    return names
+
+
+def resolve_role(user: User) -> str:
+    """Determine the role reported for a user at login."""
+    if user.is_staff:
+        return ROLE_ADMIN
+    if INSTRUCTORS_GROUP in get_group_names(user):
+        return ROLE_INSTRUCTOR
+    return ROLE_STUDENT
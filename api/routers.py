@@ -0,0 +1,99 @@
+"""
+Read-replica database routing.
+
+Replica aliases come from ``DATABASE_REPLICA_URLS`` and are listed in
+``REPLICA_DATABASES``. ``ReplicaRoutingMiddleware`` picks a replica for safe
+requests to the ``api`` views and ``ReplicaRouter`` sends that request's reads
+to it. All other reads and every write go to the primary. After a write, the
+client is pinned to the primary for ``REPLICA_PIN_SECONDS``, so it reads its
+own writes despite replication lag. The pin is kept in a cookie and, for JWT
+clients that drop cookies, in a cache marker keyed by the token's user id.
+"""
+import random
+from contextvars import ContextVar, Token
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpRequest, HttpResponse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
+
+# Alias the current request reads from; None means the primary
+_read_alias: ContextVar[Optional[str]] = ContextVar('read_alias', default=None)
+
+
+def pin_cache_key(user_id: Any) -> str:
+    return f"primary_pin_{user_id}"
+
+
+def choose_replica() -> Optional[str]:
+    """Pick a replica alias at random, or None when no replicas are configured."""
+    replicas = settings.REPLICA_DATABASES
+    return random.choice(replicas) if replicas else None
+
+
+def use_replica(alias: Optional[str]) -> Token:
+    """Route reads in the current context to ``alias``; reset with ``release_replica``."""
+    return _read_alias.set(alias)
+
+
+def release_replica(token: Token) -> None:
+    _read_alias.reset(token)
+
+
+def token_user_id(request: HttpRequest) -> Optional[Any]:
+    """
+    User id from the request's bearer token, without verifying it.
+
+    Only used to find the user's primary pin; authentication still verifies
+    the token when the view runs.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)  # type: ignore[arg-type]  # only reads META
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        return UntypedToken(raw_token, verify=False).get(api_settings.USER_ID_CLAIM)  # type: ignore[arg-type]  # raw bytes are valid
+    except TokenError:
+        return None
+
+
+def is_pinned(request: HttpRequest) -> bool:
+    """Return True if the client wrote recently and must read from the primary."""
+    if request.COOKIES.get(settings.REPLICA_PIN_COOKIE):
+        return True
+    user_id = token_user_id(request)
+    return user_id is not None and cache.get(pin_cache_key(user_id)) is not None
+
+
+def pin_primary(request: HttpRequest, response: HttpResponse) -> None:
+    """Pin the client that made a write to the primary for REPLICA_PIN_SECONDS."""
+    seconds = settings.REPLICA_PIN_SECONDS
+    response.set_cookie(settings.REPLICA_PIN_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+    user = getattr(request, 'user', None)
+    user_id = user.pk if user is not None and user.is_authenticated else token_user_id(request)
+    if user_id is not None:
+        cache.set(pin_cache_key(user_id), True, timeout=seconds)
+
+
+class ReplicaRouter:
+    """Send reads to the replica chosen for the request, and everything else to the primary."""
+
+    def db_for_read(self, model: Any, **hints: Any) -> str:
+        return _read_alias.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model: Any, **hints: Any) -> str:
+        # Never follow an instance's hint to a replica it was read from
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints: Any) -> bool:
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, **hints: Any) -> Optional[bool]:
+        return False if db in settings.REPLICA_DATABASES else None
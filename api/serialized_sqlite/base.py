@@ -0,0 +1,75 @@
+"""
+SQLite backend whose writers take turns within the process.
+
+Enabled with ``SQLITE_SERIALIZE_WRITES``. A transaction takes the process-wide
+write lock from ``BEGIN`` until it commits or rolls back, and a write outside a
+transaction holds it for that one statement. Reads outside transactions, and
+everything a request does before or after its writes (password hashing, file
+parsing, rendering), run without it.
+
+Transactions start with ``BEGIN IMMEDIATE`` so they hold SQLite's write lock
+from the start: a transaction that began as a reader cannot take it later once
+another writer has committed, and would fail with "database is locked" however
+long it waited. Workers in other processes wait for it up to ``busy_timeout``.
+"""
+from typing import Any, Callable
+
+from django.db.backends.sqlite3 import base
+
+from ..sqlite import write_lock
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def is_write(sql: str) -> bool:
+    """Whether a statement modifies rows."""
+    return sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite wrapper that holds the process-wide write lock for each write transaction."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.holds_write_lock = False
+        self.execute_wrappers.append(self._serialize_autocommit_writes)
+
+    def _serialize_autocommit_writes(
+        self, execute: Callable[..., Any], sql: str, params: Any, many: bool, context: Any
+    ) -> Any:
+        if self.holds_write_lock or not is_write(sql):
+            return execute(sql, params, many, context)
+        with write_lock:
+            return execute(sql, params, many, context)
+
+    def _release_write_lock(self) -> None:
+        if self.holds_write_lock:
+            self.holds_write_lock = False
+            write_lock.release()
+
+    def _start_transaction_under_autocommit(self) -> None:
+        write_lock.acquire()
+        self.holds_write_lock = True
+        try:
+            self.cursor().execute('BEGIN IMMEDIATE')
+        except Exception:
+            self._release_write_lock()
+            raise
+
+    def _commit(self) -> None:
+        try:
+            super()._commit()  # type: ignore[misc]
+        finally:
+            self._release_write_lock()
+
+    def _rollback(self) -> None:
+        try:
+            super()._rollback()  # type: ignore[misc]
+        finally:
+            self._release_write_lock()
+
+    def _close(self) -> None:
+        try:
+            super()._close()  # type: ignore[misc]
+        finally:
+            self._release_write_lock()
@@ -1,8 +1,18 @@
 from rest_framework import serializers
+from django.conf import settings
+from django.urls import reverse
+from django.db import models
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
-from .models import Course, Enrollment, Module, Activity
-from typing import Dict, Any, List
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import UntypedToken
+from .models import ArchivedEnrollment, Course, DataExportJob, Enrollment, Module, Activity
+from .roles import get_group_names, INSTRUCTORS_GROUP, STUDENTS_GROUP
+from .completion import DERIVED_PERCENTAGE_MESSAGE, tracks_completions
+from .progress import overlay_progress
+from .tokens import ClaimsRefreshToken, is_blacklisted
+from typing import Dict, Any, List, cast
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -12,11 +22,12 @@ class UserSerializer(serializers.ModelSerializer):
     """
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        if instance.groups.filter(name="instructors").exists():
+        group_names = get_group_names(instance)
+        if INSTRUCTORS_GROUP in group_names:
             data['role'] = 'instructor'
         elif instance.is_staff:
             data['role'] = 'admin'
-        elif instance.groups.filter(name="students").exists():
+        elif STUDENTS_GROUP in group_names:
             data['role'] = 'student'
         else:
             data['role'] = 'student'  # fallback
@@ -169,6 +180,15 @@ class CourseDetailSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+class BufferedProgressListSerializer(serializers.ListSerializer):
+    """List serializer overlaying buffered progress reports in one lookup."""
+    
+    def to_representation(self, data: Any) -> List[Any]:
+        enrollments = list(data.all() if isinstance(data, models.Manager) else data)
+        overlay_progress(enrollments)
+        return super().to_representation(enrollments)
+
+
 class EnrollmentListSerializer(serializers.ModelSerializer):
     """Serializer for Enrollment model when listing enrollments."""
     
@@ -180,6 +200,7 @@ class EnrollmentListSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'course', 'enrolled_at', 'status', 
                   'completion_percentage']
         read_only_fields = fields
+        list_serializer_class = BufferedProgressListSerializer
         
     def get_course(self, obj: Enrollment) -> Dict[str, Any]:
         """Get a simplified representation of the course."""
@@ -193,7 +214,7 @@ class EnrollmentCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating Enrollment instances."""
     
     user_id = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.all(),
+        queryset=User.objects.filter(account_deletion__isnull=True),
         source='user'
     )
     course_id = serializers.PrimaryKeyRelatedField(
@@ -206,11 +227,24 @@ class EnrollmentCreateSerializer(serializers.ModelSerializer):
         fields = ['user_id', 'course_id']
         
     def validate(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Validate that the user is not already enrolled in the course."""
+        """Validate that the user is not already enrolled in the course, now or in the archive."""
         user = data.get('user')
         course = data.get('course')
         
-        if Enrollment.objects.filter(user=user, course=course).exists():
+        # One query for both tables
+        enrolled = Enrollment.objects.filter(user=user, course=course).annotate(
+            archived=models.Value(False, output_field=models.BooleanField())
+        ).order_by().values_list('id', 'archived')
+        archived = ArchivedEnrollment.objects.filter(user=user, course=course).annotate(
+            archived=models.Value(True, output_field=models.BooleanField())
+        ).order_by().values_list('id', 'archived')
+        existing = list(enrolled.union(archived)[:1])
+        if existing and existing[0][1]:
+            raise serializers.ValidationError({
+                "detail": "User's enrollment in this course is archived; restore it instead.",
+                "restore": reverse('enrollment-restore', args=[existing[0][0]]),
+            })
+        if existing:
             raise serializers.ValidationError(
                 {"detail": "User is already enrolled in this course."}
             )
@@ -218,12 +252,58 @@ class EnrollmentCreateSerializer(serializers.ModelSerializer):
         return data
 
 
+class BulkEnrollmentSerializer(serializers.Serializer):
+    """Serializer for enrolling a list of users in a course at once."""
+    
+    user_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False
+    )
+    
+    def validate_user_ids(self, value: List[int]) -> List[int]:
+        """Limit the cohort size and drop duplicate ids while keeping the submitted order."""
+        if len(value) > settings.BULK_ENROLL_MAX:
+            raise serializers.ValidationError(
+                f"At most {settings.BULK_ENROLL_MAX} users can be enrolled per request."
+            )
+        return list(dict.fromkeys(value))
+
+
 class EnrollmentUpdateSerializer(serializers.ModelSerializer):
     """Serializer for updating Enrollment instances."""
     
     class Meta:
         model = Enrollment
         fields = ['status', 'completion_percentage']
+    
+    def validate_completion_percentage(self, value: int) -> int:
+        """Reject a client value where the percentage is derived from completions."""
+        if self.instance is not None and tracks_completions(cast(Enrollment, self.instance).course):
+            raise serializers.ValidationError(DERIVED_PERCENTAGE_MESSAGE)
+        return value
+
+
+class EnrollmentBatchUpdateSerializer(serializers.Serializer):
+    """Serializer for one entry of a batch enrollment progress update."""
+    
+    id = serializers.IntegerField(min_value=1)
+    status = serializers.ChoiceField(choices=Enrollment.StatusChoices.choices, required=False)
+    completion_percentage = serializers.IntegerField(min_value=0, max_value=100, required=False)
+    
+    @classmethod
+    def many_init(cls, *args: Any, **kwargs: Any) -> serializers.BaseSerializer:
+        kwargs.setdefault('allow_empty', False)
+        # Every entry is one locked row and one id__in parameter
+        kwargs.setdefault('max_length', settings.ENROLLMENT_BATCH_MAX)
+        return super().many_init(*args, **kwargs)
+    
+    def validate(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate that the entry changes at least one field."""
+        if 'status' not in data and 'completion_percentage' not in data:
+            raise serializers.ValidationError(
+                "Provide status or completion_percentage."
+            )
+        return data
 
 
 class EnrollmentDetailSerializer(serializers.ModelSerializer):
@@ -237,6 +317,26 @@ class EnrollmentDetailSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'course', 'enrolled_at', 'status', 
                   'completion_percentage']
         read_only_fields = fields
+    
+    def to_representation(self, instance: Enrollment) -> Dict[str, Any]:
+        """Show the latest buffered progress report, if any."""
+        overlay_progress([instance])
+        return super().to_representation(instance)
+
+
+class EnrollmentCompletionSerializer(serializers.Serializer):
+    """Serializer for marking a batch of activities as completed."""
+    
+    activity_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False
+    )
+
+
+class EnrollmentProgressSerializer(serializers.Serializer):
+    """Serializer for a buffered progress report."""
+    
+    completion_percentage = serializers.IntegerField(min_value=0, max_value=100)
 
 
 class ModuleListSerializer(serializers.ModelSerializer):
@@ -280,7 +380,11 @@ class ModuleDetailSerializer(serializers.ModelSerializer):
         
     def get_activities(self, obj) -> List[Dict[str, Any]]:
         """Get activities for this module."""
-        activities = obj.activities.all().order_by('order')
+        # ModuleViewSet prefetches activities already ordered; reuse them
+        if 'activities' in getattr(obj, '_prefetched_objects_cache', {}):
+            activities = obj.activities.all()
+        else:
+            activities = obj.activities.all().order_by('order')
         return ActivityListSerializer(activities, many=True).data
 
 
@@ -294,6 +398,44 @@ class ActivityListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
+class ReorderSerializer(serializers.Serializer):
+    """
+    Serializer for reordering the children of a parent.
+    
+    Accepts either a full ordering in ``ids`` or a single move of ``id``
+    before or after a sibling (to the top if neither is given).
+    """
+    
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, allow_empty=False)
+    id = serializers.IntegerField(min_value=1, required=False)
+    before = serializers.IntegerField(min_value=1, required=False)
+    after = serializers.IntegerField(min_value=1, required=False)
+    
+    def validate(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate that the request is either a full ordering or a single move."""
+        if ('ids' in data) == ('id' in data):
+            raise serializers.ValidationError("Provide either ids or id.")
+        if 'before' in data and 'after' in data:
+            raise serializers.ValidationError("Provide at most one of before and after.")
+        if 'ids' in data and ('before' in data or 'after' in data):
+            raise serializers.ValidationError("before and after only apply to a single move.")
+        if data.get('id') is not None and data.get('id') in (data.get('before'), data.get('after')):
+            raise serializers.ValidationError("An item cannot be moved relative to itself.")
+        return data
+
+
+class ModuleReorderSerializer(ReorderSerializer):
+    """Serializer for reordering the modules of a course."""
+    
+    course_id = serializers.PrimaryKeyRelatedField(queryset=Course.objects.only('id'), source='course')
+
+
+class ActivityReorderSerializer(ReorderSerializer):
+    """Serializer for reordering the activities of a module."""
+    
+    module_id = serializers.PrimaryKeyRelatedField(queryset=Module.objects.only('id'), source='module')
+
+
 class ActivityCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating Activity instances."""
     
@@ -317,4 +459,47 @@ class ActivityDetailSerializer(serializers.ModelSerializer):
         model = Activity
         fields = ['id', 'module', 'title', 'description', 'type', 'content', 'order',
                   'created_at', 'updated_at']
-        read_only_fields = fields
\ No newline at end of file
+        read_only_fields = fields
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Token pair serializer issuing access tokens with role and staff claims."""
+    
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Token refresh serializer that keeps role and staff claims current."""
+    
+    token_class = ClaimsRefreshToken
+
+
+class CachedTokenVerifySerializer(serializers.Serializer):
+    """Token verify serializer checking the blacklist through the cache front."""
+    
+    token = serializers.CharField(write_only=True)
+    
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        token = UntypedToken(attrs['token'])
+        if is_blacklisted(token.get(jwt_settings.JTI_CLAIM)):
+            raise serializers.ValidationError("Token is blacklisted")
+        return {}
+
+
+class DataExportJobSerializer(serializers.ModelSerializer):
+    """Serializer for the status of a personal-data export."""
+    
+    download_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = DataExportJob
+        fields = ['id', 'status', 'size', 'error', 'created_at', 'finished_at', 'download_url']
+        read_only_fields = fields
+    
+    def get_download_url(self, obj: DataExportJob) -> Any:
+        """Link to the archive once the export has completed."""
+        if obj.status != DataExportJob.StatusChoices.COMPLETED:
+            return None
+        url = reverse('user-export-download', kwargs={'pk': obj.pk})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
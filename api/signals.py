@@ -0,0 +1,120 @@
+from typing import Any, Optional, Tuple
+
+from django.contrib.auth.models import User
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .authentication import invalidate_user_cache
+from .completion import retire_positions
+from .connection_metrics import count_connection
+from .roles import invalidate_group_names
+from .sqlite import apply_pragmas
+from .models import Activity, Course, Module
+from .tokens import bump_token_version, cache_blacklisted, forget_token_version
+
+
+# User fields that token claims depend on; other saves, such as last_login
+# updates, leave issued tokens valid
+CLAIM_FIELDS = ('is_staff', 'is_active')
+
+
+def claim_values(user: User) -> Tuple[Optional[bool], ...]:
+    """Current claim field values, without loading deferred ones (None)."""
+    return tuple(user.__dict__.get(name) for name in CLAIM_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_claim_values(sender: Any, instance: User, **kwargs: Any) -> None:
+    """Remember the claim fields a user was loaded with."""
+    setattr(instance, '_loaded_claims', claim_values(instance))
+
+
+def claims_changed(instance: User, update_fields: Any) -> bool:
+    """Whether a save of an existing user changed a field its token claims depend on."""
+    if update_fields is not None and not set(CLAIM_FIELDS) & set(update_fields):
+        return False
+    loaded = getattr(instance, '_loaded_claims', None)
+    # Unknown when the fields were deferred at load time
+    return loaded is None or None in loaded or loaded != claim_values(instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_authenticated_user(sender: Any, instance: User, created: bool = False,
+                                  update_fields: Any = None, **kwargs: Any) -> None:
+    """Drop the cached authentication snapshot, and token claims when they changed or the user is deleted."""
+    invalidate_user_cache(instance.pk)
+    if kwargs.get('signal') is post_delete:
+        # The stored version went with the user; tokens of a missing user never authenticate
+        forget_token_version(instance.pk)
+        invalidate_group_names(instance.pk)
+        return
+    # A new user has no tokens yet
+    if not created and claims_changed(instance, update_fields):
+        bump_token_version(instance.pk)
+    setattr(instance, '_loaded_claims', claim_values(instance))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_role_claims(sender: Any, instance: Any, action: str, reverse: bool,
+                           pk_set: Any, **kwargs: Any) -> None:
+    """Invalidate role claims and cached group names when group membership changes."""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_group_names(instance.pk)
+            bump_token_version(instance.pk)
+    elif action in ('post_add', 'post_remove'):
+        for user_id in pk_set:
+            invalidate_group_names(user_id)
+            bump_token_version(user_id)
+    elif action == 'pre_clear':
+        # Clearing a group does not report its members, so collect them first
+        for user_id in User.objects.filter(groups=instance).values_list('pk', flat=True):
+            invalidate_group_names(user_id)
+            bump_token_version(user_id)
+
+
+@receiver(post_delete, sender=Activity)
+def retire_deleted_activity(sender: Any, instance: Activity, origin: Any = None, **kwargs: Any) -> None:
+    """Stop counting a deleted activity towards completion in its course."""
+    # Activities deleted with their module are handled by retire_module_activities,
+    # and those purged with a deleted course need no bookkeeping
+    if origin is not instance:
+        return
+    course_id = Module.all_objects.filter(pk=instance.module_id).values_list('course_id', flat=True).get()
+    Course.count_activities(course_id, -1)
+    retire_positions(course_id, [instance.position])
+
+
+@receiver(pre_delete, sender=Module)
+def retire_module_activities(sender: Any, instance: Module, origin: Any = None, **kwargs: Any) -> None:
+    """Stop counting the activities of a deleted module towards completion, in one pass."""
+    if origin is not instance:
+        return
+    positions = list(Activity.all_objects.filter(module_id=instance.pk).values_list('position', flat=True))
+    if positions:
+        Course.count_activities(instance.course_id, -len(positions))
+        retire_positions(instance.course_id, positions)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def cache_blacklisted_token(sender: Any, instance: BlacklistedToken, created: bool, **kwargs: Any) -> None:
+    """Mirror new blacklist entries into the cache front used by token checks."""
+    if created:
+        cache_blacklisted(instance.token.jti, instance.token.expires_at)
+
+
+@receiver(connection_created)
+def count_database_connection(sender: Any, connection: Any, **kwargs: Any) -> None:
+    """Feed the per-worker connection gauges."""
+    count_connection(connection.alias)
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender: Any, connection: Any, **kwargs: Any) -> None:
+    """Apply the SQLite tuning pragmas to every new SQLite connection."""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            apply_pragmas(cursor)
@@ -0,0 +1,29 @@
+"""
+SQLite tuning for small deployments.
+
+Every new SQLite connection gets ``SQLITE_PRAGMAS``. These switch to WAL
+journaling so readers no longer block the writer, relax fsyncs to
+``synchronous=NORMAL`` (safe with WAL), and make a writer wait for the lock
+instead of failing at once. They also enlarge the page cache and memory map.
+
+SQLite allows one writer at a time. When two threads of a worker both start
+as readers and then try to write, one of them gets "database is locked" no
+matter how long it waits. With ``SQLITE_SERIALIZE_WRITES`` on, write
+transactions take a process-wide lock first (see ``api.serialized_sqlite``), so
+writers queue in-process instead of thrashing on the database lock.
+"""
+import threading
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+
+# Reentrant, so a thread writing through two SQLite connections does not deadlock
+write_lock = threading.RLock()
+
+
+def apply_pragmas(cursor: Any, pragmas: Optional[Dict[str, Any]] = None) -> None:
+    """Run ``PRAGMA name = value`` for each tuning pragma on a SQLite cursor."""
+    pragmas = settings.SQLITE_PRAGMAS if pragmas is None else pragmas
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
@@ -0,0 +1,80 @@
+from typing import Any, Optional
+
+from rest_framework.request import Request
+# Note: importing rest_framework.views here would be circular, since APIView
+# loads DEFAULT_THROTTLE_CLASSES at import time.
+from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+
+
+class SlidingWindowCounterMixin:
+    """
+    Sliding-window counter for DRF's ``SimpleRateThrottle``.
+
+    Instead of a cached list of request timestamps, each client has one integer
+    counter per fixed window. The rate is estimated as the current window's
+    count plus the previous window's count weighted by how much of it still
+    overlaps the sliding window. Each request costs an atomic cache increment
+    and one read, in O(1) time and memory, and counters are shared by every
+    node using the same cache.
+    """
+
+    cache: Any
+    key: Optional[str]
+    rate: Optional[str]
+    duration: int
+    num_requests: int
+    timer: Any
+    get_cache_key: Any
+
+    def allow_request(self, request: Request, view: Any) -> bool:
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = float(self.timer())
+        window = int(now // self.duration)
+        self.elapsed = now - window * self.duration
+        current_key = f"{self.key}:{window}"
+        previous_key = f"{self.key}:{window - 1}"
+
+        # Count this request first so concurrent requests on other nodes see it
+        self.cache.add(current_key, 0, timeout=self.duration * 2)
+        try:
+            self.current = int(self.cache.incr(current_key))
+        except ValueError:
+            # The counter expired between add() and incr()
+            self.cache.set(current_key, 1, timeout=self.duration * 2)
+            self.current = 1
+        self.previous = int(self.cache.get(previous_key, 0))
+
+        weight = 1 - self.elapsed / self.duration
+        if self.previous * weight + self.current > self.num_requests:
+            # Rejected requests do not count against the client
+            try:
+                self.cache.decr(current_key)
+            except ValueError:
+                # The counter expired since incr(); there is nothing to give back
+                pass
+            self.current -= 1
+            return False
+        return True
+
+    def wait(self) -> Optional[float]:
+        """Seconds until the estimated rate drops below the limit."""
+        remaining = self.duration - self.elapsed
+        if self.current >= self.num_requests or not self.previous:
+            return remaining
+        # Solve previous * (1 - t / duration) + current < num_requests for t
+        allowed_at = self.duration * (1 - (self.num_requests - self.current) / self.previous)
+        return max(0.0, min(remaining, allowed_at - self.elapsed))
+
+
+class AnonSlidingWindowThrottle(SlidingWindowCounterMixin, AnonRateThrottle):
+    """Limit anonymous clients, identified by IP, using the ``anon`` rate."""
+
+
+class UserSlidingWindowThrottle(SlidingWindowCounterMixin, UserRateThrottle):
+    """Limit authenticated users by id (or IP when anonymous) using the ``user`` rate."""
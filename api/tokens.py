@@ -0,0 +1,203 @@
+import time
+from typing import Any, Optional, cast
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AuthUser, RefreshToken, Token
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import TokenVersion
+from .roles import resolve_role
+
+
+ROLE_CLAIM = 'role'
+STAFF_CLAIM = 'is_staff'
+VERSION_CLAIM = 'ver'
+
+
+def token_version_key(user_id: Any) -> str:
+    """Cache key of a user's token claims version."""
+    return f"token_version_{user_id}"
+
+
+def get_token_version(user_id: Any) -> int:
+    """Get the current claims version for a user, reading it through the cache."""
+    key = token_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = TokenVersion.objects.filter(user_id=user_id).values_list('version', flat=True).first() or 0
+        cache.set(key, version, timeout=None)
+    return int(version)
+
+
+def bump_token_version(user_id: Any) -> None:
+    """
+    Invalidate the role and staff claims of every token issued to a user.
+
+    The version is stored in the database and the cached copy is dropped.
+    Tokens carrying an older version fall back to loading the user from the
+    database until they are refreshed or replaced.
+    """
+    if not TokenVersion.objects.filter(user_id=user_id).update(version=F('version') + 1):
+        try:
+            with transaction.atomic():
+                TokenVersion.objects.create(user_id=user_id, version=1)
+        except IntegrityError:
+            # Created concurrently since the update above
+            TokenVersion.objects.filter(user_id=user_id).update(version=F('version') + 1)
+    forget_token_version(user_id)
+
+
+def forget_token_version(user_id: Any) -> None:
+    """Drop the cached claims version, now and again once the transaction commits."""
+    key = token_version_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def stamp_claims(token: Token, user: User) -> None:
+    """Embed the user's role, staff flag and claims version in a token."""
+    token[ROLE_CLAIM] = resolve_role(user)
+    token[STAFF_CLAIM] = bool(user.is_staff)
+    token[VERSION_CLAIM] = get_token_version(user.pk)
+
+
+def has_current_claims(token: Token) -> bool:
+    """
+    Check that a token carries claims that have not been invalidated.
+
+    Only a version found in the cache is trusted; on a miss the token is
+    treated as stale and the caller falls back to the database user.
+    """
+    if ROLE_CLAIM not in token or STAFF_CLAIM not in token or VERSION_CLAIM not in token:
+        return False
+    version = cache.get(token_version_key(token[api_settings.USER_ID_CLAIM]))
+    if version is None:
+        return False
+    return bool(token[VERSION_CLAIM] == version)
+
+
+# Blacklist front: one cache key per checked jti, expiring with the token. It
+# holds True for a blacklisted jti and False for one known not to be. A miss
+# (never checked, or evicted) is answered by the database and cached, so
+# eviction can only cost a query, never let a revoked token through.
+
+
+def blacklist_cache_key(jti: str) -> str:
+    """Cache key of a jti's blacklist status."""
+    return f"token_blacklisted_{jti}"
+
+
+def _timeout_until(expires_at: Any) -> int:
+    return int(expires_at.timestamp() - time.time())
+
+
+def cache_blacklisted(jti: str, expires_at: Any) -> None:
+    """Record a blacklisted jti in the cache until its token expires."""
+    timeout = _timeout_until(expires_at)
+    if timeout > 0:
+        cache.set(blacklist_cache_key(jti), True, timeout=timeout)
+
+
+def cache_not_blacklisted(jti: str, expires_at: Any) -> None:
+    """
+    Record that a jti is not blacklisted until its token expires.
+
+    Uses ``add`` so it never overwrites an entry written by a concurrent
+    blacklisting.
+    """
+    timeout = _timeout_until(expires_at)
+    if timeout > 0:
+        cache.add(blacklist_cache_key(jti), False, timeout=timeout)
+
+
+def is_blacklisted(jti: Optional[str]) -> bool:
+    """Check blacklist membership, hitting the database only when the jti is not cached."""
+    if jti is None:
+        return False
+    cached = cache.get(blacklist_cache_key(jti))
+    if cached is not None:
+        return bool(cached)
+    row = OutstandingToken.objects.filter(jti=jti).values_list('expires_at', 'blacklistedtoken').first()
+    if row is None:
+        return False
+    expires_at, blacklisted_id = row
+    if blacklisted_id is not None:
+        cache_blacklisted(jti, expires_at)
+        return True
+    cache_not_blacklisted(jti, expires_at)
+    return False
+
+
+def warm_blacklist_cache(batch_size: int = 1000) -> int:
+    """Load every unexpired blacklisted jti into the cache."""
+    count = 0
+    rows = BlacklistedToken.objects.filter(
+        token__expires_at__gt=timezone.now()
+    ).values_list('token__jti', 'token__expires_at')
+    for jti, expires_at in rows.iterator(chunk_size=batch_size):
+        cache_blacklisted(jti, expires_at)
+        count += 1
+    return count
+
+
+def prune_expired_tokens(batch_size: int = 1000) -> int:
+    """
+    Delete expired outstanding tokens and their blacklist entries.
+
+    Works in batches with one short transaction each, so pruning a large
+    backlog never holds long locks. Returns the number of tokens deleted.
+    """
+    cutoff = timezone.now()
+    deleted = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=cutoff)
+            .order_by('expires_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token whose access tokens carry ``role``, ``is_staff`` and ``ver`` claims.
+
+    Permission checks can then run on the token alone (see
+    ``api.authentication.TokenClaimsUser``) without loading the user row.
+    Blacklist checks go through the cache front instead of the growing table.
+    """
+
+    def check_blacklist(self) -> None:
+        if is_blacklisted(self.payload.get(api_settings.JTI_CLAIM)):
+            raise TokenError(_("Token is blacklisted"))
+
+    @classmethod
+    def for_user(cls, user: AuthUser) -> 'ClaimsRefreshToken':
+        token = super().for_user(user)
+        stamp_claims(token, cast(User, user))
+        # A token that was just issued cannot be blacklisted yet
+        cache_not_blacklisted(token[api_settings.JTI_CLAIM], datetime_from_epoch(token['exp']))
+        return token  # type: ignore[return-value]
+
+    @property
+    def access_token(self) -> Any:
+        access = super().access_token
+        # Re-stamp claims that were invalidated after this refresh token was issued
+        if not has_current_claims(self):
+            user = User.objects.filter(pk=self[api_settings.USER_ID_CLAIM]).first()
+            if user is not None:
+                stamp_claims(access, user)
+        return access
@@ -4,10 +4,13 @@ from rest_framework_simplejwt.views import TokenRefreshView
 from typing import List, Union
 from django.urls.resolvers import URLPattern, URLResolver
 
+from .async_views import async_login
+from .batch import BatchView
 from .views import (
     UserViewSet, CourseViewSet, EnrollmentViewSet, ModuleViewSet,
-    ActivityViewSet, UserEnrollmentsView, CourseEnrollmentsView, LoginView,
-    TokenVerifyView
+    ActivityViewSet, UserEnrollmentsView, CourseEnrollmentsView,
+    CourseBulkEnrollmentView, LoginView,
+    TokenVerifyView, DataExportViewSet
 )
 
 # Create a router and register our viewsets
@@ -23,11 +26,16 @@ urlpatterns: List[Union[URLPattern, URLResolver]] = [
     path('', include(router.urls)),
     path('users/<int:user_id>/enrollments/', UserEnrollmentsView.as_view(), name='user-enrollments'),
     path('courses/<int:course_id>/enrollments/', CourseEnrollmentsView.as_view(), name='course-enrollments'),
+    path('courses/<int:course_id>/enrollments/bulk/', CourseBulkEnrollmentView.as_view(), name='course-enrollments-bulk'),
+    path('batch/', BatchView.as_view(), name='batch'),
     # Privacy endpoints
-    path('users/me/export/', UserViewSet.as_view({'get': 'export_personal_data'}), name='user-export-personal-data'),
+    path('users/me/export/', DataExportViewSet.as_view({'get': 'list', 'post': 'create'}), name='user-export-personal-data'),
+    path('users/me/export/<int:pk>/', DataExportViewSet.as_view({'get': 'retrieve'}), name='user-export-detail'),
+    path('users/me/export/<int:pk>/download/', DataExportViewSet.as_view({'get': 'download'}), name='user-export-download'),
     path('users/me/delete/', UserViewSet.as_view({'delete': 'delete_account'}), name='user-delete-account'),
     # Authentication URLs
     path('auth/login/', LoginView.as_view(), name='login'),
+    path('auth/login/async/', async_login, name='login-async'),  # type: ignore[arg-type]  # async views are valid
     path('auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('auth/verify/', TokenVerifyView.as_view(), name='token_verify'),
 ]
\ No newline at end of file
@@ -0,0 +1,13 @@
+"""Small helpers shared by the api modules."""
+from itertools import islice
+from typing import Any, Iterable, Iterator, List
+
+
+def batched(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Split an iterable into lists of at most ``size`` items."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
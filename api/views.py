@@ -1,9 +1,17 @@
+import csv
+import io
+import threading
+
 from django.contrib.auth.models import User
 from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Prefetch
+from django.http import FileResponse
+from django.urls import reverse
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from rest_framework.permissions import IsAuthenticated
-from .privacy_serializers import UserDataExportSerializer
 from django.conf import settings
 from django.contrib.auth import authenticate
 from rest_framework import viewsets, mixins, status, generics
@@ -13,41 +21,78 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.request import Request
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 from rest_framework_simplejwt.views import TokenViewBase
-from rest_framework_simplejwt.serializers import TokenVerifySerializer
-from typing import Any, Dict, List, Optional, Type, Union, cast
+from typing import Any, Dict, List, Optional, Tuple, Type, Union, cast
 
-from .models import Course, Enrollment, Module, Activity
+from .models import ArchivedEnrollment, Course, DataExportJob, Enrollment, Module, Activity
 from .serializers import (
     UserSerializer, UserLimitedSerializer, CourseListSerializer,
     CourseCreateUpdateSerializer, CourseDetailSerializer,
-    EnrollmentListSerializer, EnrollmentCreateSerializer,
-    EnrollmentUpdateSerializer, EnrollmentDetailSerializer,
+    EnrollmentListSerializer, EnrollmentCreateSerializer, BulkEnrollmentSerializer,
+    EnrollmentUpdateSerializer, EnrollmentBatchUpdateSerializer, EnrollmentDetailSerializer,
+    EnrollmentProgressSerializer, EnrollmentCompletionSerializer,
     ModuleListSerializer, ModuleCreateSerializer, ModuleDetailSerializer,
-    ActivityListSerializer, ActivityCreateSerializer, ActivityDetailSerializer
+    ActivityListSerializer, ActivityCreateSerializer, ActivityDetailSerializer,
+    ModuleReorderSerializer, ActivityReorderSerializer,
+    CachedTokenVerifySerializer, DataExportJobSerializer
 )
 from .permissions import IsOwnerOrAdmin, IsEnrolledOrAdmin
+from .archival import restore_enrollment, with_archived
+from .completion import DERIVED_PERCENTAGE_MESSAGE, completed_activity_ids, record_completions, tracks_completions
+from .deletion import request_account_deletion, soft_delete_course
+from .exports import ExportLimitError, export_path, request_export
+from .idempotency import IdempotentCreateMixin
+from .imports import (
+    CourseImporter, ImportFormatError, UserImporter, detect_format, iter_course_trees, iter_rows
+)
+from .ordering import OrderingError, apply_ordering, move_item
+from .progress import discard_progress, record_progress
+from .tokens import ClaimsRefreshToken, ROLE_CLAIM
+
 
+def read_import_document(request: Request) -> Tuple[Any, str, Optional[Response]]:
+    """
+    Get the stream and format of an uploaded import document.
+    
+    Accepts a multipart upload in the ``file`` field or a raw request body
+    with a ``text/csv`` or ``application/x-ndjson`` content type. The format
+    can be forced with ``?format_type=csv|ndjson``. The third item is an error
+    response when the document cannot be read.
+    """
+    content_type = request.content_type or ''
+    if content_type.startswith('multipart/'):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return None, '', Response({"file": ["No file was submitted."]}, status=status.HTTP_400_BAD_REQUEST)
+        stream: Any = upload.file
+        fmt = detect_format(upload.name or '', upload.content_type or '')
+    else:
+        stream = io.BytesIO(request.body)
+        fmt = detect_format(content_type=content_type)
+    fmt = request.query_params.get('format_type', fmt)
+    if fmt is None:
+        return None, '', Response(
+            {"error": "Could not determine the import format; use CSV or NDJSON"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return stream, fmt, None
 
-class UserViewSet(viewsets.ModelViewSet):
+
+class UserViewSet(IdempotentCreateMixin, viewsets.ModelViewSet):
     @method_decorator(cache_page(60 * 15))  # Cache for 15 minutes
     def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         """List users with caching."""
         return super().list(request, *args, **kwargs)
 
-    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
-    def export_personal_data(self, request: Request) -> Response:
-        """Export all personal data for the authenticated user."""
-        serializer = UserDataExportSerializer(request.user)
-        return Response(serializer.data)
-
     @action(detail=False, methods=['delete'], permission_classes=[IsAuthenticated])
     def delete_account(self, request: Request) -> Response:
-        """Allow the authenticated user to delete their own account."""
-        user = request.user
-        user.delete()
+        """
+        Allow the authenticated user to delete their own account.
+        
+        The account is deactivated at once and purged in the background.
+        """
+        request_account_deletion(request.user)
         return Response({'detail': 'Account deleted successfully.'}, status=status.HTTP_204_NO_CONTENT)
     filter_backends = [SearchFilter]
     search_fields = ['username', 'email', 'first_name', 'last_name']
@@ -56,7 +101,7 @@ class UserViewSet(viewsets.ModelViewSet):
     Regular users can only view and update their own profiles.
     Admin users can view and manage all users.
     """
-    queryset = User.objects.all()
+    queryset = User.objects.filter(account_deletion__isnull=True)
     serializer_class = UserSerializer
     
     def get_permissions(self) -> List[Any]:
@@ -64,11 +109,12 @@ class UserViewSet(viewsets.ModelViewSet):
         Set permissions based on action:
         - create: Allow anyone to register
         - list/retrieve: Admin only for all users, but user can access their own
+        - bulk_import: Admin only
         - update/partial_update/destroy: Owner or admin only
         """
         if self.action == 'create':
             permission_classes = [AllowAny]
-        elif self.action in ['list']:
+        elif self.action in ['list', 'bulk_import']:
             permission_classes = [IsAdminUser]
         elif self.action in ['retrieve', 'update', 'partial_update', 'destroy']:
             permission_classes = [IsOwnerOrAdmin]
@@ -83,9 +129,33 @@ class UserViewSet(viewsets.ModelViewSet):
         - Regular users can only see themselves
         """
         user = self.request.user
+        # Prefetch groups so role resolution costs no query per user
         if user.is_staff:
-            return User.objects.all()
-        return User.objects.filter(id=user.id)
+            return self.queryset.prefetch_related('groups')
+        return self.queryset.filter(id=user.id).prefetch_related('groups')
+    
+    def perform_destroy(self, instance: Any) -> None:
+        """Deactivate the account now and purge it in the background."""
+        request_account_deletion(instance)
+    
+    @action(detail=False, methods=['post'], url_path='bulk-import', permission_classes=[IsAdminUser])
+    def bulk_import(self, request: Request) -> Response:
+        """
+        Create users in bulk from a CSV or NDJSON document.
+        
+        Accepts a multipart upload in the ``file`` field or a raw request body
+        with a ``text/csv`` or ``application/x-ndjson`` content type. The format
+        can be forced with ``?format_type=csv|ndjson``. Returns per-row errors.
+        """
+        stream, fmt, error = read_import_document(request)
+        if error is not None:
+            return error
+        
+        try:
+            report = UserImporter().run(iter_rows(stream, fmt))
+        except (ImportFormatError, UnicodeDecodeError, csv.Error) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST)
     
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def me(self, request: Request) -> Response:
@@ -128,11 +198,34 @@ class CourseViewSet(viewsets.ModelViewSet):
             permission_classes = [IsAdminUser]
         return [permission() for permission in permission_classes]
     
+    def perform_destroy(self, instance: Any) -> None:
+        """Mark the course deleted now and purge its content in the background."""
+        soft_delete_course(instance)
+    
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_courses(self, request: Request) -> Response:
+        """
+        Create courses with their modules and activities from a CSV or NDJSON document.
+        
+        NDJSON lines are course trees with nested ``modules`` and
+        ``activities``; CSV files have one row per activity. Returns the number
+        of courses, modules and activities created and per-course errors.
+        """
+        stream, fmt, error = read_import_document(request)
+        if error is not None:
+            return error
+        
+        try:
+            report = CourseImporter().run(iter_course_trees(iter_rows(stream, fmt), fmt))
+        except (ImportFormatError, UnicodeDecodeError, csv.Error) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST)
+    
     @method_decorator(cache_page(60 * 60))  # Cache for 1 hour
     @action(detail=False, methods=['get'])
     def featured(self, request: Request) -> Response:
         """Get featured courses."""
-        featured_courses = Course.objects.filter(is_featured=True)
+        featured_courses = Course.objects.filter(is_featured=True).order_by('-created_at')
         page = self.paginate_queryset(featured_courses)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -141,11 +234,8 @@ class CourseViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class EnrollmentViewSet(viewsets.ModelViewSet):
-    @method_decorator(cache_page(60 * 15))  # Cache for 15 minutes
-    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
-        """List enrollments with caching."""
-        return super().list(request, *args, **kwargs)
+class EnrollmentViewSet(IdempotentCreateMixin, viewsets.ModelViewSet):
+    # Not cache_page'd: lists overlay buffered progress reports (see api.progress)
     filter_backends = [SearchFilter]
     search_fields = ['user__username', 'course__title', 'status']
     """
@@ -165,9 +255,40 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
         - Regular users can only see their own enrollments
         """
         user = self.request.user
+        queryset = Enrollment.objects.all()
+        if self.action == 'list':
+            queryset = queryset.for_list()
         if user.is_staff:
-            return Enrollment.objects.all()
-        return Enrollment.objects.filter(user=user)
+            return queryset.of_live_accounts()
+        return queryset.filter(user_id=user.pk)
+    
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        """
+        List enrollments.
+        
+        Archived enrollments are only read with ``?include_archived=1``, and
+        only for the caller's own enrollments; admins list another user's
+        through ``/api/users/{id}/enrollments/``.
+        """
+        if request.query_params.get('include_archived') not in ('1', 'true'):
+            return super().list(request, *args, **kwargs)
+        user = cast(User, request.user)
+        if user.is_staff:
+            return Response(
+                {'detail': 'include_archived lists your own enrollments only; '
+                           'use /api/users/{id}/enrollments/?include_archived=1 for another user.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        enrollments = with_archived(
+            self.filter_queryset(self.get_queryset()),
+            user.pk,
+            self.filter_queryset(ArchivedEnrollment.objects.all()),
+        )
+        page = self.paginate_queryset(enrollments)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(enrollments, many=True).data)
     
     def get_serializer_class(self) -> type[Any]:
         """Get the appropriate serializer based on the action."""
@@ -177,6 +298,10 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
             return EnrollmentUpdateSerializer
         elif self.action == 'retrieve':
             return EnrollmentDetailSerializer
+        elif self.action == 'progress':
+            return EnrollmentProgressSerializer
+        elif self.action == 'completions':
+            return EnrollmentCompletionSerializer
         return EnrollmentListSerializer
     
     def get_permissions(self) -> List[Any]:
@@ -207,11 +332,12 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
     
     def perform_update(self, serializer: Any) -> None:
         """Invalidate cache on update."""
-        enrollment = cast(Enrollment, self.get_object())
-        serializer.save()
+        enrollment = cast(Enrollment, serializer.save())
+        # A direct write supersedes any buffered progress report
+        discard_progress([enrollment.id])
         
         # Invalidate user's enrollment cache
-        cache_key = f"user_enrollments_{enrollment.user.id}"
+        cache_key = f"user_enrollments_{enrollment.user_id}"
         cache.delete(cache_key)
     
     def perform_destroy(self, instance: Any) -> None:
@@ -222,6 +348,205 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
         # Invalidate user's enrollment cache
         cache_key = f"user_enrollments_{user_id}"
         cache.delete(cache_key)
+    
+    @action(detail=False, methods=['patch'], url_path='batch')
+    def batch_update(self, request: Request) -> Response:
+        """
+        Update the progress of several enrollments in one request.
+        
+        Accepts a list of ``{id, status, completion_percentage}`` entries. The
+        whole batch is rejected if any enrollment is missing or not owned by the
+        requesting user, or if it sets completion_percentage where that is
+        derived from activity completions; otherwise all changes are written in
+        one transaction.
+        """
+        serializer = EnrollmentBatchUpdateSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        changes = {entry['id']: entry for entry in serializer.validated_data}
+        
+        with transaction.atomic():
+            # get_queryset limits regular users to their own enrollments
+            enrollments = list(
+                self.get_queryset()
+                .filter(id__in=changes)
+                .select_related('course')
+                .only('id', 'user_id', 'status', 'completion_percentage', 'course__live_activity_count')
+                # Lock only the enrollment rows, not the joined course and user rows
+                .select_for_update(of=('self',))
+            )
+            missing = sorted(set(changes) - {enrollment.id for enrollment in enrollments})
+            if missing:
+                return Response(
+                    {'detail': 'Enrollments not found.', 'ids': missing},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            derived = sorted(
+                enrollment.id for enrollment in enrollments
+                if 'completion_percentage' in changes[enrollment.id] and tracks_completions(enrollment.course)
+            )
+            if derived:
+                return Response(
+                    {'detail': DERIVED_PERCENTAGE_MESSAGE, 'ids': derived},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            # updated_at stops buffered progress reports older than this write from overwriting it
+            fields = {'updated_at'}
+            now = timezone.now()
+            for enrollment in enrollments:
+                entry = changes[enrollment.id]
+                enrollment.updated_at = now
+                for field in ('status', 'completion_percentage'):
+                    if field in entry:
+                        setattr(enrollment, field, entry[field])
+                        fields.add(field)
+            Enrollment.objects.bulk_update(enrollments, sorted(fields))
+        discard_progress(changes)
+        
+        # Invalidate each affected user's enrollment cache once
+        user_ids = {enrollment.user_id for enrollment in enrollments}
+        cache.delete_many([f"user_enrollments_{user_id}" for user_id in user_ids])
+        
+        enrollments.sort(key=lambda enrollment: enrollment.id)
+        return Response(EnrollmentBatchUpdateSerializer(enrollments, many=True).data)
+    
+    @action(detail=True, methods=['post'])
+    def progress(self, request: Request, pk: Optional[str] = None) -> Response:
+        """
+        Report playback progress for an enrollment.
+        
+        The value is buffered and written to the database in batches by the
+        worker; reads of the enrollment show it immediately. Courses with
+        activities derive progress from completions and reject reports.
+        """
+        enrollment = cast(Enrollment, self.get_object())
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if tracks_completions(enrollment.course):
+            return Response({'completion_percentage': [DERIVED_PERCENTAGE_MESSAGE]}, status=status.HTTP_400_BAD_REQUEST)
+        record_progress(enrollment, serializer.validated_data['completion_percentage'])
+        return Response(
+            {'id': enrollment.id, **serializer.validated_data},
+            status=status.HTTP_202_ACCEPTED
+        )
+    
+    @action(detail=True, methods=['get', 'post'])
+    def completions(self, request: Request, pk: Optional[str] = None) -> Response:
+        """
+        List or mark completed activities of an enrollment.
+        
+        POST accepts ``{"activity_ids": [...]}``; completion_percentage is
+        derived from the number of completed activities in the course.
+        """
+        enrollment = cast(Enrollment, self.get_object())
+        if request.method == 'GET':
+            return Response({
+                'activity_ids': completed_activity_ids(enrollment),
+                'completed_count': enrollment.completed_count,
+                'completion_percentage': enrollment.completion_percentage,
+            })
+        
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        enrollment, completed, unknown = record_completions(
+            enrollment.id, serializer.validated_data['activity_ids']
+        )
+        if unknown:
+            return Response(
+                {'detail': 'Activities do not belong to this course.', 'activity_ids': unknown},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({
+            'completed': completed,
+            'completed_count': enrollment.completed_count,
+            'completion_percentage': enrollment.completion_percentage,
+            'status': enrollment.status,
+        })
+    
+    @action(detail=True, methods=['post'])
+    def restore(self, request: Request, pk: Optional[str] = None) -> Response:
+        """
+        Move an archived enrollment back to the live enrollments.
+        
+        An archived enrollment blocks enrolling in its course again; restoring
+        it brings it back with the id, status and progress it had.
+        """
+        user = cast(User, request.user)
+        archived = ArchivedEnrollment.objects.filter(course__deleted_at__isnull=True).only('id', 'user_id')
+        if not user.is_staff:
+            archived = archived.filter(user_id=user.pk)
+        archived_enrollment = generics.get_object_or_404(archived, pk=pk)
+        self.check_object_permissions(request, archived_enrollment)
+        
+        enrollment = restore_enrollment(archived_enrollment.id)
+        if enrollment is None:
+            return Response({'detail': 'Enrollment is no longer archived.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(EnrollmentDetailSerializer(enrollment).data)
+
+
+# Password hashing is CPU-bound; capping the logins that hash at once keeps a burst
+# of logins from occupying the threads that serve the rest of the API.
+login_hashing_slots = threading.BoundedSemaphore(settings.LOGIN_HASHING_WORKERS)
+
+# Logins hashing plus logins waiting for a hashing slot; beyond this we reject fast.
+login_slots = threading.BoundedSemaphore(settings.LOGIN_HASHING_WORKERS + settings.LOGIN_QUEUE_LIMIT)
+
+LOGIN_BUSY_MESSAGE = 'Login service is busy, please retry shortly'
+
+
+def perform_login(data: Any) -> Tuple[Dict[str, Any], int]:
+    """
+    Authenticate a user and issue tokens.
+    
+    Accepts either username or email with password for authentication.
+    Returns the response body and HTTP status code; shared by the sync and
+    async login endpoints. Callers hold a ``login_slots`` slot; this waits for
+    one of the ``login_hashing_slots``.
+    """
+    username = data.get('username')
+    email = data.get('email')
+    password = data.get('password')
+    
+    if not password:
+        return {"error": "Password is required"}, status.HTTP_400_BAD_REQUEST
+        
+    if not (username or email):
+        return {"error": "Either username or email is required"}, status.HTTP_400_BAD_REQUEST
+    
+    # If email is provided but no username, try to get the user by email
+    if email and not username:
+        try:
+            user_obj = User.objects.get(email=email)
+            username = user_obj.username
+        except User.DoesNotExist:
+            return {"error": "No user found with this email address"}, status.HTTP_401_UNAUTHORIZED
+    
+    # Authenticate with username and password
+    with login_hashing_slots:
+        user = cast(Optional[User], authenticate(username=username, password=password))
+    
+    if user is None:
+        return {"error": "Invalid credentials"}, status.HTTP_401_UNAUTHORIZED
+    
+    # Generate tokens
+    refresh = ClaimsRefreshToken.for_user(user)
+    
+    # The role is resolved once and embedded in the token claims
+    role = refresh[ROLE_CLAIM]
+
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+        'user': {
+            'id': user.pk,
+            'username': user.username,
+            'email': user.email,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'is_staff': user.is_staff,
+            'role': role
+        }
+    }, status.HTTP_200_OK
 
 
 class LoginView(APIView):
@@ -229,6 +554,9 @@ class LoginView(APIView):
     API endpoint for user login.
     Allows login with either username or email along with password.
     Returns access and refresh tokens upon successful authentication.
+    At most ``LOGIN_HASHING_WORKERS`` logins per process hash passwords at
+    once and ``LOGIN_QUEUE_LIMIT`` more wait; further logins get 503 with
+    ``Retry-After``.
     """
     permission_classes = [AllowAny]
     
@@ -238,68 +566,14 @@ class LoginView(APIView):
         
         Accepts either username or email with password for authentication.
         """
-        username = request.data.get('username')
-        email = request.data.get('email')
-        password = request.data.get('password')
-        
-        if not password:
-            return Response(
-                {"error": "Password is required"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-            
-        if not (username or email):
-            return Response(
-                {"error": "Either username or email is required"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # If email is provided but no username, try to get the user by email
-        if email and not username:
-            try:
-                user_obj = User.objects.get(email=email)
-                username = user_obj.username
-            except User.DoesNotExist:
-                return Response(
-                    {"error": "No user found with this email address"},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-        
-        # Authenticate with username and password
-        user = authenticate(username=username, password=password)
-        
-        if user is not None:
-            # Generate tokens
-            refresh = RefreshToken.for_user(user)
-            
-            # Determine user role for token response
-            if user.is_staff:
-                role = 'admin'
-            elif user.groups.filter(name="instructors").exists():
-                role = 'instructor'
-            elif user.groups.filter(name="students").exists():
-                role = 'student'
-            else:
-                role = 'student'  # fallback
-
-            return Response({
-                'refresh': str(refresh),
-                'access': str(refresh.access_token),
-                'user': {
-                    'id': user.id,
-                    'username': user.username,
-                    'email': user.email,
-                    'first_name': user.first_name,
-                    'last_name': user.last_name,
-                    'is_staff': user.is_staff,
-                    'role': role
-                }
-            })
-        else:
-            return Response(
-                {"error": "Invalid credentials"},
-                status=status.HTTP_401_UNAUTHORIZED
-            )
+        if not login_slots.acquire(blocking=False):
+            return Response({'error': LOGIN_BUSY_MESSAGE}, status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            headers={'Retry-After': '1'})
+        try:
+            body, status_code = perform_login(request.data)
+        finally:
+            login_slots.release()
+        return Response(body, status=status_code)
 
 
 class UserEnrollmentsView(generics.ListAPIView):
@@ -308,22 +582,26 @@ class UserEnrollmentsView(generics.ListAPIView):
     permission_classes = [IsOwnerOrAdmin]
     
     def get_queryset(self) -> Any:
-        """Get enrollments for the specified user."""
+        """
+        Get enrollments for the specified user.
+        
+        Archived enrollments are only read with ``?include_archived=1``.
+        """
         user_id = self.kwargs.get('user_id')
         
         # Check if we can get from cache
         cache_key = f"user_enrollments_{user_id}"
-        cached_enrollments = cache.get(cache_key)
-        
-        if cached_enrollments is not None:
-            return cached_enrollments
-        
-        # Get from database if not in cache
-        enrollments = Enrollment.objects.filter(user_id=user_id)
+        enrollments = cache.get(cache_key)
         
-        # Cache for 15 minutes
-        cache.set(cache_key, enrollments, timeout=settings.CACHE_TTL)
+        if enrollments is None:
+            # Get from database if not in cache
+            enrollments = Enrollment.objects.filter(user_id=user_id).for_list()
+            
+            # Cache for 15 minutes
+            cache.set(cache_key, enrollments, timeout=settings.CACHE_TTL)
         
+        if self.request.query_params.get('include_archived') in ('1', 'true'):
+            return with_archived(enrollments, user_id)
         return enrollments
 
 
@@ -335,7 +613,70 @@ class CourseEnrollmentsView(generics.ListAPIView):
     def get_queryset(self) -> Any:
         """Get enrollments for the specified course."""
         course_id = self.kwargs.get('course_id')
-        return Enrollment.objects.filter(course_id=course_id)
+        return Enrollment.objects.filter(course_id=course_id).of_live_accounts().for_list()
+
+
+class CourseBulkEnrollmentView(APIView):
+    """API endpoint to enroll a cohort of users in a course with one request."""
+    permission_classes = [IsAdminUser]
+    
+    def post(self, request: Request, course_id: int) -> Response:
+        """
+        Enroll the given users in the course.
+        
+        The submitted ids are checked with a single query that also flags
+        existing enrollments; the new rows are written with one bulk insert.
+        Unknown ids are reported rather than failing the whole cohort.
+        """
+        course = generics.get_object_or_404(Course.objects.only('id'), pk=course_id)
+        serializer = BulkEnrollmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user_ids = serializer.validated_data['user_ids']
+        
+        # Archived enrollments count as enrollments too
+        known = {
+            user_id: enrolled or archived
+            for user_id, enrolled, archived in User.objects.filter(
+                id__in=user_ids, account_deletion__isnull=True
+            ).annotate(
+                enrolled=Exists(Enrollment.objects.filter(course_id=course.pk, user_id=OuterRef('pk'))),
+                archived=Exists(ArchivedEnrollment.objects.filter(course_id=course.pk, user_id=OuterRef('pk'))),
+            ).values_list('id', 'enrolled', 'archived')
+        }
+        new_ids = [user_id for user_id in user_ids if known.get(user_id) is False]
+        already_enrolled = [user_id for user_id in user_ids if known.get(user_id)]
+        not_found = [user_id for user_id in user_ids if user_id not in known]
+        
+        # ignore_conflicts covers enrollments created concurrently since the check above
+        Enrollment.objects.bulk_create(
+            [Enrollment(user_id=user_id, course_id=course.pk) for user_id in new_ids],
+            ignore_conflicts=True
+        )
+        
+        # Invalidate the enrollment caches of every affected user at once
+        cache.delete_many([f"user_enrollments_{user_id}" for user_id in new_ids])
+        
+        return Response(
+            {
+                'enrolled': new_ids,
+                'already_enrolled': already_enrolled,
+                'not_found': not_found,
+            },
+            status=status.HTTP_201_CREATED if new_ids else status.HTTP_200_OK
+        )
+
+
+def reorder_children(siblings: Any, data: Dict[str, Any]) -> Response:
+    """Apply a validated reorder request to a set of siblings."""
+    try:
+        if 'ids' in data:
+            updated = apply_ordering(siblings, data['ids'])
+        else:
+            updated = move_item(siblings, data['id'], before=data.get('before'), after=data.get('after'))
+    except OrderingError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    order = list(siblings.order_by('order', 'id').values('id', 'order'))
+    return Response({'updated': updated, 'order': order})
 
 
 class ModuleViewSet(viewsets.ModelViewSet):
@@ -350,8 +691,23 @@ class ModuleViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
     
     def get_queryset(self) -> Any:
-        """Filter modules by course_id if provided."""
+        """
+        Filter modules by course_id if provided.
+
+        Retrieval runs in a fixed 3 queries whatever the module size: the module
+        with its activity count, its course with instructor and enrollment count,
+        and its activities.
+        """
         queryset = Module.objects.all()
+        if self.action == 'retrieve':
+            queryset = queryset.annotate(
+                num_activities=Count('activities')
+            ).prefetch_related(
+                Prefetch('course', queryset=Course.objects.select_related('instructor').annotate(
+                    num_enrollments=Count('enrollments')
+                )),
+                Prefetch('activities', queryset=Activity.objects.defer('content').order_by('order')),
+            )
         course_id = self.request.query_params.get('course_id', None)
         if course_id is not None:
             queryset = queryset.filter(course_id=course_id)
@@ -365,6 +721,8 @@ class ModuleViewSet(viewsets.ModelViewSet):
             return ModuleDetailSerializer
         elif self.action in ['create', 'update', 'partial_update']:
             return ModuleCreateSerializer
+        elif self.action == 'reorder':
+            return ModuleReorderSerializer
         return ModuleListSerializer
     
     def get_permissions(self) -> List[Any]:
@@ -385,14 +743,30 @@ class ModuleViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer: Any) -> None:
         """Update a module and invalidate cache."""
         module = serializer.instance
+        previous_course_id = module.course_id
         serializer.save()
-        cache.delete(f"course_modules_{module.course.id}")
+        cache.delete_many([f"course_modules_{previous_course_id}", f"course_modules_{module.course_id}"])
     
     def perform_destroy(self, instance: Any) -> None:
         """Delete a module and invalidate cache."""
         course_id = instance.course.id
         instance.delete()
         cache.delete(f"course_modules_{course_id}")
+    
+    @action(detail=False, methods=['post'])
+    def reorder(self, request: Request) -> Response:
+        """
+        Reorder the modules of a course.
+        
+        Send ``course_id`` with either the full ordering in ``ids`` or a single
+        move as ``id`` plus ``before`` or ``after``. A single move writes one row.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        course = serializer.validated_data['course']
+        response = reorder_children(Module.objects.filter(course_id=course.id), serializer.validated_data)
+        cache.delete(f"course_modules_{course.id}")
+        return response
 
 
 class ActivityViewSet(viewsets.ModelViewSet):
@@ -407,8 +781,17 @@ class ActivityViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
     
     def get_queryset(self) -> Any:
-        """Filter activities by module_id if provided."""
+        """
+        Filter activities by module_id if provided.
+
+        Retrieval runs in a fixed 2 queries: the activity, then its module with
+        the activity count annotated.
+        """
         queryset = Activity.objects.all()
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(
+                Prefetch('module', queryset=Module.objects.annotate(num_activities=Count('activities')))
+            )
         module_id = self.request.query_params.get('module_id', None)
         if module_id is not None:
             queryset = queryset.filter(module_id=module_id)
@@ -422,6 +805,8 @@ class ActivityViewSet(viewsets.ModelViewSet):
             return ActivityDetailSerializer
         elif self.action in ['create', 'update', 'partial_update']:
             return ActivityCreateSerializer
+        elif self.action == 'reorder':
+            return ActivityReorderSerializer
         return ActivityListSerializer
     
     def get_permissions(self) -> List[Any]:
@@ -442,16 +827,77 @@ class ActivityViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer: Any) -> None:
         """Update an activity and invalidate cache."""
         activity = serializer.instance
+        previous_module_id = activity.module_id
         serializer.save()
-        cache.delete(f"module_activities_{activity.module.id}")
+        cache.delete_many([f"module_activities_{previous_module_id}", f"module_activities_{activity.module_id}"])
     
     def perform_destroy(self, instance: Any) -> None:
         """Delete an activity and invalidate cache."""
         module_id = instance.module.id
         instance.delete()
         cache.delete(f"module_activities_{module_id}")
+    
+    @action(detail=False, methods=['post'])
+    def reorder(self, request: Request) -> Response:
+        """
+        Reorder the activities of a module.
+        
+        Send ``module_id`` with either the full ordering in ``ids`` or a single
+        move as ``id`` plus ``before`` or ``after``. A single move writes one row.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        module = serializer.validated_data['module']
+        response = reorder_children(Activity.objects.filter(module_id=module.id), serializer.validated_data)
+        cache.delete(f"module_activities_{module.id}")
+        return response
+
+
+class DataExportViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    API endpoint for personal-data exports of the authenticated user.
+    
+    POST queues an export that the worker builds in the background; poll the
+    job until it is completed, then download the zip archive.
+    """
+    serializer_class = DataExportJobSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+    
+    def get_queryset(self) -> Any:
+        """Only the requesting user's exports."""
+        return DataExportJob.objects.filter(user_id=self.request.user.pk)
+    
+    def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        """Queue a new export unless the user's concurrency limit is reached."""
+        try:
+            job = request_export(request.user)
+        except ExportLimitError as e:
+            return Response({"error": str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        serializer = self.get_serializer(job)
+        response = Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+        response['Location'] = request.build_absolute_uri(reverse('user-export-detail', kwargs={'pk': job.pk}))
+        return response
+    
+    @action(detail=True, methods=['get'])
+    def download(self, request: Request, pk: Optional[str] = None) -> Any:
+        """Stream a completed export archive."""
+        job = cast(DataExportJob, self.get_object())
+        if job.status != DataExportJob.StatusChoices.COMPLETED:
+            return Response({"error": "The export is not ready."}, status=status.HTTP_409_CONFLICT)
+        try:
+            archive = open(export_path(job), 'rb')
+        except FileNotFoundError:
+            DataExportJob.objects.filter(pk=job.pk).update(status=DataExportJob.StatusChoices.EXPIRED, file_name='')
+            return Response({"error": "The export is no longer available."}, status=status.HTTP_410_GONE)
+        return FileResponse(
+            archive,
+            as_attachment=True,
+            filename=f"green-academy-export-{job.pk}.zip",
+            content_type='application/zip'
+        )
 
 
 class TokenVerifyView(TokenViewBase):
     """API endpoint to verify that a token is valid."""
-    serializer_class = TokenVerifySerializer
\ No newline at end of file
+    serializer_class = CachedTokenVerifySerializer
\ No newline at end of file
@@ -0,0 +1,22 @@
+"""
+ASGI config for green_academy project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+
+The Procfile still serves the WSGI application: WhiteNoise and the ``api``
+middleware are sync-only, so under ASGI Django would run every request on one
+thread per worker and ``/api/auth/login/async/`` would gain nothing. Switch to
+``gunicorn green_academy.asgi -k uvicorn.workers.UvicornWorker`` once the
+middleware stack is async-capable.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'green_academy.settings')
+
+application = get_asgi_application()
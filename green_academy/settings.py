@@ -29,6 +29,7 @@ INSTALLED_APPS = [
     # Third-party apps
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'drf_yasg',
     'django_extensions',
     # Local apps
@@ -37,11 +38,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.CompressionMiddleware',  # gzip/brotli for API responses; runs after everything that reads the body
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Add WhiteNoise middleware for static files in production
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',  # reads of safe API requests go to a replica
+    'api.middleware.PoolTimeoutMiddleware',  # 503 when no pooled database connection frees up in time
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -70,10 +74,18 @@ WSGI_APPLICATION = 'green_academy.wsgi.application'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
 from typing import Any, Dict
+
+# Keep connections open between requests instead of paying for connection,
+# TLS and auth setup on every request; health checks drop dead ones first
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))  # seconds; 0 closes after each request
+DB_CONN_HEALTH_CHECKS = os.environ.get('DB_CONN_HEALTH_CHECKS', 'True') == 'True'
+
 DATABASES: Dict[str, Any] = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
     }
 }
 
@@ -81,9 +93,54 @@ DATABASES: Dict[str, Any] = {
 if os.environ.get('DATABASE_URL'):
     import dj_database_url
     DATABASES['default'] = dj_database_url.config(
-        default=os.environ.get('DATABASE_URL')
+        default=os.environ.get('DATABASE_URL'),
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=DB_CONN_HEALTH_CHECKS,
     )
 
+# Read replicas (api.routers.ReplicaRouter), as comma-separated database URLs.
+# Under test they mirror the default database.
+REPLICA_DATABASES: List[str] = []
+if os.environ.get('DATABASE_REPLICA_URLS'):
+    import dj_database_url
+    for index, replica_url in enumerate(os.environ['DATABASE_REPLICA_URLS'].split(',')):
+        alias = f'replica_{index}'
+        DATABASES[alias] = {
+            **dj_database_url.parse(
+                replica_url.strip(), conn_max_age=DB_CONN_MAX_AGE, conn_health_checks=DB_CONN_HEALTH_CHECKS
+            ),
+            'TEST': {'MIRROR': 'default'},
+        }
+        REPLICA_DATABASES.append(alias)
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = 5  # seconds a client reads from the primary after a write
+REPLICA_PIN_COOKIE = 'primary_pin'
+
+# SQLite tuning (api.sqlite), applied to every new SQLite connection
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',  # readers and the writer no longer block each other
+    'synchronous': 'NORMAL',  # fsync at checkpoints only; safe with WAL
+    'busy_timeout': 5000,  # milliseconds a writer waits for the lock before failing
+    'mmap_size': 128 * 1024 * 1024,  # bytes of the database file read through mmap
+    'cache_size': -20000,  # page cache size; negative values are KiB
+}
+# Write transactions take turns per process (api.serialized_sqlite); for threaded workers
+SQLITE_SERIALIZE_WRITES = os.environ.get('SQLITE_SERIALIZE_WRITES', 'False') == 'True'
+if SQLITE_SERIALIZE_WRITES:
+    for database in DATABASES.values():
+        if database['ENGINE'] == 'django.db.backends.sqlite3':
+            database['ENGINE'] = 'api.serialized_sqlite'
+
+# Optional in-process connection pool for threaded workers (api.pooled_postgresql).
+# Size it to at least the threads per worker; Django returns connections after each request.
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 0))  # 0 disables the pool
+DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', 1))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 5))  # seconds to wait for a free connection, then 503
+if DB_POOL_MAX_SIZE:
+    for database in DATABASES.values():
+        if database['ENGINE'] == 'django.db.backends.postgresql':
+            database.update(ENGINE='api.pooled_postgresql', CONN_MAX_AGE=0)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -137,7 +194,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -146,8 +203,9 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
     # Rate limiting to prevent abuse
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        # Constant-memory sliding-window counters instead of timestamp lists
+        'api.throttling.AnonSlidingWindowThrottle',
+        'api.throttling.UserSlidingWindowThrottle'
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/day',  # Limit anonymous users to 100 requests per day
@@ -185,8 +243,70 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    # Embed role/is_staff/ver claims so permission checks need no user lookup
+    'TOKEN_OBTAIN_SERIALIZER': 'api.serializers.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'api.serializers.ClaimsTokenRefreshSerializer',
 }
 
+# Login (api.views.LoginView, api.async_views.async_login): concurrent password hashing and queue bound per process
+LOGIN_HASHING_WORKERS = int(os.environ.get('LOGIN_HASHING_WORKERS', min(4, os.cpu_count() or 1)))
+LOGIN_QUEUE_LIMIT = int(os.environ.get('LOGIN_QUEUE_LIMIT', 32))
+
+# Token housekeeping (api.tokens.prune_expired_tokens, run by `manage.py run_worker`)
+TOKEN_PRUNE_INTERVAL = 60 * 60  # seconds between prune runs
+TOKEN_PRUNE_BATCH_SIZE = 1000
+
+# Bulk user import (api.imports.UserImporter)
+USER_IMPORT_HASH_WORKERS = int(os.environ.get('USER_IMPORT_HASH_WORKERS', os.cpu_count() or 1))  # processes for `manage.py import_users`
+USER_IMPORT_REQUEST_HASH_WORKERS = int(os.environ.get('USER_IMPORT_REQUEST_HASH_WORKERS', 2))  # threads shared by the import endpoint
+USER_IMPORT_BATCH_SIZE = 500
+
+# Course tree import (api.imports.CourseImporter)
+COURSE_IMPORT_BATCH_SIZE = 100  # course trees validated per instructor check
+
+# Activity completion tracking (api.completion)
+COMPLETION_RETIRE_BATCH_SIZE = 500  # enrollments rewritten per transaction when activities are deleted
+
+# Bulk cohort enrollment (api.views.CourseBulkEnrollmentView)
+BULK_ENROLL_MAX = 500  # user ids per request; keeps id__in below SQLite's bound-variable limit
+
+# Batch enrollment progress updates (api.views.EnrollmentViewSet.batch_update)
+ENROLLMENT_BATCH_MAX = 500  # entries per request; all of them are locked in one transaction
+
+# Soft-delete purging (api.deletion.purge_deleted, run by `manage.py run_worker`)
+PURGE_INTERVAL = 60  # seconds between purge runs
+PURGE_CHUNK_SIZE = 500  # rows deleted per transaction
+
+# Enrollment archival (api.archival.archive_enrollments, run by `manage.py run_worker`)
+ENROLLMENT_ARCHIVE_INTERVAL = 60 * 60  # seconds between archival runs
+ENROLLMENT_ARCHIVE_AFTER_DAYS = 365  # finished enrollments not written for this long are archived
+ENROLLMENT_ARCHIVE_BATCH_SIZE = 500  # rows moved per transaction
+
+# Personal-data exports (api.exports, built by `manage.py run_worker`)
+DATA_EXPORT_DIR = os.environ.get('DATA_EXPORT_DIR', os.path.join(BASE_DIR, 'exports'))
+DATA_EXPORT_MAX_ACTIVE = 1  # pending or running exports per user
+DATA_EXPORT_INTERVAL = 10  # seconds between checks for queued exports
+DATA_EXPORT_JOBS_PER_RUN = 5
+DATA_EXPORT_RUNNING_TIMEOUT = 60 * 60  # seconds before a running export is presumed lost with its worker
+DATA_EXPORT_CHUNK_SIZE = 500  # rows fetched per server-side cursor round trip
+DATA_EXPORT_RETENTION_DAYS = 7
+
+# Multi-request batch endpoint (api.batch.BatchView)
+BATCH_MAX_REQUESTS = 20
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', 4))  # threads running parallel GETs
+
+# Progress write-behind buffer (api.progress, flushed by `manage.py run_worker`)
+PROGRESS_FLUSH_INTERVAL = 5  # seconds between flushes of buffered progress reports
+PROGRESS_FLUSH_BATCH_SIZE = 500
+
+# Idempotency-Key support on create endpoints (api.idempotency)
+IDEMPOTENCY_TTL = 60 * 60 * 24  # seconds a response is replayed for retries
+IDEMPOTENCY_LOCK_TIMEOUT = 30  # seconds before an abandoned in-flight marker expires
+
+# Authentication caches (api.authentication.CachedJWTAuthentication)
+JWT_TOKEN_CACHE_SIZE = 10000  # verified tokens kept per process
+JWT_USER_CACHE_TTL = 60  # seconds a user snapshot is reused between requests
+
 # Cache settings
 CACHES = {
     "default": {
@@ -201,6 +321,11 @@ CACHES = {
 # Cache time to live is 15 minutes (in seconds)
 CACHE_TTL = 60 * 15
 
+# Response compression (api.middleware.CompressionMiddleware)
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 500))  # bytes
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+
 # Structured Logging Configuration
 LOGGING = {
     'version': 1,
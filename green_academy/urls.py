@@ -13,6 +13,7 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
+from api.connection_metrics import connection_gauges
 from api.test_views import test_view
 from api.swagger_view import swagger_ui_view
 from typing import List, Union, Dict, Any
@@ -43,7 +44,8 @@ def health_check(request):
         'components': {
             'database': 'up' if db_status else 'down',
             'redis': 'up' if redis_status else 'down',
-        }
+        },
+        'connections': connection_gauges(),
     }
     
     return JsonResponse(response, status=status_code)
@@ -0,0 +1,194 @@
+"""
+Integration tests for Green Academy API enrollment archival.
+These tests cover moving old finished enrollments to the archive and reading them back.
+"""
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from api.archival import archive_enrollments
+from api.deletion import purge_deleted, soft_delete_course
+from api.models import ArchivedEnrollment, Course, Enrollment
+
+
+class EnrollmentArchivalTests(TestCase):
+    """Test the archival job and the include_archived parameter."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.client = APIClient()
+        self.student = User.objects.create_user(username='student', password='student123')
+        instructor = User.objects.create_user(username='instructor', password='instructor123', is_staff=True)
+        self.courses = [
+            Course.objects.create(
+                title=f'Course {i}', description='Course', instructor=instructor, duration='4 weeks'
+            )
+            for i in range(4)
+        ]
+        old = timezone.now() - timedelta(days=800)
+        statuses = [
+            Enrollment.StatusChoices.COMPLETED,
+            Enrollment.StatusChoices.DROPPED,
+            Enrollment.StatusChoices.ACTIVE,
+        ]
+        for course, enrollment_status in zip(self.courses, statuses):
+            enrollment = Enrollment.objects.create(user=self.student, course=course, status=enrollment_status)
+            Enrollment.objects.filter(pk=enrollment.pk).update(enrolled_at=old, updated_at=old)
+        # Finished, but too recent to archive
+        self.recent = Enrollment.objects.create(
+            user=self.student, course=self.courses[3], status=Enrollment.StatusChoices.COMPLETED
+        )
+        self.url = reverse('user-enrollments', args=[self.student.id])
+
+    @override_settings(ENROLLMENT_ARCHIVE_BATCH_SIZE=1)
+    def test_old_finished_enrollments_are_archived_in_batches(self):
+        """Test that only old completed and dropped enrollments move, one batch per transaction."""
+        archived_ids = set(Enrollment.objects.filter(course__in=self.courses[:2]).values_list('id', flat=True))
+
+        with CaptureQueriesContext(connection) as queries:
+            archived = archive_enrollments()
+
+        self.assertEqual(archived, 2)
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT INTO "api_archivedenrollment"')]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(set(ArchivedEnrollment.objects.values_list('id', flat=True)), archived_ids)
+        self.assertEqual(set(Enrollment.objects.values_list('course_id', flat=True)), {self.courses[2].id, self.courses[3].id})
+        self.assertEqual(archive_enrollments(), 0)
+
+    def test_user_enrollments_skip_archive_by_default(self):
+        """Test that the user-enrollment list does not read the archive unless asked."""
+        archive_enrollments()
+        self.client.force_authenticate(user=self.student)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        self.assertFalse(any('api_archivedenrollment' in query['sql'] for query in queries.captured_queries))
+
+    def test_include_archived(self):
+        """Test that include_archived merges archived enrollments, newest first."""
+        archive_enrollments()
+        self.client.force_authenticate(user=self.student)
+
+        response = self.client.get(self.url, {'include_archived': '1'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 4)
+        results = response.data['results']
+        self.assertEqual(results[0]['id'], self.recent.id)
+        self.assertEqual(
+            {result['course']['id'] for result in results},
+            {course.id for course in self.courses}
+        )
+
+    def test_enrollment_list_include_archived(self):
+        """Test that the enrollment list merges the caller's archived enrollments and searches them too."""
+        archive_enrollments()
+        self.client.force_authenticate(user=self.student)
+        url = reverse('enrollment-list')
+
+        self.assertEqual(self.client.get(url).data['count'], 2)
+        response = self.client.get(url, {'include_archived': '1'})
+        self.assertEqual(response.data['count'], 4)
+        self.assertEqual(response.data['results'][0]['id'], self.recent.id)
+
+        response = self.client.get(url, {'include_archived': '1', 'search': self.courses[0].title})
+        self.assertEqual([result['course']['id'] for result in response.data['results']], [self.courses[0].id])
+
+        admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='admin123')
+        self.client.force_authenticate(user=admin)
+        self.assertEqual(self.client.get(url, {'include_archived': '1'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_archival_invalidates_cached_list(self):
+        """Test that archiving drops the cached enrollment list of the affected users."""
+        self.client.force_authenticate(user=self.student)
+        self.assertEqual(self.client.get(self.url).data['count'], 4)
+
+        archive_enrollments()
+
+        self.assertEqual(self.client.get(self.url).data['count'], 2)
+
+    def test_archived_enrollment_blocks_reenrollment(self):
+        """Test that a user cannot enroll again in a course whose enrollment was archived."""
+        archive_enrollments()
+        self.client.force_authenticate(user=self.student)
+
+        response = self.client.post(
+            reverse('enrollment-list'),
+            {'user_id': self.student.id, 'course_id': self.courses[1].id},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='admin123')
+        self.client.force_authenticate(user=admin)
+        response = self.client.post(
+            reverse('course-enrollments-bulk', args=[self.courses[1].id]),
+            {'user_ids': [self.student.id]},
+            format='json'
+        )
+        self.assertEqual(response.data['already_enrolled'], [self.student.id])
+        self.assertFalse(Enrollment.objects.filter(user=self.student, course=self.courses[1]).exists())
+
+    def test_restore_archived_enrollment(self):
+        """Test that an archived enrollment moves back with its id and progress, and only for its owner."""
+        enrollment = Enrollment.objects.get(user=self.student, course=self.courses[0])
+        Enrollment.objects.filter(pk=enrollment.pk).update(completion_percentage=100)
+        archive_enrollments()
+        other = User.objects.create_user(username='other', password='other123')
+        url = reverse('enrollment-restore', args=[enrollment.id])
+
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(user=self.student)
+        response = self.client.post(
+            reverse('enrollment-list'),
+            {'user_id': self.student.id, 'course_id': self.courses[0].id},
+            format='json'
+        )
+        self.assertEqual(response.data['restore'], [url])
+        self.assertEqual(self.client.get(self.url).data['count'], 2)
+
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], enrollment.id)
+        restored = Enrollment.objects.get(pk=enrollment.pk)
+        self.assertEqual(restored.status, Enrollment.StatusChoices.COMPLETED)
+        self.assertEqual(restored.completion_percentage, 100)
+        self.assertFalse(ArchivedEnrollment.objects.filter(pk=enrollment.pk).exists())
+        self.assertEqual(self.client.get(self.url).data['count'], 3)
+        self.assertEqual(archive_enrollments(), 0)
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_recently_finished_enrollments_are_kept(self):
+        """Test that the archive age counts from the last write, not from enrollment."""
+        enrollment = Enrollment.objects.get(user=self.student, course=self.courses[2])
+        enrollment.status = Enrollment.StatusChoices.COMPLETED
+        enrollment.save()
+
+        archive_enrollments()
+
+        self.assertTrue(Enrollment.objects.filter(pk=enrollment.pk).exists())
+
+    def test_purge_removes_archived_enrollments(self):
+        """Test that purging a deleted course also deletes its archived enrollments."""
+        archive_enrollments()
+        soft_delete_course(self.courses[0])
+
+        purge_deleted()
+
+        self.assertFalse(ArchivedEnrollment.objects.filter(course_id=self.courses[0].id).exists())
+        self.assertEqual(ArchivedEnrollment.objects.count(), 1)
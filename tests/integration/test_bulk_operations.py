@@ -0,0 +1,719 @@
+"""
+Integration tests for the Green Academy API bulk operations.
+These tests focus on importing and updating many records in a single request.
+"""
+import io
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from unittest import mock
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.postgresql.base import DatabaseWrapper
+from django.test.utils import CaptureQueriesContext
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from api.models import Activity, Course, Enrollment, EnrollmentQuerySet, Module
+
+
+def locking_sql(querysets):
+    """Compile the queries passed through ``select_for_update`` for PostgreSQL."""
+    postgresql = DatabaseWrapper({**connection.settings_dict, 'ENGINE': 'django.db.backends.postgresql'},
+                                 'locking_sql')
+    # FOR UPDATE is only compiled inside a transaction; nothing connects to the server
+    with mock.patch.object(postgresql, 'get_autocommit', return_value=False):
+        return [queryset.query.get_compiler(connection=postgresql).as_sql()[0] for queryset in querysets]
+
+
+@contextmanager
+def capture_locking_querysets():
+    """Collect the enrollment querysets built with ``select_for_update``."""
+    captured = []
+    original = EnrollmentQuerySet.select_for_update
+
+    def select_for_update(queryset, *args, **kwargs):
+        locked = original(queryset, *args, **kwargs)
+        captured.append(locked)
+        return locked
+
+    with mock.patch.object(EnrollmentQuerySet, 'select_for_update', select_for_update):
+        yield captured
+
+
+class BulkUserImportTests(TestCase):
+    """Test the bulk user import endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.admin = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='admin123'
+        )
+        User.objects.create_user(username='existing', email='existing@example.com', password='existing123')
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse('user-bulk-import')
+
+    def test_csv_import_with_row_errors(self):
+        """Test that valid CSV rows are created and invalid rows are reported."""
+        document = (
+            "username,email,password,first_name,last_name,role\n"
+            "alice,alice@school.org,Gr33nLeaf!2024,Alice,Green,student\n"
+            "bob,bob@school.org,Gr33nLeaf!2024,Bob,Brown,instructor\n"
+            "existing,new@school.org,Gr33nLeaf!2024,,,student\n"
+            "carol,carol@school.org,123,,,student\n"
+            "alice,alice2@school.org,Gr33nLeaf!2024,,,student\n"
+        )
+        response = self.client.generic('POST', self.url, document, content_type='text/csv')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual({error['row'] for error in response.data['errors']}, {4, 5, 6})
+
+        alice = User.objects.get(username='alice')
+        self.assertTrue(alice.check_password('Gr33nLeaf!2024'))
+        self.assertEqual(list(alice.groups.values_list('name', flat=True)), ['students'])
+        bob = User.objects.get(username='bob')
+        self.assertTrue(bob.is_staff)
+        self.assertEqual(list(bob.groups.values_list('name', flat=True)), ['instructors'])
+
+    @override_settings(USER_IMPORT_REQUEST_HASH_WORKERS=2, USER_IMPORT_BATCH_SIZE=3)
+    def test_ndjson_upload_with_hashing_pool(self):
+        """Test an NDJSON upload hashed on the shared thread pool in several batches."""
+        lines = [json.dumps({'username': f'student{i}', 'password': 'Gr33nLeaf!2024'}) for i in range(7)]
+        lines.append(json.dumps({'username': 'existing', 'password': 'Gr33nLeaf!2024'}))
+        lines.append('not json')
+        upload = SimpleUploadedFile('cohort.ndjson', '\n'.join(lines).encode(), content_type='application/octet-stream')
+
+        with mock.patch('api.imports.ProcessPoolExecutor') as process_pool:
+            response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        process_pool.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 7)
+        self.assertEqual([error['row'] for error in response.data['errors']], [8, 9])
+        self.assertTrue(User.objects.get(username='student6').check_password('Gr33nLeaf!2024'))
+
+    def test_invalid_username_rejected(self):
+        """Test that usernames the user API would reject are reported as row errors."""
+        document = (
+            "username,password\n"
+            "dave smith,Gr33nLeaf!2024\n"
+            "erin,Gr33nLeaf!2024\n"
+        )
+        response = self.client.generic('POST', self.url, document, content_type='text/csv')
+
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([error['row'] for error in response.data['errors']], [2])
+        self.assertIn('username', response.data['errors'][0]['errors'])
+
+    @override_settings(USER_IMPORT_REQUEST_HASH_WORKERS=1)
+    def test_concurrent_insert_reported_per_row(self):
+        """Test that a username taken after the uniqueness check fails only its own row."""
+        def hash_and_race(password):
+            User.objects.get_or_create(username='frank')
+            return make_password(password)
+
+        document = (
+            "username,password\n"
+            "frank,Gr33nLeaf!2024\n"
+            "gina,Gr33nLeaf!2024\n"
+        )
+        with mock.patch('api.imports.make_password', side_effect=hash_and_race):
+            response = self.client.generic('POST', self.url, document, content_type='text/csv')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([error['row'] for error in response.data['errors']], [2])
+        self.assertEqual(list(User.objects.get(username='gina').groups.values_list('name', flat=True)), ['students'])
+
+    def test_command_hashes_on_a_process_pool(self):
+        """Test that the management command imports with its own pool of hashing processes."""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as document:
+            document.write("username,password\nhana,Gr33nLeaf!2024\nivan,Gr33nLeaf!2024\n")
+        self.addCleanup(os.remove, document.name)
+
+        call_command('import_users', document.name, workers=2, stdout=io.StringIO(), stderr=io.StringIO())
+
+        self.assertTrue(User.objects.get(username='hana').check_password('Gr33nLeaf!2024'))
+        self.assertTrue(User.objects.filter(username='ivan').exists())
+
+    def test_unknown_format_rejected(self):
+        """Test that a body in an unrecognised format is rejected."""
+        response = self.client.generic('POST', self.url, 'data', content_type='text/plain')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_only(self):
+        """Test that regular users cannot import users."""
+        self.client.force_authenticate(user=User.objects.get(username='existing'))
+        response = self.client.generic('POST', self.url, 'username\n', content_type='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BulkEnrollmentTests(TestCase):
+    """Test the bulk course enrollment endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.admin = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='admin123'
+        )
+        self.course = Course.objects.create(
+            title='Cohort Course',
+            description='Course for cohort enrollment',
+            instructor=self.admin,
+            duration='4 weeks',
+            level=Course.LevelChoices.BEGINNER
+        )
+        self.students = [
+            User.objects.create_user(username=f'cohort{i}', password='student123')
+            for i in range(5)
+        ]
+        Enrollment.objects.create(user=self.students[0], course=self.course)
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse('course-enrollments-bulk', args=[self.course.id])
+
+    def test_bulk_enroll_reports_existing_and_unknown_users(self):
+        """Test that new users are enrolled and the rest are reported."""
+        user_ids = [student.id for student in self.students] + [self.students[1].id, 99999]
+        cache.set(f"user_enrollments_{self.students[2].id}", [], timeout=60)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'user_ids': user_ids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['enrolled'], [student.id for student in self.students[1:]])
+        self.assertEqual(response.data['already_enrolled'], [self.students[0].id])
+        self.assertEqual(response.data['not_found'], [99999])
+        self.assertEqual(Enrollment.objects.filter(course=self.course).count(), 5)
+        self.assertIsNone(cache.get(f"user_enrollments_{self.students[2].id}"))
+        # Course lookup, the combined validation query and a single insert
+        self.assertLessEqual(len(queries), 3)
+
+    def test_bulk_enroll_with_nothing_new(self):
+        """Test that re-submitting an enrolled cohort creates nothing."""
+        response = self.client.post(self.url, {'user_ids': [self.students[0].id]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['enrolled'], [])
+        self.assertEqual(response.data['already_enrolled'], [self.students[0].id])
+
+    @override_settings(BULK_ENROLL_MAX=3)
+    def test_bulk_enroll_size_limit(self):
+        """Test that cohorts larger than BULK_ENROLL_MAX are rejected before any query on them."""
+        user_ids = [student.id for student in self.students]
+        response = self.client.post(self.url, {'user_ids': user_ids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('user_ids', response.data)
+        self.assertEqual(Enrollment.objects.filter(course=self.course).count(), 1)
+
+    def test_bulk_enroll_validation(self):
+        """Test that empty lists and unknown courses are rejected."""
+        response = self.client.post(self.url, {'user_ids': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        url = reverse('course-enrollments-bulk', args=[99999])
+        response = self.client.post(url, {'user_ids': [self.students[1].id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_admin_only(self):
+        """Test that regular users cannot enroll a cohort."""
+        self.client.force_authenticate(user=self.students[1])
+        response = self.client.post(self.url, {'user_ids': [self.students[1].id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BatchEnrollmentUpdateTests(TestCase):
+    """Test the batch enrollment progress endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        instructor = User.objects.create_user(username='instructor', password='instructor123')
+        self.student = User.objects.create_user(username='student', password='student123')
+        self.other = User.objects.create_user(username='other', password='other123')
+        courses = [
+            Course.objects.create(
+                title=f'Course {i}',
+                description='Course for progress sync',
+                instructor=instructor,
+                duration='2 weeks',
+                level=Course.LevelChoices.BEGINNER
+            )
+            for i in range(3)
+        ]
+        self.enrollments = [Enrollment.objects.create(user=self.student, course=course) for course in courses]
+        self.foreign = Enrollment.objects.create(user=self.other, course=courses[0])
+        self.url = reverse('enrollment-batch-update')
+
+    def test_batch_update_applies_all_changes(self):
+        """Test that every entry is applied with a fixed number of queries."""
+        self.client.force_authenticate(user=self.student)
+        cache.set(f"user_enrollments_{self.student.id}", [], timeout=60)
+        payload = [
+            {'id': self.enrollments[0].id, 'completion_percentage': 40},
+            {'id': self.enrollments[1].id, 'status': 'COM', 'completion_percentage': 100},
+            {'id': self.enrollments[2].id, 'status': 'PAU'},
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        # Ownership check and a single bulk update, plus transaction bookkeeping
+        self.assertLessEqual(
+            len([query for query in queries.captured_queries if 'api_enrollment' in query['sql']]), 2
+        )
+        self.assertIsNone(cache.get(f"user_enrollments_{self.student.id}"))
+
+        first, second, third = (Enrollment.objects.get(pk=enrollment.pk) for enrollment in self.enrollments)
+        self.assertEqual((first.status, first.completion_percentage), ('ACT', 40))
+        self.assertEqual((second.status, second.completion_percentage), ('COM', 100))
+        self.assertEqual((third.status, third.completion_percentage), ('PAU', 0))
+
+    def test_batch_update_locks_only_enrollment_rows(self):
+        """Test that the batch locks enrollment rows with FOR UPDATE OF, as PostgreSQL requires."""
+        self.client.force_authenticate(user=self.student)
+        payload = [{'id': self.enrollments[0].id, 'completion_percentage': 40}]
+
+        with capture_locking_querysets() as querysets:
+            response = self.client.patch(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [sql] = locking_sql(querysets)
+        self.assertTrue(sql.endswith('FOR UPDATE OF "api_enrollment"'), sql)
+
+    def test_batch_rejected_when_an_enrollment_is_not_owned(self):
+        """Test that one foreign enrollment rejects the whole batch."""
+        self.client.force_authenticate(user=self.student)
+        payload = [
+            {'id': self.enrollments[0].id, 'completion_percentage': 50},
+            {'id': self.foreign.id, 'completion_percentage': 50},
+        ]
+
+        response = self.client.patch(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['ids'], [self.foreign.id])
+        self.assertEqual(Enrollment.objects.get(pk=self.enrollments[0].pk).completion_percentage, 0)
+
+    def test_batch_validation(self):
+        """Test that empty batches and out-of-range values are rejected."""
+        self.client.force_authenticate(user=self.student)
+        self.assertEqual(self.client.patch(self.url, [], format='json').status_code, status.HTTP_400_BAD_REQUEST)
+
+        payload = [{'id': self.enrollments[0].id, 'completion_percentage': 150}]
+        response = self.client.patch(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(ENROLLMENT_BATCH_MAX=2)
+    def test_batch_size_limit(self):
+        """Test that batches above ENROLLMENT_BATCH_MAX are rejected before any row is locked."""
+        self.client.force_authenticate(user=self.student)
+        payload = [{'id': enrollment.id, 'status': 'completed'} for enrollment in self.enrollments[:2]] * 2
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(queries.captured_queries), 0)
+
+    def test_admin_can_update_any_enrollment(self):
+        """Test that admins can update enrollments of any user."""
+        admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='admin123')
+        self.client.force_authenticate(user=admin)
+        payload = [
+            {'id': self.enrollments[0].id, 'status': 'DRO'},
+            {'id': self.foreign.id, 'completion_percentage': 10},
+        ]
+
+        response = self.client.patch(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Enrollment.objects.get(pk=self.foreign.pk).completion_percentage, 10)
+
+
+class ActivityCompletionTests(TestCase):
+    """Test batch activity completion for enrollments."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        instructor = User.objects.create_user(username='instructor', password='instructor123')
+        self.student = User.objects.create_user(username='student', password='student123')
+        self.course = Course.objects.create(
+            title='Tracked Course',
+            description='Course with tracked activities',
+            instructor=instructor,
+            duration='3 weeks',
+            level=Course.LevelChoices.BEGINNER
+        )
+        modules = [
+            Module.objects.create(course=self.course, title=f'Module {i}', description='Module', order=i)
+            for i in range(2)
+        ]
+        self.activities = [
+            Activity.objects.create(module=modules[i % 2], title=f'Activity {i}', description='Activity', order=i)
+            for i in range(4)
+        ]
+        self.enrollment = Enrollment.objects.create(user=self.student, course=self.course)
+        self.client.force_authenticate(user=self.student)
+        self.url = reverse('enrollment-completions', args=[self.enrollment.id])
+
+    def test_completions_derive_progress_incrementally(self):
+        """Test that completing activities updates the count and percentage."""
+        ids = [activity.id for activity in self.activities]
+        response = self.client.post(self.url, {'activity_ids': ids[:3] + [ids[0]]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['completed'], ids[:3])
+        self.assertEqual(response.data['completed_count'], 3)
+        self.assertEqual(response.data['completion_percentage'], 75)
+
+        response = self.client.post(self.url, {'activity_ids': ids[2:]}, format='json')
+        self.assertEqual(response.data['completed'], [ids[3]])
+        self.assertEqual(response.data['completion_percentage'], 100)
+        self.assertEqual(response.data['status'], Enrollment.StatusChoices.COMPLETED)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['activity_ids'], ids)
+        enrollment = Enrollment.objects.get(pk=self.enrollment.pk)
+        self.assertEqual(bytes(enrollment.completed_activities), b'\x0f')
+
+    def test_deleted_activities_do_not_count(self):
+        """Test that completions of deleted activities do not bring the enrollment to 100%."""
+        ids = [activity.id for activity in self.activities]
+        self.client.post(self.url, {'activity_ids': ids[:2]}, format='json')
+        self.activities[0].delete()
+        self.activities[1].delete()
+
+        response = self.client.post(self.url, {'activity_ids': [ids[2]]}, format='json')
+
+        self.assertEqual(response.data['completed_count'], 1)
+        self.assertEqual(response.data['completion_percentage'], 50)
+        self.assertEqual(response.data['status'], Enrollment.StatusChoices.ACTIVE)
+        self.assertEqual(bytes(Enrollment.objects.get(pk=self.enrollment.pk).completed_activities), b'\x04')
+
+    def test_completions_do_not_recount(self):
+        """Test that a completion reads only the submitted activities and adds the flipped bits."""
+        Enrollment.objects.filter(pk=self.enrollment.pk).update(completed_activities=b'\x01', completed_count=1)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'activity_ids': [self.activities[1].id]}, format='json')
+
+        self.assertEqual(response.data['completed_count'], 2)
+        self.assertEqual(response.data['completion_percentage'], 50)
+        activity_reads = [query['sql'] for query in queries.captured_queries if 'FROM "api_activity"' in query['sql']]
+        self.assertEqual(len(activity_reads), 1)
+        self.assertIn('"api_activity"."id" IN', activity_reads[0])
+
+    def test_module_deletion_retires_its_activities(self):
+        """Test that deleting a module clears its activities' bits and lowers the course total."""
+        ids = [activity.id for activity in self.activities]
+        self.client.post(self.url, {'activity_ids': ids[:2]}, format='json')
+
+        self.activities[0].module.delete()
+
+        enrollment = Enrollment.objects.get(pk=self.enrollment.pk)
+        self.assertEqual(Course.objects.get(pk=self.course.pk).live_activity_count, 2)
+        self.assertEqual(bytes(enrollment.completed_activities), b'\x02')
+        self.assertEqual(enrollment.completed_count, 1)
+        self.assertEqual(enrollment.completion_percentage, 50)
+
+    def _other_course(self):
+        """A second course with one activity at position 0 and an enrollment in it."""
+        other_course = Course.objects.create(
+            title='Other Course', description='Other', instructor=self.student, duration='1 week'
+        )
+        other_module = Module.objects.create(course=other_course, title='Other', description='Other', order=1)
+        existing = Activity.objects.create(module=other_module, title='Existing', description='Existing')
+        other_enrollment = Enrollment.objects.create(user=self.student, course=other_course)
+        return other_course, other_module, existing, other_enrollment
+
+    def test_activity_moved_to_another_course_gets_new_position(self):
+        """Test that moving an activity across courses does not make it share a bit."""
+        other_course, other_module, existing, other_enrollment = self._other_course()
+        moved = self.activities[0]
+        self.client.post(self.url, {'activity_ids': [moved.id]}, format='json')
+
+        response = self.client.patch(
+            reverse('activity-detail', args=[moved.id]), {'module_id': other_module.id}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        moved.refresh_from_db()
+        self.assertNotEqual(moved.position, existing.position)
+        self.assertEqual(Course.objects.get(pk=other_course.pk).live_activity_count, 2)
+        self.assertEqual(Course.objects.get(pk=self.course.pk).live_activity_count, 3)
+        self.assertEqual(Enrollment.objects.get(pk=self.enrollment.pk).completed_count, 0)
+
+        url = reverse('enrollment-completions', args=[other_enrollment.id])
+        self.client.post(url, {'activity_ids': [existing.id]}, format='json')
+        response = self.client.get(url)
+        self.assertEqual(response.data['activity_ids'], [existing.id])
+        self.assertEqual(response.data['completed_count'], 1)
+        self.assertEqual(response.data['completion_percentage'], 50)
+
+    def test_module_moved_to_another_course_moves_positions(self):
+        """Test that moving a module gives its activities new positions in the new course."""
+        other_course, _, existing, other_enrollment = self._other_course()
+        module = self.activities[0].module
+
+        response = self.client.patch(
+            reverse('module-detail', args=[module.id]), {'course_id': other_course.id}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        positions = list(Activity.objects.filter(module__course=other_course).values_list('position', flat=True))
+        self.assertEqual(len(positions), len(set(positions)))
+        self.assertEqual(Course.objects.get(pk=other_course.pk).live_activity_count, 3)
+        self.assertEqual(Course.objects.get(pk=self.course.pk).live_activity_count, 2)
+
+        url = reverse('enrollment-completions', args=[other_enrollment.id])
+        self.client.post(url, {'activity_ids': [existing.id]}, format='json')
+        self.assertEqual(self.client.get(url).data['activity_ids'], [existing.id])
+
+    def test_percentage_cannot_be_set_where_derived(self):
+        """Test that direct, batched and buffered percentage writes are rejected in a tracked course."""
+        detail_url = reverse('enrollment-detail', args=[self.enrollment.id])
+        response = self.client.patch(detail_url, {'completion_percentage': 90}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.patch(
+            reverse('enrollment-batch-update'), [{'id': self.enrollment.id, 'completion_percentage': 90}], format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['ids'], [self.enrollment.id])
+
+        response = self.client.post(
+            reverse('enrollment-progress', args=[self.enrollment.id]), {'completion_percentage': 90}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Enrollment.objects.get(pk=self.enrollment.pk).completion_percentage, 0)
+
+        # Status changes are still accepted
+        response = self.client.patch(detail_url, {'status': Enrollment.StatusChoices.DROPPED}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_completions_lock_only_enrollment_rows(self):
+        """Test that recording completions locks enrollment rows with FOR UPDATE OF."""
+        with capture_locking_querysets() as querysets:
+            response = self.client.post(self.url, {'activity_ids': [self.activities[0].id]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [sql] = locking_sql(querysets)
+        self.assertTrue(sql.endswith('FOR UPDATE OF "api_enrollment"'), sql)
+
+    def test_activities_from_other_courses_are_rejected(self):
+        """Test that a batch with a foreign activity is rejected as a whole."""
+        other_course = Course.objects.create(
+            title='Other Course', description='Other', instructor=self.student, duration='1 week'
+        )
+        other_module = Module.objects.create(course=other_course, title='Other', description='Other', order=1)
+        foreign = Activity.objects.create(module=other_module, title='Foreign', description='Foreign')
+
+        payload = {'activity_ids': [self.activities[0].id, foreign.id]}
+        response = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['activity_ids'], [foreign.id])
+        self.assertEqual(Enrollment.objects.get(pk=self.enrollment.pk).completed_count, 0)
+
+
+class ReorderTests(TestCase):
+    """Test reordering modules and activities."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.instructor = User.objects.create_user(username='instructor', password='instructor123', is_staff=True)
+        self.course = Course.objects.create(
+            title='Ordered Course',
+            description='Course with ordered content',
+            instructor=self.instructor,
+            duration='2 weeks',
+            level=Course.LevelChoices.BEGINNER
+        )
+        self.module = Module.objects.create(course=self.course, title='Module', description='Module', order=1)
+        self.activities = [
+            Activity.objects.create(module=self.module, title=f'Activity {i}', description='Activity', order=i + 1)
+            for i in range(4)
+        ]
+        self.client.force_authenticate(user=self.instructor)
+        self.url = reverse('activity-reorder')
+
+    def ordered_ids(self):
+        return list(Activity.objects.filter(module=self.module).order_by('order').values_list('id', flat=True))
+
+    def test_full_ordering(self):
+        """Test that a full ordering spaces items out with gaps."""
+        ids = [activity.id for activity in reversed(self.activities)]
+        response = self.client.post(self.url, {'module_id': self.module.id, 'ids': ids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.ordered_ids(), ids)
+        self.assertEqual([item['order'] for item in response.data['order']], [1024, 2048, 3072, 4096])
+
+    def test_single_move_touches_one_row(self):
+        """Test that a move between gapped neighbours writes only the moved row."""
+        ids = [activity.id for activity in self.activities]
+        self.client.post(self.url, {'module_id': self.module.id, 'ids': ids}, format='json')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                self.url, {'module_id': self.module.id, 'id': ids[3], 'after': ids[0]}, format='json'
+            )
+
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(len([query for query in queries.captured_queries if query['sql'].startswith('UPDATE')]), 1)
+        self.assertEqual(self.ordered_ids(), [ids[0], ids[3], ids[1], ids[2]])
+
+        self.client.post(self.url, {'module_id': self.module.id, 'id': ids[2]}, format='json')
+        self.assertEqual(self.ordered_ids(), [ids[2], ids[0], ids[3], ids[1]])
+
+    def test_exhausted_gap_rebalances(self):
+        """Test that dense orders are rebalanced when a move has no room."""
+        ids = [activity.id for activity in self.activities]
+        response = self.client.post(
+            self.url, {'module_id': self.module.id, 'id': ids[3], 'before': ids[1]}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.ordered_ids(), [ids[0], ids[3], ids[1], ids[2]])
+        self.assertEqual([item['order'] for item in response.data['order']], [1024, 2048, 3072, 4096])
+
+    def test_invalid_orderings_rejected(self):
+        """Test that incomplete orderings and foreign items are rejected."""
+        ids = [activity.id for activity in self.activities]
+        response = self.client.post(self.url, {'module_id': self.module.id, 'ids': ids[:3]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        other = Module.objects.create(course=self.course, title='Other', description='Other', order=2)
+        response = self.client.post(self.url, {'module_id': other.id, 'id': ids[0]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            self.url, {'module_id': self.module.id, 'id': ids[0], 'before': ids[1], 'after': ids[2]}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_module_reorder(self):
+        """Test reordering the modules of a course."""
+        second = Module.objects.create(course=self.course, title='Second', description='Module', order=2)
+        url = reverse('module-reorder')
+        response = self.client.post(url, {'course_id': self.course.id, 'id': second.id}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['order']], [second.id, self.module.id])
+
+
+class CourseImportTests(TestCase):
+    """Test the course tree import endpoint and command."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.admin = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='admin123'
+        )
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse('course-import-courses')
+
+    def tree(self, title, instructor_id=None):
+        return {
+            'title': title,
+            'description': 'Imported course',
+            'instructor_id': instructor_id or self.admin.id,
+            'duration': '4 weeks',
+            'modules': [
+                {
+                    'title': f'{title} module {m}',
+                    'description': 'Imported module',
+                    'activities': [
+                        {'title': f'Activity {a}', 'description': 'Imported activity', 'type': 'quiz'}
+                        for a in range(3)
+                    ],
+                }
+                for m in range(2)
+            ],
+        }
+
+    def test_ndjson_import_with_bulk_inserts(self):
+        """Test that each course tree is written with a handful of inserts."""
+        lines = [json.dumps(self.tree(f'Course {i}')) for i in range(3)]
+        lines.append(json.dumps(self.tree('Orphan', instructor_id=99999)))
+        lines.append(json.dumps({'title': 'Incomplete'}))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.generic(
+                'POST', self.url, '\n'.join(lines), content_type='application/x-ndjson'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['created'], response.data['modules'], response.data['activities']), (3, 6, 18))
+        self.assertEqual([error['row'] for error in response.data['errors']], [4, 5])
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 3 * 3)
+
+        course = Course.objects.get(title='Course 1')
+        self.assertEqual(course.activity_slots, 6)
+        activities = Activity.objects.filter(module__course=course).order_by('position')
+        self.assertEqual([activity.position for activity in activities], list(range(6)))
+        self.assertEqual(list(course.modules.values_list('order', flat=True)), [1024, 2048])
+
+    def test_csv_import(self):
+        """Test a CSV document with one row per activity."""
+        document = (
+            "course_title,course_description,course_instructor_id,course_duration,"
+            "module_title,module_description,activity_title,activity_description\n"
+            f"Botany,Plants,{self.admin.id},2 weeks,Roots,Below ground,Taproots,Deep roots\n"
+            f"Botany,Plants,{self.admin.id},2 weeks,Roots,Below ground,Fibrous roots,Shallow roots\n"
+            f"Botany,Plants,{self.admin.id},2 weeks,Leaves,Above ground,,\n"
+            f"Ecology,Systems,{self.admin.id},3 weeks,Biomes,Regions,Tundra,Cold\n"
+        )
+        response = self.client.generic('POST', self.url, document, content_type='text/csv')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['created'], response.data['modules'], response.data['activities']), (2, 3, 3))
+        botany = Course.objects.get(title='Botany')
+        self.assertEqual(
+            [(module.title, module.activities.count()) for module in botany.modules.all()],
+            [('Roots', 2), ('Leaves', 0)]
+        )
+
+    def test_management_command(self):
+        """Test that the command imports a file and reports throughput."""
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as handle:
+            handle.write(json.dumps(self.tree('Command course')) + '\n')
+        self.addCleanup(os.remove, handle.name)
+        out = StringIO()
+        call_command('import_courses', handle.name, stdout=out)
+
+        self.assertIn('courses/s', out.getvalue())
+        self.assertTrue(Course.objects.filter(title='Command course').exists())
+
+    def test_admin_only(self):
+        """Test that regular users cannot import courses."""
+        self.client.force_authenticate(user=User.objects.create_user(username='student', password='student123'))
+        response = self.client.generic('POST', self.url, '{}', content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,156 @@
+"""
+Integration tests for Green Academy API personal-data exports.
+These tests cover queueing, building and downloading export archives.
+"""
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from api.completion import record_completions
+from api.exports import export_path, run_data_exports
+from api.models import Activity, ArchivedEnrollment, Course, DataExportJob, Enrollment, Module
+
+
+class DataExportTests(TestCase):
+    """Test the asynchronous personal-data export flow."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.export_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.export_dir)
+        override = override_settings(DATA_EXPORT_DIR=self.export_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.client = APIClient()
+        self.instructor = User.objects.create_user(username='instructor', password='instructor123', is_staff=True)
+        self.student = User.objects.create_user(username='student', email='student@example.com', password='student123')
+        course = Course.objects.create(
+            title='Exported Course',
+            description='Course in an export',
+            instructor=self.instructor,
+            duration='2 weeks'
+        )
+        module = Module.objects.create(course=course, title='Module', description='Module', order=1)
+        self.activities = [
+            Activity.objects.create(module=module, title=f'Activity {i}', description='Activity', order=i)
+            for i in range(2)
+        ]
+        enrollment = Enrollment.objects.create(user=self.student, course=course)
+        record_completions(enrollment.id, [self.activities[1].id])
+        self.url = reverse('user-export-personal-data')
+
+    def test_export_is_built_in_background_and_downloaded(self):
+        """Test queueing, polling and downloading an export."""
+        self.client.force_authenticate(user=self.student)
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], DataExportJob.StatusChoices.PENDING)
+        detail_url = response['Location']
+
+        self.assertEqual(run_data_exports(), 1)
+
+        response = self.client.get(detail_url)
+        self.assertEqual(response.data['status'], DataExportJob.StatusChoices.COMPLETED)
+        download = self.client.get(response.data['download_url'])
+        self.assertEqual(download.status_code, status.HTTP_200_OK)
+
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(download.streaming_content)))
+        profile = json.loads(archive.read('profile.json'))
+        self.assertEqual(profile['email'], 'student@example.com')
+        enrollments = [json.loads(line) for line in archive.read('enrollments.ndjson').splitlines()]
+        self.assertEqual(enrollments[0]['completed_activity_ids'], [self.activities[1].id])
+        self.assertEqual(enrollments[0]['completion_percentage'], 50)
+
+    def test_export_includes_archived_enrollments(self):
+        """Test that enrollments moved to the archive are exported too."""
+        enrollment = Enrollment.objects.get(user=self.student)
+        ArchivedEnrollment.objects.create(
+            id=enrollment.id + 1000, user=self.student, course=enrollment.course,
+            enrolled_at=enrollment.enrolled_at, status=Enrollment.StatusChoices.COMPLETED, completion_percentage=100
+        )
+        self.client.force_authenticate(user=self.student)
+        self.client.post(self.url)
+        run_data_exports()
+
+        job = DataExportJob.objects.get(user=self.student)
+        with zipfile.ZipFile(export_path(job)) as archive:
+            enrollments = [json.loads(line) for line in archive.read('enrollments.ndjson').splitlines()]
+        self.assertEqual([enrollment['archived'] for enrollment in enrollments], [False, True])
+
+    def test_instructor_export_includes_authored_courses(self):
+        """Test that courses and content the user authored are exported."""
+        self.client.force_authenticate(user=self.instructor)
+        self.client.post(self.url)
+        run_data_exports()
+
+        job = DataExportJob.objects.get(user=self.instructor)
+        with zipfile.ZipFile(f"{self.export_dir}/{job.file_name}") as archive:
+            courses = archive.read('courses_taught.ndjson').splitlines()
+            content = archive.read('course_content.ndjson').splitlines()
+        self.assertEqual(len(courses), 1)
+        self.assertEqual(len(content), 2)
+
+    def test_one_export_in_progress_per_user(self):
+        """Test the per-user concurrency limit."""
+        self.client.force_authenticate(user=self.student)
+        self.assertEqual(self.client.post(self.url).status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(self.client.post(self.url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        run_data_exports()
+        self.assertEqual(self.client.post(self.url).status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(len(self.client.get(self.url).data), 2)
+
+    def test_exports_are_private(self):
+        """Test that users cannot see or download other users' exports."""
+        self.client.force_authenticate(user=self.student)
+        job_id = self.client.post(self.url).data['id']
+        run_data_exports()
+
+        self.client.force_authenticate(user=self.instructor)
+        response = self.client.get(reverse('user-export-download', kwargs={'pk': job_id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_download_before_completion(self):
+        """Test that a pending export cannot be downloaded yet."""
+        self.client.force_authenticate(user=self.student)
+        job_id = self.client.post(self.url).data['id']
+        response = self.client.get(reverse('user-export-download', kwargs={'pk': job_id}))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_abandoned_running_export_is_failed(self):
+        """Test that a running export whose worker died stops counting against the limit."""
+        self.client.force_authenticate(user=self.student)
+        job_id = self.client.post(self.url).data['id']
+        DataExportJob.objects.filter(pk=job_id).update(
+            status=DataExportJob.StatusChoices.RUNNING, started_at=timezone.now() - timedelta(days=1)
+        )
+        self.assertEqual(self.client.post(self.url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        run_data_exports()
+
+        self.assertEqual(DataExportJob.objects.get(pk=job_id).status, DataExportJob.StatusChoices.FAILED)
+        self.assertEqual(self.client.post(self.url).status_code, status.HTTP_202_ACCEPTED)
+
+    def test_download_of_missing_archive(self):
+        """Test that an archive missing from disk is reported as gone and the job expired."""
+        self.client.force_authenticate(user=self.student)
+        job_id = self.client.post(self.url).data['id']
+        run_data_exports()
+        os.remove(export_path(DataExportJob.objects.get(pk=job_id)))
+
+        response = self.client.get(reverse('user-export-download', kwargs={'pk': job_id}))
+
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        self.assertEqual(DataExportJob.objects.get(pk=job_id).status, DataExportJob.StatusChoices.EXPIRED)
@@ -0,0 +1,137 @@
+"""
+Integration tests for Green Academy API soft deletion.
+These tests cover deleting courses and accounts and purging them in the background.
+"""
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from api.deletion import purge_deleted
+from api.models import AccountDeletion, Activity, Course, Enrollment, Module
+
+
+class SoftDeleteTests(TestCase):
+    """Test soft deletion of courses and accounts and the purge job."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='admin123'
+        )
+        self.instructor = User.objects.create_user(username='instructor', password='instructor123', is_staff=True)
+        self.students = [User.objects.create_user(username=f'student{i}', password='student123') for i in range(5)]
+        self.course = Course.objects.create(
+            title='Doomed Course',
+            description='Course to delete',
+            instructor=self.instructor,
+            duration='4 weeks'
+        )
+        module = Module.objects.create(course=self.course, title='Module', description='Module', order=1)
+        for i in range(3):
+            Activity.objects.create(module=module, title=f'Activity {i}', description='Activity', order=i)
+        for student in self.students:
+            Enrollment.objects.create(user=student, course=self.course)
+
+    def test_course_delete_returns_immediately(self):
+        """Test that deleting a course marks it and hides its content."""
+        self.client.force_authenticate(user=self.admin)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(reverse('course-detail', args=[self.course.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(any(query['sql'].startswith('DELETE') for query in queries.captured_queries))
+        self.assertFalse(Course.objects.filter(pk=self.course.pk).exists())
+        self.assertEqual(Module.objects.filter(course_id=self.course.pk).count(), 0)
+        self.assertEqual(Activity.objects.count(), 0)
+        self.assertEqual(Enrollment.objects.count(), 0)
+        self.assertEqual(Enrollment.all_objects.count(), 5)
+        response = self.client.get(reverse('course-detail', args=[self.course.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(PURGE_CHUNK_SIZE=2)
+    def test_purge_deletes_in_chunks(self):
+        """Test that the purge job removes rows in bounded chunks."""
+        self.client.force_authenticate(user=self.admin)
+        self.client.delete(reverse('course-detail', args=[self.course.id]))
+
+        with CaptureQueriesContext(connection) as queries:
+            deleted = purge_deleted()
+
+        self.assertEqual(deleted, 5 + 3 + 1 + 1)
+        enrollment_deletes = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('DELETE FROM "api_enrollment" WHERE "api_enrollment"."id" IN')
+        ]
+        self.assertEqual(len(enrollment_deletes), 3)
+        self.assertFalse(Course.all_objects.filter(pk=self.course.pk).exists())
+        self.assertEqual(Activity.all_objects.count(), 0)
+
+    def test_account_deletion(self):
+        """Test that deleting an account deactivates it and purges it later."""
+        student = self.students[0]
+        self.client.force_authenticate(user=student)
+        response = self.client.delete(reverse('user-delete-account'))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        student.refresh_from_db()
+        self.assertFalse(student.is_active)
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(reverse('course-enrollments', args=[self.course.id]))
+        self.assertNotIn(student.id, [enrollment['user']['id'] for enrollment in response.data['results']])
+        self.assertEqual(response.data['count'], 4)
+        usernames = [user['username'] for user in self.client.get(reverse('user-list')).data['results']]
+        self.assertNotIn(student.username, usernames)
+
+        purge_deleted()
+        self.assertFalse(User.objects.filter(pk=student.pk).exists())
+        self.assertFalse(AccountDeletion.objects.exists())
+        self.assertEqual(Enrollment.all_objects.count(), 4)
+
+    def test_instructor_deletion_removes_taught_courses(self):
+        """Test that deleting an instructor soft-deletes the courses they teach."""
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.delete(reverse('user-detail', args=[self.instructor.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Course.objects.exists())
+
+        purge_deleted()
+        self.assertFalse(User.objects.filter(pk=self.instructor.pk).exists())
+        self.assertEqual(Enrollment.all_objects.count(), 0)
+        self.assertEqual(Module.all_objects.count(), 0)
+
+    def _cached_enrollments(self, student):
+        self.client.force_authenticate(user=student)
+        response = self.client.get(reverse('user-enrollments', args=[student.id]))
+        return response.data['results'] if 'results' in response.data else response.data
+
+    def test_course_deletion_invalidates_student_enrollment_caches(self):
+        """Test that students stop seeing a deleted course in their cached enrollment lists."""
+        self.assertEqual(len(self._cached_enrollments(self.students[0])), 1)
+
+        self.client.force_authenticate(user=self.admin)
+        self.client.delete(reverse('course-detail', args=[self.course.id]))
+
+        self.assertEqual(len(self._cached_enrollments(self.students[0])), 0)
+
+    def test_instructor_deletion_invalidates_student_enrollment_caches(self):
+        """Test that deleting an instructor drops the cached enrollment lists of their students."""
+        self.assertEqual(len(self._cached_enrollments(self.students[0])), 1)
+        cache.set(f"course_modules_{self.course.id}", ['stale'])
+
+        self.client.force_authenticate(user=self.admin)
+        self.client.delete(reverse('user-detail', args=[self.instructor.id]))
+
+        self.assertEqual(len(self._cached_enrollments(self.students[0])), 0)
+        self.assertIsNone(cache.get(f"course_modules_{self.course.id}"))
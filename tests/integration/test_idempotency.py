@@ -0,0 +1,112 @@
+"""
+Integration tests for Green Academy API idempotency keys.
+These tests cover retried create requests carrying an Idempotency-Key header.
+"""
+from types import SimpleNamespace
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from api.idempotency import idempotency_cache_key
+from api.models import Course, Enrollment
+
+
+class IdempotencyKeyTests(TestCase):
+    """Test replaying create requests with an Idempotency-Key."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.client = APIClient()
+        self.student = User.objects.create_user(username='student', password='student123')
+        instructor = User.objects.create_user(username='instructor', password='instructor123', is_staff=True)
+        self.course = Course.objects.create(
+            title='Retry Course',
+            description='Course enrolled from a flaky network',
+            instructor=instructor,
+            duration='2 weeks'
+        )
+        self.url = reverse('enrollment-list')
+        self.payload = {'user_id': self.student.id, 'course_id': self.course.id}
+
+    def test_retry_replays_without_database_access(self):
+        """Test that a retried enrollment returns the stored response without queries."""
+        self.client.force_authenticate(user=self.student)
+        first = self.client.post(self.url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='enroll-1')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+
+        with CaptureQueriesContext(connection) as queries:
+            retry = self.client.post(self.url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='enroll-1')
+
+        self.assertEqual(len(queries.captured_queries), 0)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Enrollment.objects.filter(user=self.student).count(), 1)
+
+    def test_key_reused_with_different_body(self):
+        """Test that a key cannot be reused for a different request."""
+        other = Course.objects.create(
+            title='Other Course', description='Another course', instructor=self.course.instructor, duration='1 week'
+        )
+        self.client.force_authenticate(user=self.student)
+        self.client.post(self.url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='enroll-1')
+        response = self.client.post(self.url, {'user_id': self.student.id, 'course_id': other.id}, format='json', HTTP_IDEMPOTENCY_KEY='enroll-1')
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertFalse(Enrollment.objects.filter(course=other).exists())
+
+    def test_keys_are_scoped_to_the_user(self):
+        """Test that two users sending the same key get their own responses."""
+        other = User.objects.create_user(username='other', password='other123')
+        for user in (self.student, other):
+            self.client.force_authenticate(user=user)
+            payload = {'user_id': user.id, 'course_id': self.course.id}
+            response = self.client.post(self.url, payload, format='json', HTTP_IDEMPOTENCY_KEY='enroll-1')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Enrollment.objects.filter(course=self.course).count(), 2)
+
+    def test_duplicate_rejected_while_in_flight(self):
+        """Test that a duplicate of an in-flight request gets a conflict without waiting."""
+        self.client.force_authenticate(user=self.student)
+        in_flight = SimpleNamespace(method='POST', path=self.url, user=self.student)
+        cache.add(f"{idempotency_cache_key(in_flight, 'enroll-1')}_lock", 'in-flight')
+
+        response = self.client.post(self.url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='enroll-1')
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertFalse(Enrollment.objects.exists())
+
+    def test_registration_retry(self):
+        """Test that a retried sign-up returns the same user instead of a duplicate error."""
+        payload = {
+            'username': 'mobile',
+            'email': 'mobile@example.com',
+            'password': 'Mobile-pass-123',
+        }
+        first = self.client.post(reverse('user-list'), payload, format='json', HTTP_IDEMPOTENCY_KEY='signup-1')
+        retry = self.client.post(reverse('user-list'), payload, format='json', HTTP_IDEMPOTENCY_KEY='signup-1')
+
+        self.assertEqual(retry.status_code, first.status_code)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(User.objects.filter(username='mobile').count(), 1)
+
+    def test_anonymous_keys_are_scoped_to_the_client(self):
+        """Test that two anonymous clients sending the same key both get signed up."""
+        for index, address in enumerate(('10.0.0.1', '10.0.0.2')):
+            payload = {
+                'username': f'mobile{index}',
+                'email': f'mobile{index}@example.com',
+                'password': 'Mobile-pass-123',
+            }
+            response = self.client.post(reverse('user-list'), payload, format='json',
+                                        HTTP_IDEMPOTENCY_KEY='signup-1', REMOTE_ADDR=address)
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertNotIn('Idempotent-Replayed', response)
@@ -0,0 +1,202 @@
+"""
+Performance tests for the Green Academy API batch endpoint.
+These tests check that several requests are served in one round trip.
+"""
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.authentication import CachedJWTAuthentication
+from api.models import Course, Enrollment
+from api.throttling import UserSlidingWindowThrottle
+
+
+class BatchEndpointTests(TestCase):
+    """Test running several API requests through /api/batch/."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.client = APIClient()
+        self.student = User.objects.create_user(username='student', password='student123')
+        instructor = User.objects.create_user(username='instructor', password='instructor123', is_staff=True)
+        self.course = Course.objects.create(
+            title='Batch Course',
+            description='Course for the dashboard',
+            instructor=instructor,
+            duration='2 weeks',
+            is_featured=True
+        )
+        self.enrollment = Enrollment.objects.create(user=self.student, course=self.course)
+        self.url = reverse('batch')
+
+    def test_dashboard_requests_in_one_round_trip(self):
+        """Test that sub-requests are dispatched and answered in order."""
+        self.client.force_authenticate(user=self.student)
+        payload = {'requests': [
+            {'id': 'me', 'path': '/api/users/me/'},
+            {'id': 'enrollments', 'path': f'/api/users/{self.student.id}/enrollments/'},
+            {'id': 'featured', 'path': '/api/courses/featured/'},
+            {'id': 'missing', 'path': '/api/nowhere/'},
+        ]}
+
+        response = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['responses']
+        self.assertEqual([result['id'] for result in results], ['me', 'enrollments', 'featured', 'missing'])
+        self.assertEqual([result['status'] for result in results], [200, 200, 200, 404])
+        self.assertEqual(results[0]['body']['username'], 'student')
+        self.assertEqual(results[2]['body']['results'][0]['title'], 'Batch Course')
+
+    def test_writes_and_permissions_apply_per_sub_request(self):
+        """Test that sub-requests run with the batch user's permissions."""
+        self.client.force_authenticate(user=self.student)
+        payload = {'requests': [
+            {'method': 'PATCH', 'path': f'/api/enrollments/{self.enrollment.id}/',
+             'body': {'completion_percentage': 35}},
+            {'method': 'POST', 'path': '/api/courses/', 'body': {'title': 'Not allowed'}},
+        ]}
+
+        response = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual([result['status'] for result in response.data['responses']], [200, 403])
+        self.assertEqual(Enrollment.objects.get(pk=self.enrollment.pk).completion_percentage, 35)
+
+    def test_token_verified_once(self):
+        """Test that the JWT is authenticated once for the whole batch."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.student).access_token}')
+        payload = {'requests': [{'path': '/api/users/me/'} for _ in range(3)]}
+
+        with mock.patch.object(
+            CachedJWTAuthentication, 'authenticate', autospec=True,
+            side_effect=CachedJWTAuthentication.authenticate
+        ) as authenticate:
+            response = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual([result['status'] for result in response.data['responses']], [200, 200, 200])
+        self.assertEqual(authenticate.call_count, 1)
+
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_batch_validation(self):
+        """Test that oversized, nested and anonymous batches are rejected."""
+        payload = {'requests': [{'path': '/api/courses/'}]}
+        self.assertEqual(self.client.post(self.url, payload, format='json').status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.force_authenticate(user=self.student)
+        payload = {'requests': [{'path': '/api/courses/'}] * 3}
+        self.assertEqual(self.client.post(self.url, payload, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+
+        payload = {'requests': [{'method': 'POST', 'path': '/api/batch/', 'body': {}}]}
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.data['responses'][0]['status'], status.HTTP_400_BAD_REQUEST)
+
+    def test_non_api_paths_not_found(self):
+        """Test that admin, docs and other non-DRF paths get a per-item 404."""
+        self.client.force_authenticate(user=self.student)
+        payload = {'requests': [
+            {'path': '/admin/'},
+            {'path': '/swagger/'},
+            {'path': '/health/'},
+            {'path': '/api/users/me/'},
+        ]}
+
+        response = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['status'] for result in response.data['responses']], [404, 404, 404, 200])
+
+    def test_throttle_charged_per_sub_request(self):
+        """Test that every sub-request counts against the user's rate."""
+        self.client.force_authenticate(user=self.student)
+        payload = {'requests': [{'path': '/api/users/me/'} for _ in range(3)]}
+
+        with mock.patch.object(UserSlidingWindowThrottle, 'THROTTLE_RATES', {'user': '3/day'}):
+            response = self.client.post(self.url, payload, format='json')
+
+        # The batch itself is the first of the three allowed requests
+        self.assertEqual([result['status'] for result in response.data['responses']], [200, 200, 429])
+
+    def test_idempotency_key_per_sub_request(self):
+        """Test that the batch's Idempotency-Key is not shared by its sub-requests."""
+        other_course = Course.objects.create(
+            title='Second Course', description='Another course',
+            instructor=self.course.instructor, duration='1 week'
+        )
+        third_course = Course.objects.create(
+            title='Third Course', description='Yet another course',
+            instructor=self.course.instructor, duration='1 week'
+        )
+        self.client.force_authenticate(user=self.student)
+        payload = {'requests': [
+            {'method': 'POST', 'path': '/api/enrollments/',
+             'body': {'user_id': self.student.id, 'course_id': other_course.id}},
+            {'method': 'DELETE', 'path': f'/api/enrollments/{self.enrollment.id}/'},
+            {'method': 'POST', 'path': '/api/enrollments/',
+             'body': {'user_id': self.student.id, 'course_id': self.course.id}},
+            {'method': 'POST', 'path': '/api/enrollments/', 'idempotency_key': 'enroll-third',
+             'body': {'user_id': self.student.id, 'course_id': third_course.id}},
+            {'method': 'POST', 'path': '/api/enrollments/', 'idempotency_key': 'enroll-third',
+             'body': {'user_id': self.student.id, 'course_id': third_course.id}},
+        ]}
+
+        response = self.client.post(self.url, payload, format='json', HTTP_IDEMPOTENCY_KEY='batch-1')
+
+        results = response.data['responses']
+        self.assertEqual([result['status'] for result in results], [201, 204, 201, 201, 201])
+        self.assertEqual(results[3]['body'], results[4]['body'])
+        self.assertEqual(Enrollment.objects.filter(user=self.student).count(), 3)
+
+class ParallelBatchTests(TransactionTestCase):
+    """Test running independent GETs of a batch on the thread pool."""
+
+    def test_parallel_gets(self):
+        """Test that parallel GETs return the same results in request order."""
+        student = User.objects.create_user(username='student', password='student123')
+        client = APIClient()
+        client.force_authenticate(user=student)
+        payload = {
+            'parallel': True,
+            'requests': [
+                {'id': str(index), 'path': '/api/users/me/'} for index in range(4)
+            ],
+        }
+
+        response = client.post(reverse('batch'), payload, format='json')
+
+        results = response.data['responses']
+        self.assertEqual([result['id'] for result in results], ['0', '1', '2', '3'])
+        self.assertTrue(all(result['body']['username'] == 'student' for result in results))
+
+    def test_parallel_gets_see_earlier_writes(self):
+        """Test that GETs listed after a write wait for it while GETs before it do not see it."""
+        student = User.objects.create_user(username='student', password='student123')
+        instructor = User.objects.create_user(username='instructor', password='instructor123', is_staff=True)
+        course = Course.objects.create(title='Parallel Course', description='Course', instructor=instructor,
+                                       duration='1 week')
+        client = APIClient()
+        client.force_authenticate(user=student)
+        enrollments = f'/api/users/{student.id}/enrollments/'
+        payload = {
+            'parallel': True,
+            'requests': [
+                {'id': 'before', 'path': enrollments},
+                {'id': 'enroll', 'method': 'POST', 'path': '/api/enrollments/', 'body': {'user_id': student.id, 'course_id': course.id}},
+                {'id': 'after', 'path': enrollments},
+                {'id': 'after-too', 'path': enrollments},
+            ],
+        }
+
+        response = client.post(reverse('batch'), payload, format='json')
+
+        results = {result['id']: result for result in response.data['responses']}
+        self.assertEqual(results['enroll']['status'], 201)
+        self.assertEqual(len(results['before']['body']['results']), 0)
+        self.assertEqual(len(results['after']['body']['results']), 1)
+        self.assertEqual(len(results['after-too']['body']['results']), 1)
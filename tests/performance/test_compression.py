@@ -0,0 +1,96 @@
+"""
+Performance tests for response compression in the Green Academy API.
+These tests check content negotiation and reuse of compressed cached bodies.
+"""
+import gzip
+import json
+from unittest import mock
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from rest_framework import status
+from api import middleware
+from api.models import Course
+
+
+class CompressionMiddlewareTests(TestCase):
+    """Test gzip negotiation and precompressed cached responses."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        cache.clear()
+
+        self.admin_user = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='admin123'
+        )
+
+        for i in range(10):
+            Course.objects.create(
+                title=f'Test Course {i}',
+                description=f'A fairly long course description number {i} ' * 5,
+                instructor=self.admin_user,
+                duration='4 weeks',
+                level=Course.LevelChoices.BEGINNER,
+            )
+
+    def test_gzip_when_accepted(self):
+        """Test that large responses are gzipped when the client accepts gzip."""
+        response = self.client.get(reverse('course-list'), HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        data = json.loads(gzip.decompress(response.content))
+        self.assertEqual(data['count'], 10)
+
+    def test_no_compression_without_accept_encoding(self):
+        """Test that responses are sent as-is when the client does not accept gzip."""
+        response = self.client.get(reverse('course-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.json()['count'], 10)
+
+    def test_small_responses_not_compressed(self):
+        """Test that responses below the size threshold are not compressed."""
+        response = self.client.get(reverse('course-list'), {'search': 'nothing-matches'},
+                                   HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_cached_response_compressed_once(self):
+        """Test that a cached payload is compressed once and reused on cache hits."""
+        url = reverse('course-list')
+        with mock.patch.object(middleware, 'compress_body', wraps=middleware.compress_body) as spy:
+            first = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+            second = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(spy.call_count, 1)
+
+    def test_accept_encoding_parsing(self):
+        """Test that codings are matched as whole tokens and honour q=0 and the wildcard."""
+        url = reverse('course-list')
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='x-gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip; q=0.0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        with mock.patch.object(middleware, 'brotli', None):
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='*')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+        with mock.patch.object(middleware, 'brotli', None):
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='*;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
@@ -0,0 +1,162 @@
+"""
+Performance tests for database connection reuse in the Green Academy API.
+These tests check the per-worker connection gauges and the connection benchmark.
+"""
+import io
+import threading
+import unittest
+from contextlib import nullcontext
+from types import SimpleNamespace
+from unittest import mock
+
+import psycopg2
+import psycopg2.extensions
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.utils import load_backend
+
+from api.connection_metrics import connection_gauges
+from api.middleware import PoolTimeoutMiddleware
+from api.pooled_postgresql.base import CountingConnectionPool, PoolTimeout
+
+
+class ConnectionGaugeTests(TransactionTestCase):
+    """Test the connection counters reported per worker."""
+
+    def test_new_thread_connection_is_counted(self):
+        """Test that a connection opened by another thread is counted."""
+        before = connection_gauges()['databases']['default']['opened']
+
+        def query():
+            with connections['default'].cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connections.close_all()
+
+        thread = threading.Thread(target=query)
+        thread.start()
+        thread.join()
+
+        self.assertEqual(connection_gauges()['databases']['default']['opened'], before + 1)
+
+    def test_health_reports_gauges(self):
+        """Test that the health check reports the worker's connection gauges."""
+        response = self.client.get('/health/')
+        gauges = response.json()['connections']
+
+        self.assertIn('pid', gauges)
+        self.assertEqual(gauges['databases']['default']['conn_max_age'], connection.settings_dict['CONN_MAX_AGE'])
+        self.assertGreaterEqual(gauges['databases']['default']['opened'], 1)
+
+
+class ConnectionBenchmarkTests(TestCase):
+    """Test the per-request connection overhead benchmark."""
+
+    def test_benchmark_compares_modes(self):
+        """Test that the benchmark reports each connection mode."""
+        out = io.StringIO()
+        call_command('benchmark_connections', requests=20, stdout=out)
+        output = out.getvalue()
+
+        print(output)
+        self.assertIn('new connection per request', output)
+        self.assertIn('persistent connection: ', output)
+        self.assertIn('1 connections opened for 20 requests', output.split('persistent connection: ')[1])
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'the connection pool needs PostgreSQL')
+class ConnectionPoolTests(TransactionTestCase):
+    """Test the pooled PostgreSQL backend."""
+
+    def _pooled_wrapper(self):
+        settings_dict = {**connection.settings_dict, 'ENGINE': 'api.pooled_postgresql', 'CONN_MAX_AGE': 0}
+        return load_backend('api.pooled_postgresql').DatabaseWrapper(settings_dict, 'pool_test')
+
+    def test_connections_are_reused_across_requests(self):
+        """Test that requests check the same connection out instead of opening new ones."""
+        wrapper = self._pooled_wrapper()
+        for _ in range(5):
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            wrapper.close_if_unusable_or_obsolete()
+
+        stats = wrapper.pool_stats()
+        self.assertEqual(stats['opened'], 1)
+        self.assertEqual(stats['in_use'], 0)
+
+    def test_open_transaction_is_rolled_back(self):
+        """Test that a connection returned mid-transaction is rolled back before reuse."""
+        wrapper = self._pooled_wrapper()
+        wrapper.ensure_connection()
+        wrapper.connection.autocommit = False
+        with wrapper.connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        wrapper.close()
+
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            self.assertEqual(cursor.fetchone(), (1,))
+        wrapper.close()
+
+
+class FakeConnection:
+    """Stand-in for a psycopg2 connection whose server side can drop it."""
+
+    def __init__(self, *args, **kwargs):
+        self.closed = 0
+        self.dropped = False
+        self.info = SimpleNamespace(transaction_status=psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+
+    def cursor(self):
+        if self.dropped:
+            self.closed = 2
+            raise psycopg2.OperationalError('server closed the connection unexpectedly')
+        return nullcontext(SimpleNamespace(execute=lambda sql: None))
+
+    def get_transaction_status(self):
+        return self.info.transaction_status
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+@mock.patch('psycopg2.connect', FakeConnection)
+class PoolCheckoutTests(SimpleTestCase):
+    """Test how the pool hands out connections, without a database server."""
+
+    def test_dropped_connections_are_replaced(self):
+        """Test that idle connections the server dropped are discarded on checkout."""
+        pool = CountingConnectionPool(2, 2)
+        first, second = pool.checkout(1), pool.checkout(1)
+        pool.checkin(first)
+        pool.checkin(second)
+        first.dropped = second.dropped = True
+
+        connection = pool.checkout(1)
+
+        self.assertNotIn(connection, (first, second))
+        self.assertEqual(pool.stats()['opened'], 3)
+
+    def test_exhausted_pool_waits_for_a_connection(self):
+        """Test that checkout waits for a connection to come back instead of failing."""
+        pool = CountingConnectionPool(1, 1)
+        connection = pool.checkout(1)
+        threading.Timer(0.1, pool.checkin, args=(connection,)).start()
+
+        self.assertIs(pool.checkout(2), connection)
+
+    def test_exhausted_pool_times_out(self):
+        """Test that checkout gives up after the timeout and the request gets a 503."""
+        pool = CountingConnectionPool(1, 1)
+        pool.checkout(1)
+
+        with self.assertRaises(PoolTimeout) as raised:
+            pool.checkout(0.05)
+
+        middleware = PoolTimeoutMiddleware(lambda request: None)
+        response = middleware.process_exception(RequestFactory().get('/api/courses/'), raised.exception)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
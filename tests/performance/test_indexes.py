@@ -0,0 +1,70 @@
+"""
+Performance tests for the Green Academy API database indexes.
+These tests check the query plans of the hot queries on SQLite and PostgreSQL.
+"""
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import QuerySet
+
+from api.models import Activity, Course, Enrollment, Module
+
+
+class QueryPlanTests(TestCase):
+    """Test that the planner uses the composite and partial indexes."""
+
+    def setUp(self):
+        """Set up test data."""
+        if connection.vendor == 'postgresql':
+            # Tiny test tables are cheaper to scan; make PostgreSQL show the index it would use
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        self.student = User.objects.create_user(username='student', email='student@example.com', password='student123')
+        instructor = User.objects.create_user(username='instructor', password='instructor123', is_staff=True)
+        self.course = Course.objects.create(
+            title='Indexed Course',
+            description='Course for query plans',
+            instructor=instructor,
+            duration='2 weeks',
+            is_featured=True
+        )
+        self.module = Module.objects.create(course=self.course, title='Module', description='Module', order=1)
+        Activity.objects.create(module=self.module, title='Activity', description='Activity', order=1)
+        Enrollment.objects.create(user=self.student, course=self.course)
+
+    def assertUsesIndex(self, queryset: QuerySet, index_name: str, ordered: bool = False) -> None:
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+        if ordered:
+            # Rows come out of the index in order, without a separate sort step
+            self.assertNotRegex(plan, r'TEMP B-TREE|\bSort\b')
+
+    def test_user_enrollments_index(self):
+        """Test that a user's enrollments are read newest first from the index."""
+        queryset = Enrollment.all_objects.filter(user_id=self.student.id).order_by('-enrolled_at')
+        self.assertUsesIndex(queryset, 'api_enroll_user_enrolled_idx', ordered=True)
+
+    def test_course_status_index(self):
+        """Test that enrollments are filtered by course and status through the index."""
+        queryset = Enrollment.all_objects.filter(course_id=self.course.id, status=Enrollment.StatusChoices.ACTIVE)
+        self.assertUsesIndex(queryset, 'api_enroll_course_status_idx')
+
+    def test_module_order_index(self):
+        """Test that a course's modules are read in order from the index."""
+        queryset = Module.all_objects.filter(course_id=self.course.id).order_by('order')
+        self.assertUsesIndex(queryset, 'api_module_course_order_idx', ordered=True)
+
+    def test_activity_order_index(self):
+        """Test that a module's activities are read in order from the index."""
+        queryset = Activity.all_objects.filter(module_id=self.module.id).order_by('order')
+        self.assertUsesIndex(queryset, 'api_activity_module_order_idx', ordered=True)
+
+    def test_featured_courses_partial_index(self):
+        """Test that featured courses are read from the partial index."""
+        queryset = Course.objects.filter(is_featured=True).order_by('-created_at')
+        self.assertUsesIndex(queryset, 'api_course_featured_idx', ordered=True)
+
+    def test_login_email_index(self):
+        """Test that the login lookup by email uses the index."""
+        queryset = User.objects.filter(email=self.student.email)
+        self.assertUsesIndex(queryset, 'api_user_email_idx')
@@ -5,11 +5,14 @@ These tests focus on measuring the API's performance under load.
 import time
 import threading
 from django.test import TestCase, TransactionTestCase
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from api.models import Course, Enrollment
+from api.async_views import login_slots
 
 
 class ConcurrentRequestsPerformanceTest(TransactionTestCase):
@@ -274,3 +277,110 @@ class PaginationPerformanceTests(TestCase):
         self.assertLess(first_page_time, 0.5)  # Less than 500ms
         self.assertLess(second_page_time, 0.5)
         self.assertLess(last_page_time, 0.5)
+
+
+class AsyncLoginLoadTests(TransactionTestCase):
+    """Test the async login endpoint and its bounded password-hashing pool."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.client = APIClient()
+
+        self.admin_user = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='admin123'
+        )
+        for i in range(10):
+            User.objects.create_user(username=f'student{i}', password='student123')
+            Course.objects.create(
+                title=f'Test Course {i}',
+                description=f'Course description {i}',
+                instructor=self.admin_user,
+                duration='4 weeks',
+                level=Course.LevelChoices.BEGINNER,
+            )
+
+    def test_async_login(self):
+        """Test that the async endpoint issues tokens like the sync one."""
+        response = self.client.post(reverse('login-async'), {'username': 'student0', 'password': 'student123'},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('access', response.json())
+        self.assertEqual(response.json()['user']['role'], 'student')
+
+        response = self.client.post(reverse('login-async'), {'username': 'student0', 'password': 'wrong'},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rejects_when_queue_full(self):
+        """Test that logins are rejected with 503 once the queue limit is reached."""
+        capacity = settings.LOGIN_HASHING_WORKERS + settings.LOGIN_QUEUE_LIMIT
+        for _ in range(capacity):
+            login_slots.acquire()
+        try:
+            response = self.client.post(reverse('login-async'), {'username': 'student0', 'password': 'student123'},
+                                        format='json')
+        finally:
+            for _ in range(capacity):
+                login_slots.release()
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def _login_burst(self, login_url):
+        """Run 20 logins against ``login_url`` alongside catalog reads and return the measurements."""
+        cache.clear()
+        catalog_url = reverse('course-list')
+        login_statuses = []
+        catalog_times = []
+
+        def login(index):
+            client = APIClient()
+            response = client.post(login_url, {'username': f'student{index}', 'password': 'student123'},
+                                   format='json')
+            login_statuses.append(response.status_code)
+
+        def browse():
+            client = APIClient()
+            for _ in range(5):
+                start_time = time.time()
+                response = client.get(catalog_url)
+                catalog_times.append(time.time() - start_time)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        threads = [threading.Thread(target=login, args=(i % 10,)) for i in range(20)]
+        threads += [threading.Thread(target=browse) for _ in range(4)]
+        start_time = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.time() - start_time
+
+        self.assertEqual(len(login_statuses), 20)
+        self.assertTrue(all(code in (status.HTTP_200_OK, status.HTTP_503_SERVICE_UNAVAILABLE)
+                            for code in login_statuses))
+        succeeded = login_statuses.count(status.HTTP_200_OK)
+        rejected = login_statuses.count(status.HTTP_503_SERVICE_UNAVAILABLE)
+        return succeeded, rejected, elapsed, sum(catalog_times) / len(catalog_times)
+
+    def test_login_burst_with_catalog_reads(self):
+        """Measure login throughput and catalog latency under mixed load, sync against async login."""
+        # Baseline catalog latency without logins in flight
+        start_time = time.time()
+        self.client.get(reverse('course-list'))
+        baseline_time = time.time() - start_time
+
+        results = {
+            'sync': self._login_burst(reverse('login')),
+            'async': self._login_burst(reverse('login-async')),
+        }
+        print(f"Catalog latency baseline: {baseline_time:.4f}s")
+        for name, (succeeded, rejected, elapsed, avg_catalog_time) in results.items():
+            print(f"{name} login: {succeeded}/20 succeeded, {rejected} rejected with 503, "
+                  f"{succeeded / elapsed:.2f} logins/s, catalog latency under load {avg_catalog_time:.4f}s")
+
+        self.assertEqual(results['sync'][0], 20)
+        self.assertGreater(results['async'][0], 0)
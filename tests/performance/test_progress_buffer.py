@@ -0,0 +1,127 @@
+"""
+Performance tests for the Green Academy API progress write-behind buffer.
+These tests check that progress reports are coalesced and written in batches.
+"""
+from unittest import mock
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from api.models import Course, Enrollment
+from api.progress import flush_progress, get_progress_store
+
+
+class ProgressBufferTests(TestCase):
+    """Test buffered progress reports and their flushing."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        instructor = User.objects.create_user(username='instructor', password='instructor123')
+        self.student = User.objects.create_user(username='student', password='student123')
+        courses = [
+            Course.objects.create(
+                title=f'Course {i}',
+                description='Course with video lessons',
+                instructor=instructor,
+                duration='2 weeks',
+                level=Course.LevelChoices.BEGINNER
+            )
+            for i in range(3)
+        ]
+        self.enrollments = [Enrollment.objects.create(user=self.student, course=course) for course in courses]
+        self.client.force_authenticate(user=self.student)
+
+    def tearDown(self):
+        """Drop anything left in the in-process buffer."""
+        get_progress_store().discard(enrollment.id for enrollment in self.enrollments)
+
+    def report(self, enrollment, percentage):
+        url = reverse('enrollment-progress', args=[enrollment.id])
+        return self.client.post(url, {'completion_percentage': percentage}, format='json')
+
+    def test_reports_are_buffered_and_visible_on_read(self):
+        """Test that reports skip the database but show up in reads."""
+        enrollment = self.enrollments[0]
+        with CaptureQueriesContext(connection) as queries:
+            for percentage in (10, 20, 30):
+                response = self.report(enrollment, percentage)
+                self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(any(query['sql'].startswith('UPDATE') for query in queries.captured_queries))
+        self.assertEqual(Enrollment.objects.get(pk=enrollment.pk).completion_percentage, 0)
+
+        response = self.client.get(reverse('enrollment-detail', args=[enrollment.id]))
+        self.assertEqual(response.data['completion_percentage'], 30)
+        response = self.client.get(reverse('enrollment-list'))
+        by_id = {item['id']: item['completion_percentage'] for item in response.data['results']}
+        self.assertEqual(by_id[enrollment.id], 30)
+
+    def test_flush_writes_latest_value_in_batches(self):
+        """Test that the flusher coalesces reports into batched updates."""
+        for percentage in (15, 45):
+            for enrollment in self.enrollments:
+                self.report(enrollment, percentage)
+
+        with CaptureQueriesContext(connection) as queries:
+            flushed = flush_progress(batch_size=2)
+
+        self.assertEqual(flushed, 3)
+        updates = [query for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(
+            set(Enrollment.objects.values_list('completion_percentage', flat=True)), {45}
+        )
+        self.assertEqual(flush_progress(), 0)
+
+    def test_direct_update_supersedes_buffered_report(self):
+        """Test that a PATCH discards an older buffered report."""
+        enrollment = self.enrollments[0]
+        self.report(enrollment, 80)
+        url = reverse('enrollment-detail', args=[enrollment.id])
+        self.client.patch(url, {'completion_percentage': 5}, format='json')
+
+        flush_progress()
+
+        self.assertEqual(Enrollment.objects.get(pk=enrollment.pk).completion_percentage, 5)
+
+    def test_flush_does_not_overwrite_newer_direct_write(self):
+        """Test that a PATCH landing while a flush is in flight is not overwritten."""
+        enrollment = self.enrollments[0]
+        self.report(enrollment, 80)
+        store = get_progress_store()
+        in_flight = store.take()
+        url = reverse('enrollment-detail', args=[enrollment.id])
+        self.client.patch(url, {'completion_percentage': 5}, format='json')
+
+        with mock.patch.object(store, 'take', return_value=in_flight):
+            flush_progress()
+
+        self.assertEqual(Enrollment.objects.get(pk=enrollment.pk).completion_percentage, 5)
+
+    def test_list_shows_reports_made_after_first_read(self):
+        """Test that the enrollment list is not served from a page cache that hides buffered reports."""
+        enrollment = self.enrollments[0]
+        self.client.get(reverse('enrollment-list'))
+        self.report(enrollment, 35)
+
+        response = self.client.get(reverse('enrollment-list'))
+        by_id = {item['id']: item['completion_percentage'] for item in response.data['results']}
+        self.assertEqual(by_id[enrollment.id], 35)
+
+    def test_worker_runs_flush_job(self):
+        """Test that the flush job is registered with the worker."""
+        self.report(self.enrollments[1], 60)
+        call_command('run_worker', only=['flush_progress'], once=True)
+        self.assertEqual(Enrollment.objects.get(pk=self.enrollments[1].pk).completion_percentage, 60)
+
+    def test_report_validation_and_ownership(self):
+        """Test that invalid values and other users' enrollments are rejected."""
+        self.assertEqual(self.report(self.enrollments[0], 101).status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=User.objects.create_user(username='other', password='other123'))
+        self.assertEqual(self.report(self.enrollments[0], 50).status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,203 @@
+"""
+Performance tests for database query counts in the Green Academy API.
+These tests fail when an endpoint exceeds its query budget, catching N+1 regressions.
+"""
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.contrib.auth.models import User, Group
+from django.urls import reverse
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import Course, Enrollment, Module, Activity
+
+
+class QueryBudgetMixin:
+    """Helpers for asserting that a request stays within a query budget."""
+
+    def assertQueryBudget(self, budget, url, **params):
+        """Request the URL and assert it ran at most ``budget`` queries."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(
+            len(ctx.captured_queries), budget,
+            f"{url} ran {len(ctx.captured_queries)} queries (budget {budget})"
+        )
+        return response
+
+
+class UserQueryCountTests(QueryBudgetMixin, TestCase):
+    """Test that role resolution does not query per user."""
+
+    # pagination COUNT + users page + prefetched groups
+    USER_LIST_BUDGET = 3
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.client = APIClient()
+        self.admin_user = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='admin123'
+        )
+        instructors = Group.objects.create(name='instructors')
+        students = Group.objects.create(name='students')
+        for i in range(9):
+            user = User.objects.create_user(username=f'user{i}', password='pass12345')
+            user.groups.add(instructors if i % 3 == 0 else students)
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_user_list_query_budget(self):
+        """Test that listing users resolves roles without per-user queries."""
+        response = self.assertQueryBudget(self.USER_LIST_BUDGET, reverse('user-list'))
+
+        roles = {row['username']: row['role'] for row in response.data['results']}
+        self.assertEqual(roles['user0'], 'instructor')
+        self.assertEqual(roles['user1'], 'student')
+        self.assertEqual(roles['admin'], 'admin')
+
+    def test_me_single_group_query(self):
+        """Test that the me endpoint resolves the role with at most one query."""
+        user = User.objects.get(username='user3')
+        self.client.force_authenticate(user=user)
+        response = self.assertQueryBudget(1, reverse('user-me'))
+        self.assertEqual(response.data['role'], 'instructor')
+
+    def test_me_group_names_cached(self):
+        """Test that repeated me requests resolve the role without querying groups."""
+        user = User.objects.get(username='user3')
+        self.client.force_authenticate(user=user)
+        self.client.get(reverse('user-me'))
+
+        self.client.force_authenticate(user=User.objects.get(pk=user.pk))
+        response = self.assertQueryBudget(0, reverse('user-me'))
+        self.assertEqual(response.data['role'], 'instructor')
+
+        user.groups.set([Group.objects.get(name='students')])
+        self.client.force_authenticate(user=User.objects.get(pk=user.pk))
+        response = self.assertQueryBudget(1, reverse('user-me'))
+        self.assertEqual(response.data['role'], 'student')
+
+
+class EnrollmentQueryCountTests(QueryBudgetMixin, TestCase):
+    """Test that enrollment lists do not lazily load users and courses per row."""
+
+    # pagination COUNT + enrollments joined with users and courses
+    ENROLLMENT_LIST_BUDGET = 2
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.client = APIClient()
+        self.admin_user = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='admin123'
+        )
+        self.student = User.objects.create_user(username='student', password='student123')
+        self.course = Course.objects.create(
+            title='Main Course',
+            description='Main course description',
+            instructor=self.admin_user,
+            duration='4 weeks',
+        )
+        Enrollment.objects.create(user=self.student, course=self.course)
+        for i in range(8):
+            course = Course.objects.create(
+                title=f'Course {i}',
+                description=f'Course description {i}',
+                instructor=self.admin_user,
+                duration='4 weeks',
+            )
+            Enrollment.objects.create(user=self.student, course=course)
+            other = User.objects.create_user(username=f'other{i}', password='pass12345')
+            Enrollment.objects.create(user=other, course=self.course)
+
+    def test_enrollment_list_query_budget(self):
+        """Test the query budget of the enrollment list for admins and students."""
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.assertQueryBudget(self.ENROLLMENT_LIST_BUDGET, reverse('enrollment-list'))
+        self.assertEqual(response.data['count'], 17)
+
+        cache.clear()
+        self.client.force_authenticate(user=self.student)
+        response = self.assertQueryBudget(self.ENROLLMENT_LIST_BUDGET, reverse('enrollment-list'))
+        self.assertEqual(response.data['count'], 9)
+        self.assertEqual(response.data['results'][0]['user']['username'], 'student')
+
+    def test_user_enrollments_query_budget(self):
+        """Test the query budget of the per-user enrollment list."""
+        self.client.force_authenticate(user=self.student)
+        url = reverse('user-enrollments', kwargs={'user_id': self.student.id})
+        response = self.assertQueryBudget(self.ENROLLMENT_LIST_BUDGET, url)
+        self.assertEqual(response.data['count'], 9)
+        self.assertIn('title', response.data['results'][0]['course'])
+
+    def test_course_enrollments_query_budget(self):
+        """Test the query budget of the per-course enrollment list."""
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse('course-enrollments', kwargs={'course_id': self.course.id})
+        response = self.assertQueryBudget(self.ENROLLMENT_LIST_BUDGET, url)
+        self.assertEqual(response.data['count'], 9)
+        self.assertEqual(response.data['results'][0]['course']['title'], 'Main Course')
+
+
+class ModuleActivityDetailQueryCountTests(QueryBudgetMixin, TestCase):
+    """Test that module and activity detail endpoints run a fixed number of queries."""
+
+    # module + course (with instructor and enrollment count) + activities
+    MODULE_DETAIL_BUDGET = 3
+    # activity + module (with activity count)
+    ACTIVITY_DETAIL_BUDGET = 2
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.client = APIClient()
+        self.instructor = User.objects.create_user(
+            username='instructor',
+            first_name='Ada',
+            last_name='Green',
+            password='instructor123',
+            is_staff=True
+        )
+        self.course = Course.objects.create(
+            title='Main Course',
+            description='Main course description',
+            instructor=self.instructor,
+            duration='4 weeks',
+        )
+        for i in range(3):
+            student = User.objects.create_user(username=f'student{i}', password='pass12345')
+            Enrollment.objects.create(user=student, course=self.course)
+        self.module = Module.objects.create(
+            course=self.course, title='Module 1', description='Module description', order=1
+        )
+        for i in range(5, 0, -1):
+            self.activity = Activity.objects.create(
+                module=self.module,
+                title=f'Activity {i}',
+                description=f'Activity description {i}',
+                order=i
+            )
+
+    def test_module_detail_query_budget(self):
+        """Test the query budget and content of the module detail endpoint."""
+        url = reverse('module-detail', kwargs={'pk': self.module.id})
+        response = self.assertQueryBudget(self.MODULE_DETAIL_BUDGET, url)
+
+        self.assertEqual(response.data['activity_count'], 5)
+        self.assertEqual(response.data['course']['enrollment_count'], 3)
+        self.assertEqual(response.data['course']['instructor']['name'], 'Ada Green')
+        self.assertEqual([a['order'] for a in response.data['activities']], [1, 2, 3, 4, 5])
+
+    def test_activity_detail_query_budget(self):
+        """Test the query budget and content of the activity detail endpoint."""
+        url = reverse('activity-detail', kwargs={'pk': self.activity.id})
+        response = self.assertQueryBudget(self.ACTIVITY_DETAIL_BUDGET, url)
+
+        self.assertEqual(response.data['module']['id'], self.module.id)
+        self.assertEqual(response.data['module']['activity_count'], 5)
@@ -0,0 +1,139 @@
+"""
+Performance tests for read-replica routing in the Green Academy API.
+These tests check that safe API reads go to replicas and that writers read their own writes.
+
+The end-to-end tests need replica aliases, for example two local SQLite files:
+DATABASE_REPLICA_URLS=sqlite:///replica0.sqlite3,sqlite:///replica1.sqlite3 \
+    python manage.py test tests.performance.test_read_replicas
+"""
+import unittest
+
+from django.conf import settings
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.http import HttpResponse
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.middleware import ReplicaRoutingMiddleware
+from api.models import Course
+from api.routers import pin_cache_key
+from api.views import CourseViewSet
+
+REPLICAS = ['replica_0', 'replica_1']
+
+
+@override_settings(REPLICA_DATABASES=REPLICAS)
+class ReplicaRoutingTests(TestCase):
+    """Test which database the middleware and router pick for a request."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.view = CourseViewSet.as_view({'get': 'list', 'post': 'create'})
+        self.user = User.objects.create_user(username='writer', password='writer123')
+
+    def _read_alias(self, request, status_code=200):
+        """Run a request through the middleware and return the alias reads were routed to."""
+        seen = {}
+
+        def get_response(request):
+            seen['alias'] = router.db_for_read(Course)
+            return HttpResponse(status=status_code)
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        middleware.process_view(request, self.view, (), {})
+        response = middleware(request)
+        return seen['alias'], response
+
+    def test_safe_api_read_uses_replica(self):
+        """Test that a GET to an API view reads from a replica and leaves the context clean."""
+        alias, _ = self._read_alias(self.factory.get('/api/courses/'))
+        self.assertIn(alias, REPLICAS)
+        self.assertEqual(router.db_for_read(Course), DEFAULT_DB_ALIAS)
+
+    def test_write_pins_client_to_primary(self):
+        """Test that a write sets the pin cookie and the user's pin marker."""
+        request = self.factory.post('/api/courses/')
+        request.user = self.user
+        alias, response = self._read_alias(request, status_code=201)
+
+        self.assertEqual(alias, DEFAULT_DB_ALIAS)
+        self.assertEqual(response.cookies[settings.REPLICA_PIN_COOKIE]['max-age'], settings.REPLICA_PIN_SECONDS)
+        self.assertIsNotNone(cache.get(pin_cache_key(self.user.pk)))
+
+    def test_failed_write_does_not_pin(self):
+        """Test that a rejected write leaves reads on the replicas."""
+        request = self.factory.post('/api/courses/')
+        request.user = self.user
+        _, response = self._read_alias(request, status_code=400)
+        self.assertNotIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_pinned_cookie_reads_primary(self):
+        """Test that a client holding the pin cookie reads from the primary."""
+        request = self.factory.get('/api/courses/')
+        request.COOKIES[settings.REPLICA_PIN_COOKIE] = '1'
+        alias, _ = self._read_alias(request)
+        self.assertEqual(alias, DEFAULT_DB_ALIAS)
+
+    def test_pinned_token_reads_primary(self):
+        """Test that a JWT client that wrote recently reads from the primary without cookies."""
+        cache.set(pin_cache_key(self.user.pk), True)
+        token = AccessToken.for_user(self.user)
+        alias, _ = self._read_alias(self.factory.get('/api/courses/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+        self.assertEqual(alias, DEFAULT_DB_ALIAS)
+
+    def test_writes_never_follow_replica_instances(self):
+        """Test that an instance read from a replica is saved to the primary."""
+        course = Course(title='Replica Course')
+        course._state.db = 'replica_0'
+        self.assertEqual(router.db_for_write(Course, instance=course), DEFAULT_DB_ALIAS)
+
+
+@unittest.skipUnless(settings.REPLICA_DATABASES, 'DATABASE_REPLICA_URLS is not set')
+class ReplicaQueryTests(TransactionTestCase):
+    """Test the queries of real requests against replica aliases."""
+
+    databases = '__all__'
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='admin123')
+        Course.objects.create(title='Catalog Course', description='Listed', instructor=self.admin, duration='1 week')
+
+    def _queries_by_alias(self, method, path, data=None):
+        contexts = {alias: CaptureQueriesContext(connections[alias]) for alias in connections}
+        for context in contexts.values():
+            context.__enter__()
+        try:
+            response = getattr(self.client, method)(path, data, format='json')
+        finally:
+            for context in contexts.values():
+                context.__exit__(None, None, None)
+        return response, {alias: len(context.captured_queries) for alias, context in contexts.items()}
+
+    def test_catalog_reads_from_replica(self):
+        """Test that the course list does not query the primary."""
+        response, queries = self._queries_by_alias('get', reverse('course-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries[DEFAULT_DB_ALIAS], 0)
+        self.assertGreater(sum(queries[alias] for alias in settings.REPLICA_DATABASES), 0)
+
+    def test_reads_after_write_use_primary(self):
+        """Test that the writer's next read goes to the primary."""
+        self.client.force_authenticate(user=self.admin)
+        payload = {'title': 'New Course', 'description': 'Fresh', 'duration': '2 weeks', 'instructor_id': self.admin.id}
+        response, _ = self._queries_by_alias('post', reverse('course-list'), payload)
+        self.assertEqual(response.status_code, 201)
+
+        response, queries = self._queries_by_alias('get', reverse('course-detail', args=[response.data['id']]))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(queries[DEFAULT_DB_ALIAS], 0)
+        self.assertEqual(sum(queries[alias] for alias in settings.REPLICA_DATABASES), 0)
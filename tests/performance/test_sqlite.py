@@ -0,0 +1,137 @@
+"""
+Performance tests for SQLite tuning in the Green Academy API.
+These tests check the connection pragmas and the serialization of concurrent writes.
+"""
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from django.test import SimpleTestCase
+from django.core.management import call_command
+from django.db import connection
+from django.db.utils import load_backend
+
+from api.sqlite import write_lock
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite tuning only applies to SQLite')
+class SQLitePragmaTests(SimpleTestCase):
+    """Test that new SQLite connections are tuned."""
+
+    def test_pragmas_applied_on_connect(self):
+        """Test that a new connection to a database file uses WAL and the tuned pragmas."""
+        with tempfile.TemporaryDirectory() as directory:
+            settings_dict = {**connection.settings_dict, 'NAME': os.path.join(directory, 'tuned.sqlite3')}
+            wrapper = load_backend(settings_dict['ENGINE']).DatabaseWrapper(settings_dict, 'pragma_test')
+            try:
+                with wrapper.cursor() as cursor:
+                    values = {}
+                    for name in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size'):
+                        cursor.execute(f'PRAGMA {name}')
+                        values[name] = cursor.fetchone()[0]
+            finally:
+                wrapper.close()
+
+        self.assertEqual(values, {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000, 'cache_size': -20000})
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'writes are only serialized on SQLite')
+class SerializedWriteTests(SimpleTestCase):
+    """Test that write transactions run one at a time per process."""
+
+    def setUp(self):
+        """Set up a database file with one table."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_dict = {**connection.settings_dict, 'NAME': os.path.join(directory.name, 'serialized.sqlite3')}
+        wrapper = self._connect()
+        with wrapper.cursor() as cursor:
+            cursor.execute('CREATE TABLE enrollment (id INTEGER PRIMARY KEY, user_id INTEGER)')
+        wrapper.close()
+
+    def _connect(self):
+        return load_backend('api.serialized_sqlite').DatabaseWrapper(self.settings_dict, 'serialized_test')
+
+    def _max_concurrency(self, work):
+        """Run ``work(wrapper, track)`` on five threads and return the peak overlap of tracked sections."""
+        active = [0]
+        peak = [0]
+        errors = []
+        lock = threading.Lock()
+
+        def track():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+        def run():
+            wrapper = self._connect()
+            try:
+                work(wrapper, track)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                wrapper.close()
+
+        threads = [threading.Thread(target=run) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        return peak[0]
+
+    def test_write_transactions_are_serialized(self):
+        """Test that transactions that read and then write never overlap or fail on the lock."""
+        def work(wrapper, track):
+            # What transaction.atomic() does on SQLite
+            wrapper.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT COUNT(*) FROM enrollment')
+                track()
+                cursor.execute('INSERT INTO enrollment (user_id) VALUES (1)')
+            wrapper.commit()
+            wrapper.set_autocommit(True)
+
+        peak = self._max_concurrency(work)
+
+        self.assertEqual(peak, 1)
+
+    def test_reads_are_not_serialized(self):
+        """Test that reads outside transactions still run in parallel."""
+        def work(wrapper, track):
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT COUNT(*) FROM enrollment')
+                track()
+
+        self.assertGreater(self._max_concurrency(work), 1)
+
+    def test_lock_released_after_rollback(self):
+        """Test that a rolled-back transaction releases the write lock."""
+        wrapper = self._connect()
+        try:
+            wrapper.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+            self.assertTrue(wrapper.holds_write_lock)
+            wrapper.rollback()
+            wrapper.set_autocommit(True)
+            self.assertFalse(wrapper.holds_write_lock)
+        finally:
+            wrapper.close()
+        self.assertTrue(write_lock.acquire(blocking=False))
+        write_lock.release()
+
+    def test_benchmark_reports_both_modes(self):
+        """Test that the concurrent read/write benchmark compares stock and tuned SQLite."""
+        out = io.StringIO()
+        call_command('benchmark_sqlite', writers=4, readers=2, writes=10, stdout=out)
+        output = out.getvalue()
+
+        print(output)
+        self.assertIn('stock SQLite: ', output)
+        self.assertIn("tuned SQLite: 40/40 writes committed, 0 'database is locked' errors", output)
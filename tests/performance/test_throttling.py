@@ -0,0 +1,87 @@
+"""
+Performance tests for request throttling in the Green Academy API.
+These tests check that the sliding-window throttles stay accurate with O(1) state.
+"""
+from unittest import mock
+
+from django.test import TestCase
+from django.core.cache import cache
+from rest_framework.test import APIRequestFactory
+from api.throttling import AnonSlidingWindowThrottle
+
+
+class FakeTimer:
+    """Controllable clock for throttle tests."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class LimitedThrottle(AnonSlidingWindowThrottle):
+    """Anonymous throttle with a small rate for testing."""
+
+    rate = '4/min'
+
+
+class SlidingWindowThrottleTests(TestCase):
+    """Test the sliding-window counter throttle."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.request = APIRequestFactory().get('/api/courses/', REMOTE_ADDR='10.0.0.1')
+        self.request.user = None
+        self.timer = FakeTimer(6000.0)  # start of a one-minute window
+
+    def _allow(self):
+        throttle = LimitedThrottle()
+        throttle.timer = self.timer
+        return throttle.allow_request(self.request, None), throttle
+
+    def test_limits_requests_within_window(self):
+        """Test that requests beyond the rate are rejected within a window."""
+        results = [self._allow()[0] for _ in range(5)]
+        self.assertEqual(results, [True, True, True, True, False])
+
+        allowed, throttle = self._allow()
+        self.assertFalse(allowed)
+        self.assertGreater(throttle.wait(), 0)
+
+    def test_previous_window_is_weighted(self):
+        """Test that the previous window counts in proportion to its overlap."""
+        for _ in range(4):
+            self._allow()
+
+        # A quarter into the next window, 75% of the previous 4 requests still count
+        self.timer.now += 60 + 15
+        self.assertTrue(self._allow()[0])
+        self.assertFalse(self._allow()[0])
+
+        # Three quarters in, only 25% of them count
+        self.timer.now += 30
+        self.assertTrue(self._allow()[0])
+        self.assertTrue(self._allow()[0])
+        self.assertFalse(self._allow()[0])
+
+    def test_state_is_constant_size(self):
+        """Test that the throttle stores a single integer per window, not timestamps."""
+        for _ in range(3):
+            allowed, throttle = self._allow()
+        window = int(self.timer.now // 60)
+        self.assertEqual(cache.get(f"{throttle.key}:{window}"), 3)
+        self.assertIsNone(cache.get(throttle.key))
+
+    def test_rejection_survives_expired_counter(self):
+        """Test that a counter expiring before the rejected request is given back does not error."""
+        with mock.patch.object(LimitedThrottle, 'cache') as throttle_cache:
+            throttle_cache.incr.return_value = 5
+            throttle_cache.get.return_value = 0
+            throttle_cache.decr.side_effect = ValueError
+            allowed, throttle = self._allow()
+
+        throttle_cache.decr.assert_called_once()
+        self.assertFalse(allowed)
+        self.assertEqual(throttle.current, 4)
@@ -3,12 +3,24 @@ Security tests for authentication in the Green Academy API.
 These tests focus on JWT authentication, token handling, and session security.
 """
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 import json
+import threading
 import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from api.authentication import CachedJWTAuthentication, user_cache_key
+from api.tokens import ClaimsRefreshToken, blacklist_cache_key, warm_blacklist_cache
 
 
 class JWTAuthenticationTests(TestCase):
@@ -266,3 +278,164 @@ class PasswordSecurityTests(TestCase):
         # Verify the user was not created
         with self.assertRaises(User.DoesNotExist):
             User.objects.get(username='weakuser')
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """Test the verified-token and user caches used by JWT authentication."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        CachedJWTAuthentication.token_cache.clear()
+        self.client = APIClient()
+
+        self.user = User.objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='user123'
+        )
+        response = self.client.post(
+            reverse('token_obtain_pair'),
+            {'username': 'user', 'password': 'user123'},
+            format='json'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def _user_lookups(self):
+        """Request the me endpoint and return the queries that loaded the user row."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('user-me'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [q for q in ctx.captured_queries if q['sql'].startswith('SELECT') and 'FROM "auth_user"' in q['sql']]
+
+    def test_user_loaded_once(self):
+        """Test that repeated requests reuse the cached user instead of querying auth_user."""
+        self.assertEqual(len(self._user_lookups()), 1)
+        self.assertEqual(len(self._user_lookups()), 0)
+
+    def test_cached_snapshot_has_no_password(self):
+        """Test that the password hash is not cached and is still readable from the cached user."""
+        self._user_lookups()
+        self.assertNotIn('password', cache.get(user_cache_key(self.user.id)))
+
+        self.client.credentials()
+        token = str(ClaimsRefreshToken.for_user(self.user).access_token)
+        user = CachedJWTAuthentication().load_user(CachedJWTAuthentication().get_validated_token(token.encode()))
+        self.assertIn('password', user.get_deferred_fields())
+        self.assertTrue(user.check_password('user123'))
+
+    def test_user_save_invalidates_cache(self):
+        """Test that saving the user reloads it on the next request."""
+        self._user_lookups()
+        self.user.first_name = 'Changed'
+        self.user.save()
+
+        self.assertEqual(len(self._user_lookups()), 1)
+        self.assertEqual(self.client.get(reverse('user-me')).data['first_name'], 'Changed')
+
+    def test_deactivated_user_rejected(self):
+        """Test that a deactivated user is rejected despite the cached token."""
+        self._user_lookups()
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(reverse('user-me'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_account_rejected(self):
+        """Test that a deleted account cannot keep using its token."""
+        self._user_lookups()
+        response = self.client.delete(reverse('user-delete-account'))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.client.get(reverse('user-me'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TokenBlacklistTests(TestCase):
+    """Test the token blacklist cache front and pruning of expired tokens."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='user123'
+        )
+
+    def _refresh_token(self):
+        response = self.client.post(reverse('login'), {'username': 'user', 'password': 'user123'}, format='json')
+        return response.data['refresh']
+
+    def test_blacklisted_token_rejected(self):
+        """Test that a blacklisted refresh token can no longer be used."""
+        refresh = self._refresh_token()
+        ClaimsRefreshToken(refresh).blacklist()
+
+        response = self.client.post(reverse('token_refresh'), {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_blacklisted_token_rejected_after_eviction(self):
+        """Test that a blacklisted refresh token stays rejected when its cache entry is evicted."""
+        refresh = self._refresh_token()
+        token = ClaimsRefreshToken(refresh)
+        token.blacklist()
+        warm_blacklist_cache()
+        cache.delete(blacklist_cache_key(token['jti']))
+
+        response = self.client.post(reverse('token_refresh'), {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIs(cache.get(blacklist_cache_key(token['jti'])), True)
+
+    def test_refresh_skips_blacklist_table_when_cache_warm(self):
+        """Test that refresh verification does not query the blacklist table once the cache is warm."""
+        refresh = self._refresh_token()
+        warm_blacklist_cache()
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse('token_refresh'), {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([q for q in ctx.captured_queries if 'token_blacklist_blacklistedtoken' in q['sql']])
+
+    def test_prune_expired_tokens(self):
+        """Test that pruning deletes expired tokens and their blacklist entries in batches."""
+        past = timezone.now() - timedelta(days=1)
+        for i in range(5):
+            token = OutstandingToken.objects.create(user=self.user, jti=f'expired{i}', token='x', expires_at=past)
+            BlacklistedToken.objects.create(token=token)
+        self._refresh_token()
+
+        call_command('prune_tokens', '--batch-size', '2', stdout=StringIO())
+
+        self.assertEqual(OutstandingToken.objects.count(), 1)
+        self.assertEqual(BlacklistedToken.objects.count(), 0)
+
+
+class LoginConcurrencyTests(TestCase):
+    """Test the bound on logins hashing passwords at once."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        User.objects.create_user(username='user', email='user@example.com', password='user123')
+
+    def test_login_rejected_when_queue_is_full(self):
+        """Test that a login beyond the queue limit gets 503 without checking the password."""
+        with mock.patch('api.views.login_slots', threading.BoundedSemaphore(1)) as slots, \
+                mock.patch('api.views.authenticate') as authenticate:
+            slots.acquire()
+            response = self.client.post(reverse('login'), {'username': 'user', 'password': 'user123'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+        authenticate.assert_not_called()
+
+    def test_login_releases_its_slot(self):
+        """Test that finished logins give their admission slot back."""
+        slots = threading.BoundedSemaphore(1)
+        with mock.patch('api.views.login_slots', slots):
+            for _ in range(2):
+                response = self.client.post(reverse('login'), {'username': 'user', 'password': 'wrong'}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -3,11 +3,17 @@ Security tests for authorization in the Green Academy API.
 These tests focus on permission checks, role-based access control, and data isolation.
 """
 from django.test import TestCase
-from django.contrib.auth.models import User, Group, Permission
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.contrib.auth.models import User, Group, Permission, update_last_login
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from api.models import Course, Enrollment, Module, Activity
+from api.authentication import CachedJWTAuthentication
+from api.tokens import get_token_version
+from rest_framework_simplejwt.tokens import AccessToken
 
 
 class RoleBasedAccessControlTests(TestCase):
@@ -479,3 +485,117 @@ class ResourceAccessControlTests(TestCase):
         # Student can delete the module (current API implementation allows any authenticated user)
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class TokenClaimsAuthorizationTests(TestCase):
+    """Test permission checks driven by role and staff claims in access tokens."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        CachedJWTAuthentication.token_cache.clear()
+        self.client = APIClient()
+
+        self.instructor = User.objects.create_user(
+            username='instructor',
+            email='instructor@example.com',
+            password='instructor123',
+            is_staff=True
+        )
+        self.student = User.objects.create_user(
+            username='student',
+            email='student@example.com',
+            password='student123'
+        )
+        self.course = Course.objects.create(
+            title='Test Course',
+            description='Course description',
+            instructor=self.instructor,
+            duration='4 weeks'
+        )
+        self.enrollment = Enrollment.objects.create(user=self.student, course=self.course)
+
+    def _login(self, username, password):
+        """Log in and authenticate the client with the returned access token."""
+        response = self.client.post(reverse('login'), {'username': username, 'password': password}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        return response
+
+    def _user_row_lookups(self, url):
+        """Request the URL and return the status and any queries loading a user row by id."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        lookups = [q for q in ctx.captured_queries if 'FROM "auth_user" WHERE "auth_user"."id" =' in q['sql']]
+        return response.status_code, lookups
+
+    def test_access_token_carries_claims(self):
+        """Test that login issues access tokens with role, staff and version claims."""
+        response = self._login('student', 'student123')
+        token = AccessToken(response.data['access'])
+
+        self.assertEqual(token['role'], 'student')
+        self.assertFalse(token['is_staff'])
+        self.assertIn('ver', token)
+        self.assertEqual(response.data['user']['role'], 'student')
+
+    def test_permission_checks_without_user_lookup(self):
+        """Test that owner and staff checks run on claims alone."""
+        self._login('student', 'student123')
+        status_code, lookups = self._user_row_lookups(reverse('enrollment-list'))
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertEqual(lookups, [])
+
+        self._login('instructor', 'instructor123')
+        status_code, lookups = self._user_row_lookups(
+            reverse('course-enrollments', kwargs={'course_id': self.course.id})
+        )
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertEqual(lookups, [])
+
+    def test_version_bump_invalidates_claims(self):
+        """Test that revoking staff status takes effect for already issued tokens."""
+        self._login('instructor', 'instructor123')
+        url = reverse('course-enrollments', kwargs={'course_id': self.course.id})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+        self.instructor.is_staff = False
+        self.instructor.save()
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_unrelated_saves_keep_claims(self):
+        """Test that saves not touching staff or active status leave the token version alone."""
+        version = get_token_version(self.instructor.pk)
+
+        update_last_login(None, self.instructor)
+        self.instructor.first_name = 'Ines'
+        self.instructor.save()
+        self.assertEqual(get_token_version(self.instructor.pk), version)
+
+        user = User.objects.get(pk=self.instructor.pk)
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        self.assertEqual(get_token_version(self.instructor.pk), version + 1)
+
+    def test_stale_claims_rejected_after_cache_flush(self):
+        """Test that a demoted user's old token is not trusted once the cache is flushed."""
+        self._login('instructor', 'instructor123')
+        url = reverse('course-enrollments', kwargs={'course_id': self.course.id})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+        self.instructor.is_staff = False
+        self.instructor.save()
+        cache.clear()
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_group_change_restamps_on_refresh(self):
+        """Test that refreshed access tokens carry the role after a group change."""
+        response = self._login('student', 'student123')
+        self.student.groups.add(Group.objects.create(name='instructors'))
+
+        response = self.client.post(reverse('token_refresh'), {'refresh': response.data['refresh']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data['access'])['role'], 'instructor')
@@ -207,3 +207,42 @@ class EnrollmentModelTests(TestCase):
         
         expected_str = f"{self.student.username} - {self.course.title}"
         self.assertEqual(str(enrollment), expected_str)
+
+
+class ActivityCompletionTests(TestCase):
+    """Test activity positions and completion bitsets."""
+
+    def setUp(self):
+        """Set up test data."""
+        instructor = User.objects.create_user(username='instructor', password='instructor123')
+        self.course = Course.objects.create(
+            title='Bitset Course',
+            description='Course for completion tracking',
+            instructor=instructor,
+            duration='1 week'
+        )
+        self.module = Module.objects.create(course=self.course, title='Module', description='Module', order=1)
+
+    def test_positions_are_stable_and_never_reused(self):
+        """Test that activities get consecutive positions that survive deletion."""
+        first, second = (
+            Activity.objects.create(module=self.module, title=f'Activity {i}', description='Activity')
+            for i in range(2)
+        )
+        self.assertEqual((first.position, second.position), (0, 1))
+
+        second.delete()
+        third = Activity.objects.create(module=self.module, title='Activity 3', description='Activity')
+        self.assertEqual(third.position, 2)
+
+    def test_set_bits_reports_newly_set_positions(self):
+        """Test the bitset helpers."""
+        from api.completion import iter_bits, set_bits
+
+        bitset, newly_set = set_bits(b'', [0, 9, 9])
+        self.assertEqual(bitset, b'\x01\x02')
+        self.assertEqual(newly_set, [0, 9])
+
+        bitset, newly_set = set_bits(bitset, [9, 20])
+        self.assertEqual(newly_set, [20])
+        self.assertEqual(iter_bits(bitset), [0, 9, 20])